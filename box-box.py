@@ -2,10 +2,17 @@
 # Written by Gabriel Gillette
 # License: Public Domain
 
+import bisect
 import math
 import tkinter as tk
 import time
 
+# numpy makes the batch checks much faster, but isn't required
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 def box_colission(x1 : float, y1 : float, width1 : float, height1 : float, 
                   x2 : float, y2 : float, width2 : float, height2 : float) -> bool:
     '''
@@ -39,6 +46,213 @@ def box_colission(x1 : float, y1 : float, width1 : float, height1 : float,
     return False
 
 
+def box_colission_many(x : float, y : float, width : float, height : float, 
+                       xs : list[float], ys : list[float], 
+                       widths : list[float], heights : list[float]) -> list[bool]:
+    '''
+    Box-Box colission check of one box against many.
+    Same check as box_colission(), just done for a whole batch at once.
+    Parameters:
+        x : float - box x coord (center)
+        y : float - box y coord (center)
+        width : float - box width
+        height : float - box height
+        xs : list[float] - other boxes' x coords (center)
+        ys : list[float] - other boxes' y coords (center)
+        widths : list[float] - other boxes' widths
+        heights : list[float] - other boxes' heights
+    Returns: list[bool] - result of each check, a numpy bool array when
+             numpy is installed
+    '''
+    corner1_x = x - (width/2)
+    corner1_y = y - (height/2)
+
+    if(np is not None):
+        widths = np.asarray(widths, dtype=float)
+        heights = np.asarray(heights, dtype=float)
+        corner2_x = np.asarray(xs, dtype=float) - (widths/2)
+        corner2_y = np.asarray(ys, dtype=float) - (heights/2)
+        return ((corner1_x < corner2_x + widths) & (corner1_x + width > corner2_x) & 
+                (corner1_y < corner2_y + heights) & (corner1_y + height > corner2_y))
+
+    hits = []
+    for x2, y2, width2, height2 in zip(xs, ys, widths, heights):
+        corner2_x = x2 - (width2/2)
+        corner2_y = y2 - (height2/2)
+        hits.append(corner1_x < corner2_x + width2 and corner1_x + width > corner2_x and 
+                    corner1_y < corner2_y + height2 and corner1_y + height > corner2_y)
+    return hits
+
+
+def box_colission_pairs(xs1 : list[float], ys1 : list[float], 
+                        widths1 : list[float], heights1 : list[float], 
+                        xs2 : list[float] = None, ys2 : list[float] = None, 
+                        widths2 : list[float] = None, 
+                        heights2 : list[float] = None) -> list[tuple[int, int]]:
+    '''
+    Box-Box colission check of many boxes against many.
+    Same check as box_colission(). Leave out the second batch to check
+    the first one against itself, then each pair comes back once with
+    the lower index first.
+    Parameters:
+        xs1 : list[float] - batch 1 x coords (center)
+        ys1 : list[float] - batch 1 y coords (center)
+        widths1 : list[float] - batch 1 widths
+        heights1 : list[float] - batch 1 heights
+        xs2 : list[float] - batch 2 x coords (center)
+        ys2 : list[float] - batch 2 y coords (center)
+        widths2 : list[float] - batch 2 widths
+        heights2 : list[float] - batch 2 heights
+    Returns: list[tuple[int, int]] - (batch 1 index, batch 2 index) of 
+             every colliding pair, sorted
+    '''
+    same = xs2 is None
+    if(same):
+        xs2, ys2, widths2, heights2 = xs1, ys1, widths1, heights1
+
+    if(np is not None):
+        return _box_colission_pairs_numpy(xs1, ys1, widths1, heights1, 
+                                          xs2, ys2, widths2, heights2, same)
+
+    # sort batch 2 by left edge, then each box in batch 1 only has to
+    # look at the ones whose left edge could be inside it
+    lefts = [x2 - (width2/2) for x2, width2 in zip(xs2, widths2)]
+    order = sorted(range(len(lefts)), key=lefts.__getitem__)
+    sorted_lefts = [lefts[j] for j in order]
+    widest = max(widths2, default=0)
+
+    pairs = []
+    for i, (x1, y1, width1, height1) in enumerate(zip(xs1, ys1, widths1, heights1)):
+        corner1_x = x1 - (width1/2)
+        corner1_y = y1 - (height1/2)
+        start = bisect.bisect_left(sorted_lefts, corner1_x - widest)
+        end = bisect.bisect_left(sorted_lefts, corner1_x + width1)
+        for j in order[start:end]:
+            if(same and j <= i):
+                continue
+            corner2_x = lefts[j]
+            corner2_y = ys2[j] - (heights2[j]/2)
+            if(corner1_x < corner2_x + widths2[j] and corner1_x + width1 > corner2_x and 
+               corner1_y < corner2_y + heights2[j] and corner1_y + height1 > corner2_y):
+                pairs.append((i, j))
+
+    pairs.sort()
+    return pairs
+
+
+def _box_colission_pairs_numpy(xs1, ys1, widths1, heights1, 
+                               xs2, ys2, widths2, heights2, same : bool) -> list[tuple[int, int]]:
+    '''
+    numpy version of box_colission_pairs().
+    Checks a block of rows at a time so the hit matrix stays small.
+    Parameters:
+        xs1 ... heights2 - the two batches, see box_colission_pairs()
+        same : bool - batch 2 is batch 1, only keep pairs with i < j
+    Returns: list[tuple[int, int]] - colliding pairs, sorted
+    '''
+    BLOCK = 1024 # rows of the hit matrix per block
+
+    widths1 = np.asarray(widths1, dtype=float)
+    heights1 = np.asarray(heights1, dtype=float)
+    corner1_x = np.asarray(xs1, dtype=float) - (widths1/2)
+    corner1_y = np.asarray(ys1, dtype=float) - (heights1/2)
+
+    widths2 = np.asarray(widths2, dtype=float)
+    heights2 = np.asarray(heights2, dtype=float)
+    corner2_x = np.asarray(xs2, dtype=float) - (widths2/2)
+    corner2_y = np.asarray(ys2, dtype=float) - (heights2/2)
+    right2 = corner2_x + widths2
+    bottom2 = corner2_y + heights2
+
+    pairs = []
+    for start in range(0, len(corner1_x), BLOCK):
+        block = slice(start, start + BLOCK)
+        x1 = corner1_x[block, None]
+        y1 = corner1_y[block, None]
+        hits = ((x1 < right2) & (x1 + widths1[block, None] > corner2_x) & 
+                (y1 < bottom2) & (y1 + heights1[block, None] > corner2_y))
+        rows, cols = np.nonzero(hits)
+        rows += start
+        if(same):
+            keep = rows < cols
+            rows = rows[keep]
+            cols = cols[keep]
+        pairs.extend(zip(rows.tolist(), cols.tolist()))
+
+    return pairs
+
+
+class FrameScheduler():
+    '''
+    Paces a main loop to a target frame rate.
+    Sleeps away most of the time left in the frame, then spins for the
+    last bit, since sleep() alone tends to wake up late.
+    '''
+    SPIN_TIME = 0.001 # how close to the deadline we stop sleeping and spin
+
+    def __init__(self, fps_limit : float = 60) -> None:
+        '''
+        Class init
+        Parameters:
+            fps_limit : float - target frame rate (0 = unlimited)
+        Returns: None
+        '''
+        self.__fps_limit = fps_limit
+
+        # when the current frame should end
+        self.__deadline = time.perf_counter()
+
+        return None
+
+    def get_limit(self) -> float:
+        '''
+        Get the target frame rate
+        Parameters: None
+        Returns: float - frame rate (0 = unlimited)
+        '''
+        return self.__fps_limit
+
+    def set_limit(self, fps_limit : float) -> None:
+        '''
+        Set the target frame rate
+        Parameters:
+            fps_limit : float - frame rate (0 = unlimited)
+        Returns: None
+        '''
+        self.__fps_limit = fps_limit
+        self.__deadline = time.perf_counter()
+        return None
+
+    def wait(self) -> None:
+        '''
+        Waits out whatever is left of the current frame.
+        To be called once at the end of every frame. Time spent doing the
+        frame's work counts towards the frame.
+        Parameters: None
+        Returns: None
+        '''
+        if(not self.__fps_limit):
+            return None
+
+        self.__deadline += 1 / self.__fps_limit
+        now = time.perf_counter()
+
+        # we're running behind, so start fresh instead of rushing
+        # through frames to catch up
+        if(now >= self.__deadline):
+            self.__deadline = now
+            return None
+
+        remaining = self.__deadline - now
+        if(remaining > self.SPIN_TIME):
+            time.sleep(remaining - self.SPIN_TIME)
+
+        while(time.perf_counter() < self.__deadline):
+            pass
+
+        return None
+
+
 class Canvas_Box(tk.Canvas):
     __WIDTH = 1280    # width of canvas
     __HEIGHT = 720    # height of canvas
@@ -151,6 +365,9 @@ class Program:
         # program will run until this is False
         self.running = True
 
+        # keeps us from running flat out
+        self.frame_scheduler = FrameScheduler(60)
+
         # create and pack our canvas object
         self.canvas_box = Canvas_Box()
         self.canvas_box.pack()
@@ -196,6 +413,9 @@ class Program:
             # Call program update 
             self.update()
 
+            # wait for the next frame
+            self.frame_scheduler.wait()
+
         # destroy root window when program is done
         self.root.destroy()
 
@@ -2,10 +2,17 @@
 # Written by Gabriel Gillette
 # License: Public Domain
 
+import bisect
 import math
 import tkinter as tk
 import time
 
+# numpy makes the batch checks much faster, but isn't required
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 
 def circle_colission(x1 : float, y1 : float, radius1 : float, x2 : float, y2 : float, radius2 : float) -> bool:
     '''
@@ -25,17 +32,267 @@ def circle_colission(x1 : float, y1 : float, radius1 : float, x2 : float, y2 : f
     dx = x2 - x1 # length of one leg
     dy = y2 - y1 # length of another
 
-    # Find the length of the third
-    dist = math.sqrt(math.pow(dx, 2) + math.pow(dy, 2))
-
-    # determine if the length is the size of the sum of the radii
-    if dist < (radius1 + radius2):
+    # We only need to know if the third is shorter than the sum of 
+    # the radii, so compare the squares and skip the square root
+    radii = radius1 + radius2
+    if (dx * dx) + (dy * dy) < (radii * radii):
         return True # colission! 
     
     # no colission!
     return False
 
 
+def circle_contact(x1 : float, y1 : float, radius1 : float, 
+                   x2 : float, y2 : float, radius2 : float) -> tuple[float, float, float]:
+    '''
+    Circle-Circle colission check that also says how they collide.
+    Parameters:
+        x1 : float - x pos of first circle
+        y1 : float - y pos of first circle
+        radius1 : float - radius of first circle
+        x2 : float - x pos of second circle
+        y2 : float - y pos of second circle
+        radius2 : float - radius of second circle
+    Returns: tuple[float, float, float] - penetration depth and the
+             contact normal (x, y) pointing from the first circle to the
+             second, or None if they don't collide
+    '''
+    dx = x2 - x1
+    dy = y2 - y1
+    radii = radius1 + radius2
+    dist_sq = (dx * dx) + (dy * dy)
+
+    if dist_sq >= (radii * radii):
+        return None # no colission!
+
+    # only colliding circles pay for the square root
+    dist = math.sqrt(dist_sq)
+
+    # same center, any direction will do
+    if dist == 0:
+        return radii, 1.0, 0.0
+
+    return radii - dist, dx / dist, dy / dist
+
+
+def circle_colission_many(x : float, y : float, radius : float, 
+                          xs : list[float], ys : list[float], 
+                          radii : list[float]) -> list[bool]:
+    '''
+    Circle-Circle colission check of one circle against many.
+    Parameters:
+        x : float - x pos of circle
+        y : float - y pos of circle
+        radius : float - radius of circle
+        xs : list[float] - x pos of other circles
+        ys : list[float] - y pos of other circles
+        radii : list[float] - radii of other circles
+    Returns: list[bool] - result of each check, a numpy bool array when
+             numpy is installed
+    '''
+    if np is not None:
+        dx = np.asarray(xs, dtype=float) - x
+        dy = np.asarray(ys, dtype=float) - y
+        reach = np.asarray(radii, dtype=float) + radius
+        return (dx * dx) + (dy * dy) < (reach * reach)
+
+    hits = []
+    for x2, y2, radius2 in zip(xs, ys, radii):
+        dx = x2 - x
+        dy = y2 - y
+        reach = radius + radius2
+        hits.append((dx * dx) + (dy * dy) < (reach * reach))
+    return hits
+
+
+def circle_colission_pairs(xs1 : list[float], ys1 : list[float], radii1 : list[float], 
+                           xs2 : list[float] = None, ys2 : list[float] = None, 
+                           radii2 : list[float] = None, contacts : bool = False) -> list[tuple]:
+    '''
+    Circle-Circle colission check of many circles against many.
+    Leave out the second batch to check the first one against itself,
+    then each pair comes back once with the lower index first.
+    Parameters:
+        xs1 : list[float] - x pos of batch 1 circles
+        ys1 : list[float] - y pos of batch 1 circles
+        radii1 : list[float] - radii of batch 1 circles
+        xs2 : list[float] - x pos of batch 2 circles
+        ys2 : list[float] - y pos of batch 2 circles
+        radii2 : list[float] - radii of batch 2 circles
+        contacts : bool - also return depth and normal, see circle_contact()
+    Returns: list[tuple] - (batch 1 index, batch 2 index) of every
+             colliding pair, sorted. With contacts each tuple is
+             (i, j, depth, normal x, normal y)
+    '''
+    same = xs2 is None
+    if same:
+        xs2, ys2, radii2 = xs1, ys1, radii1
+
+    if np is not None:
+        pairs = _circle_colission_pairs_numpy(xs1, ys1, radii1, xs2, ys2, radii2, same)
+    else:
+        # sort batch 2 by left edge, then each circle in batch 1 only 
+        # has to look at the ones whose left edge could reach it
+        lefts = [x2 - radius2 for x2, radius2 in zip(xs2, radii2)]
+        order = sorted(range(len(lefts)), key=lefts.__getitem__)
+        sorted_lefts = [lefts[j] for j in order]
+        widest = max(radii2, default=0) * 2
+
+        pairs = []
+        for i, (x1, y1, radius1) in enumerate(zip(xs1, ys1, radii1)):
+            start = bisect.bisect_left(sorted_lefts, x1 - radius1 - widest)
+            end = bisect.bisect_left(sorted_lefts, x1 + radius1)
+            for j in order[start:end]:
+                if same and j <= i:
+                    continue
+                dx = xs2[j] - x1
+                dy = ys2[j] - y1
+                reach = radius1 + radii2[j]
+                if (dx * dx) + (dy * dy) < (reach * reach):
+                    pairs.append((i, j))
+        pairs.sort()
+
+    if not contacts:
+        return pairs
+
+    # only colliding pairs get the square roots
+    return [(i, j) + circle_contact(xs1[i], ys1[i], radii1[i], xs2[j], ys2[j], radii2[j]) 
+            for i, j in pairs]
+
+
+def _circle_colission_pairs_numpy(xs1, ys1, radii1, xs2, ys2, radii2, 
+                                  same : bool) -> list[tuple[int, int]]:
+    '''
+    numpy version of circle_colission_pairs().
+    Both batches are sorted by left edge, then a block of batch 1 at a
+    time is checked against the slice of batch 2 it could reach.
+    Parameters:
+        xs1 ... radii2 - the two batches, see circle_colission_pairs()
+        same : bool - batch 2 is batch 1, only keep pairs with i < j
+    Returns: list[tuple[int, int]] - colliding pairs, sorted
+    '''
+    BLOCK = 256 # batch 1 circles per block
+
+    xs1 = np.asarray(xs1, dtype=float)
+    ys1 = np.asarray(ys1, dtype=float)
+    radii1 = np.asarray(radii1, dtype=float)
+    xs2 = np.asarray(xs2, dtype=float)
+    ys2 = np.asarray(ys2, dtype=float)
+    radii2 = np.asarray(radii2, dtype=float)
+    if len(xs1) == 0 or len(xs2) == 0:
+        return []
+
+    lefts1 = xs1 - radii1
+    rights1 = xs1 + radii1
+    order1 = np.argsort(lefts1, kind='stable')
+    lefts2 = xs2 - radii2
+    order2 = np.argsort(lefts2, kind='stable')
+    sorted_lefts2 = lefts2[order2]
+    widest = radii2.max() * 2
+
+    found_i = []
+    found_j = []
+    for start in range(0, len(xs1), BLOCK):
+        rows = order1[start:start + BLOCK]
+        low = np.searchsorted(sorted_lefts2, lefts1[rows].min() - widest, 'left')
+        high = np.searchsorted(sorted_lefts2, rights1[rows].max(), 'left')
+        if low >= high:
+            continue
+
+        cols = order2[low:high]
+        dx = xs2[cols] - xs1[rows, None]
+        dy = ys2[cols] - ys1[rows, None]
+        reach = radii2[cols] + radii1[rows, None]
+        hit_rows, hit_cols = np.nonzero((dx * dx) + (dy * dy) < (reach * reach))
+        i = rows[hit_rows]
+        j = cols[hit_cols]
+        if same:
+            keep = i < j
+            i = i[keep]
+            j = j[keep]
+        found_i.append(i)
+        found_j.append(j)
+
+    if not found_i:
+        return []
+
+    i = np.concatenate(found_i)
+    j = np.concatenate(found_j)
+    order = np.lexsort((j, i))
+    return list(zip(i[order].tolist(), j[order].tolist()))
+
+
+class FrameScheduler():
+    '''
+    Paces a main loop to a target frame rate.
+    Sleeps away most of the time left in the frame, then spins for the
+    last bit, since sleep() alone tends to wake up late.
+    '''
+    SPIN_TIME = 0.001 # how close to the deadline we stop sleeping and spin
+
+    def __init__(self, fps_limit : float = 60) -> None:
+        '''
+        Class init
+        Parameters:
+            fps_limit : float - target frame rate (0 = unlimited)
+        Returns: None
+        '''
+        self.__fps_limit = fps_limit
+
+        # when the current frame should end
+        self.__deadline = time.perf_counter()
+
+        return None
+
+    def get_limit(self) -> float:
+        '''
+        Get the target frame rate
+        Parameters: None
+        Returns: float - frame rate (0 = unlimited)
+        '''
+        return self.__fps_limit
+
+    def set_limit(self, fps_limit : float) -> None:
+        '''
+        Set the target frame rate
+        Parameters:
+            fps_limit : float - frame rate (0 = unlimited)
+        Returns: None
+        '''
+        self.__fps_limit = fps_limit
+        self.__deadline = time.perf_counter()
+        return None
+
+    def wait(self) -> None:
+        '''
+        Waits out whatever is left of the current frame.
+        To be called once at the end of every frame. Time spent doing the
+        frame's work counts towards the frame.
+        Parameters: None
+        Returns: None
+        '''
+        if(not self.__fps_limit):
+            return None
+
+        self.__deadline += 1 / self.__fps_limit
+        now = time.perf_counter()
+
+        # we're running behind, so start fresh instead of rushing
+        # through frames to catch up
+        if(now >= self.__deadline):
+            self.__deadline = now
+            return None
+
+        remaining = self.__deadline - now
+        if(remaining > self.SPIN_TIME):
+            time.sleep(remaining - self.SPIN_TIME)
+
+        while(time.perf_counter() < self.__deadline):
+            pass
+
+        return None
+
+
 class Canvas_Circle(tk.Canvas):
     __WIDTH = 1280 # width of canvas
     __HEIGHT = 720 # height of canvas
@@ -111,10 +368,10 @@ class Canvas_Circle(tk.Canvas):
         color = 'blue' # initial default color of smaller circle
 
         # check hit
-        colission = circle_colission(self.c1_x, self.c1_y, self.__RAD_1, self.c2_x, self.c2_y, self.__RAD_2)
+        contact = circle_contact(self.c1_x, self.c1_y, self.__RAD_1, self.c2_x, self.c2_y, self.__RAD_2)
 
         # change color if circles collide
-        if(colission):
+        if(contact):
             color = 'yellow'
 
         # draw a big red circle
@@ -123,6 +380,14 @@ class Canvas_Circle(tk.Canvas):
         # draw smaller circle that follows mouse
         self.draw_circle(self.c1_x, self.c1_y, self.__RAD_1, color)
 
+        # show how far the small circle would have to back off, and which way
+        if(contact):
+            depth, normal_x, normal_y = contact
+            edge_x = self.c1_x + (normal_x * self.__RAD_1)
+            edge_y = self.c1_y + (normal_y * self.__RAD_1)
+            self.create_line(edge_x, edge_y, edge_x - (normal_x * depth), edge_y - (normal_y * depth), 
+                             width=3, arrow='last')
+
         # update base class
         super().update()
         super().update_idletasks()
@@ -146,6 +411,9 @@ class Program:
         # program will run until this is False
         self.running = True
 
+        # keeps us from running flat out
+        self.frame_scheduler = FrameScheduler(60)
+
         # create and pack our canvas object
         self.canvas_circle = Canvas_Circle()
         self.canvas_circle.pack()
@@ -191,6 +459,9 @@ class Program:
             # Call program update 
             self.update()
 
+            # wait for the next frame
+            self.frame_scheduler.wait()
+
         # destroy root window when program is done
         self.root.destroy()
 
@@ -34,6 +34,77 @@ class DeltaTime():
         # return delta
         return delta
 
+class FrameScheduler():
+    '''
+    Paces a main loop to a target frame rate.
+    Sleeps away most of the time left in the frame, then spins for the
+    last bit, since sleep() alone tends to wake up late.
+    '''
+    SPIN_TIME = 0.001 # how close to the deadline we stop sleeping and spin
+
+    def __init__(self, fps_limit : float = 60) -> None:
+        '''
+        Class init
+        Parameters:
+            fps_limit : float - target frame rate (0 = unlimited)
+        Returns: None
+        '''
+        self.__fps_limit = fps_limit
+
+        # when the current frame should end
+        self.__deadline = time.perf_counter()
+
+        return None
+
+    def get_limit(self) -> float:
+        '''
+        Get the target frame rate
+        Parameters: None
+        Returns: float - frame rate (0 = unlimited)
+        '''
+        return self.__fps_limit
+
+    def set_limit(self, fps_limit : float) -> None:
+        '''
+        Set the target frame rate
+        Parameters:
+            fps_limit : float - frame rate (0 = unlimited)
+        Returns: None
+        '''
+        self.__fps_limit = fps_limit
+        self.__deadline = time.perf_counter()
+        return None
+
+    def wait(self) -> None:
+        '''
+        Waits out whatever is left of the current frame.
+        To be called once at the end of every frame. Time spent doing the
+        frame's work counts towards the frame.
+        Parameters: None
+        Returns: None
+        '''
+        if(not self.__fps_limit):
+            return None
+
+        self.__deadline += 1 / self.__fps_limit
+        now = time.perf_counter()
+
+        # we're running behind, so start fresh instead of rushing
+        # through frames to catch up
+        if(now >= self.__deadline):
+            self.__deadline = now
+            return None
+
+        remaining = self.__deadline - now
+        if(remaining > self.SPIN_TIME):
+            time.sleep(remaining - self.SPIN_TIME)
+
+        while(time.perf_counter() < self.__deadline):
+            pass
+
+        return None
+
+
 class Canvas_1(tk.Canvas):
     __WIDTH = 1280 # width of canvas
     __HEIGHT = 720/2 # height of canvas
@@ -234,6 +305,7 @@ class Program:
 
         # frame rate limiter (0 = none)
         self.fps_limit = 0
+        self.frame_scheduler = FrameScheduler(self.fps_limit)
 
         # program's delta time object
         self.delta_time = DeltaTime()
@@ -261,6 +333,7 @@ class Program:
         '''
         self.fps_limit += 15
         self.fps_limit %= 120
+        self.frame_scheduler.set_limit(self.fps_limit)
         return None
 
     def close_program(self):
@@ -289,9 +362,6 @@ class Program:
         self.root.update_idletasks()
         self.root.update()
 
-        if(self.fps_limit):
-            time.sleep(1/self.fps_limit)
-
         return None
 
     def main_loop(self) -> None:
@@ -306,6 +376,9 @@ class Program:
             # Call program update 
             self.update()
 
+            # wait for the next frame
+            self.frame_scheduler.wait()
+
         # destroy root window when program is done
         self.root.destroy()
 
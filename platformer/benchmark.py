@@ -0,0 +1,308 @@
+# Benchmarks for the platformer's hot paths
+# License: Public Domain
+#
+# Times level loading (parsed whole by load_level(), and opened and
+# read a chunk at a time like the game does), spawning (the whole level,
+# and just the chunks streamed in around the camera), per-frame updates
+# and drawing for the shipped levels and for wider copies of level2.txt, then saves the
+# numbers as JSON so runs from different commits can be compared.
+#
+#   python3 benchmark.py                      (all levels, saves bench_results.json)
+#   python3 benchmark.py --levels level.txt x10 --frames 200
+#   python3 benchmark.py --compare old.json   (print change against an old run)
+#   python3 benchmark.py --replay session.rpl (time a recorded session)
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tkinter as tk
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+
+import platformer_scroller as ps
+
+DEFAULT_LEVELS = ['level.txt', 'level2.txt', 'x10', 'x100', 'x1000']
+
+
+def summarize(samples : list[float]) -> dict:
+    '''
+    Boil a list of timings down to the numbers we report.
+    Parameters:
+        samples : list[float] - timings in seconds
+    Returns: dict - mean, percentiles and count, in milliseconds
+    '''
+    if(not samples):
+        return {'samples' : 0}
+
+    # same percentiles as the in game profiler
+    ordered = sorted(samples)
+    return {'samples' : len(samples),
+            'mean_ms' : statistics.fmean(samples) * 1000,
+            'p50_ms' : ps.percentile(ordered, 50) * 1000,
+            'p90_ms' : ps.percentile(ordered, 90) * 1000,
+            'p99_ms' : ps.percentile(ordered, 99) * 1000,
+            'max_ms' : ordered[-1] * 1000}
+
+
+def make_wide_level(source : str, copies : int, out_path : str) -> None:
+    '''
+    Writes a level that is `copies` copies of source laid side by side.
+    Only the first copy keeps its player and only the last its exit.
+    Parameters:
+        source : str - level file to copy
+        copies : int - how many copies wide
+        out_path : str - where to write the new level
+    Returns: None
+    '''
+    with open(source, 'r') as in_file:
+        rows = [line.rstrip('\n') for line in in_file]
+
+    with open(out_path, 'w') as out_file:
+        for row in rows:
+            first = row.replace('e', '0')
+            middle = first.replace('p', '0')
+            last = row.replace('p', '0')
+            if(copies == 1):
+                out_file.write(row + '\n')
+            else:
+                out_file.write(first + (middle * (copies - 2)) + last + '\n')
+
+    return None
+
+
+def make_script(frames : int, rate : int) -> dict:
+    '''
+    Input script for a run: hold right and jump once a second.
+    Parameters:
+        frames : int - length of the run
+        rate : int - frames per second
+    Returns: dict - script for ps.ScriptedInput
+    '''
+    script = {0 : [('press', 'move_right')]}
+    for frame in range(rate // 2, frames, rate):
+        script[frame] = [('press', 'jump')]
+        script[frame + 10] = [('release', 'jump')]
+    return script
+
+
+def bench_level(path : str, frames : int, repeats : int, game : ps.Game = None, 
+                index : str = 'tree', replay_path : str = None) -> dict:
+    '''
+    Time every stage for one level.
+    Parameters:
+        path : str - level file
+        frames : int - frames to time update and draw over
+        repeats : int - how many times to load and spawn
+                        (both ways each)
+        game : ps.Game - canvas to draw with (None to skip drawing)
+        index : str - spatial index for the world, 'tree' or 'grid'
+        replay_path : str - input recording to play instead of the usual
+                            script, with its own frame times and length
+    Returns: dict - stage name -> summary
+    '''
+    RATE = 120
+    parse_times = []
+    open_times = []
+    spawn_times = []
+    stream_times = []
+    step_times = []
+    draw_times = []
+
+    for i in range(repeats):
+        start = time.perf_counter()
+        level_data = ps.load_level(path)
+        parse_times.append(time.perf_counter() - start)
+
+        # how the game loads it, open_level() then every chunk read
+        start = time.perf_counter()
+        level = ps.open_level(path)
+        chunk_columns = level.get_chunk_columns()
+        for index in range(-(-level.get_size()[0] // chunk_columns)):
+            level.read_chunk(index)
+        level.close()
+        open_times.append(time.perf_counter() - start)
+
+        # a viewport as wide as the level loads every chunk, so this is
+        # the whole level's spawn like it was before chunk streaming
+        width = max(len(row) for row in level_data) * ps.World.TILE_SIZE
+        start = time.perf_counter()
+        world = ps.World(level_data, ps.ScriptedInput(ps.World.INPUTS), w=width, index=index)
+        spawn_times.append(time.perf_counter() - start)
+        spawned = len(world.game_objects)
+
+        # and just the chunks around the camera, which is what a game waits for
+        start = time.perf_counter()
+        world = ps.World(level_data, ps.ScriptedInput(ps.World.INPUTS), index=index)
+        stream_times.append(time.perf_counter() - start)
+
+    # fresh world for the frame timings, drawn if we can
+    if(replay_path):
+        input_state = ps.ReplayInput(replay_path)
+        frames = input_state.get_frame_count()
+    else:
+        input_state = ps.ScriptedInput(ps.World.INPUTS, make_script(frames, RATE))
+    image_cache = game.image_cache if game else None
+    world = ps.World(level_data, input_state, image_cache, game, index=index)
+
+    for frame in range(frames):
+        if(not world.alive):
+            break
+
+        delta = input_state.get_delta() if replay_path else 1 / RATE
+        start = time.perf_counter()
+        world.step(delta)
+        step_times.append(time.perf_counter() - start)
+
+        if(game):
+            start = time.perf_counter()
+            game.draw(world)
+            game.update_idletasks()
+            draw_times.append(time.perf_counter() - start)
+
+    if(game):
+        world.get_tile_map().undraw(game)
+        world.despawn_all()
+
+    cols, rows = world.get_tile_map().get_size()
+    return {'columns' : cols,
+            'rows' : rows,
+            'game_objects' : spawned,
+            'frames' : world.steps,
+            'parse' : summarize(parse_times),
+            'open' : summarize(open_times),
+            'spawn' : summarize(spawn_times),
+            'stream' : summarize(stream_times),
+            'update' : summarize(step_times),
+            'draw' : summarize(draw_times)}
+
+
+def git_commit() -> str:
+    '''
+    Get the commit we are benchmarking, if we are in a git checkout.
+    Parameters: None
+    Returns: str - commit hash or None
+    '''
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(results : dict, old : dict = None) -> None:
+    '''
+    Print a results table, with the change against an old run if given.
+    Parameters:
+        results : dict - level -> stage summaries
+        old : dict - the same from an older run
+    Returns: None
+    '''
+    for level, stages in results.items():
+        print(f"{level} ({stages['columns']}x{stages['rows']}, "
+              f"{stages['game_objects']} objects, {stages['frames']} frames)")
+        for stage in ('parse', 'open', 'spawn', 'stream', 'update', 'draw'):
+            summary = stages.get(stage, {'samples' : 0})
+            if(not summary['samples']):
+                print(f"  {stage:<8} skipped")
+                continue
+
+            line = (f"  {stage:<8} mean {summary['mean_ms']:>10.3f}ms  p50 {summary['p50_ms']:>10.3f}ms"
+                    f"  p90 {summary['p90_ms']:>10.3f}ms  p99 {summary['p99_ms']:>10.3f}ms")
+
+            old_summary = (old or {}).get(level, {}).get(stage, {})
+            if(old_summary.get('samples')):
+                change = (summary['mean_ms'] / old_summary['mean_ms'] - 1) * 100
+                line += f"  ({change:+.1f}% mean)"
+            print(line)
+
+    return None
+
+
+def main() -> None:
+    '''
+    Command line entry point.
+    Parameters: None
+    Returns: None
+    '''
+    parser = argparse.ArgumentParser(description='Benchmark the platformer hot paths.')
+    parser.add_argument('--levels', nargs='+', default=DEFAULT_LEVELS,
+                        help='level files, or xN for level2.txt made N times wider')
+    parser.add_argument('--frames', type=int, default=600, help='frames to time per level')
+    parser.add_argument('--repeats', type=int, default=5, help='load/spawn repeats per level')
+    parser.add_argument('--out', default='bench_results.json', help='where to save results')
+    parser.add_argument('--compare', help='older results file to compare against')
+    parser.add_argument('--no-draw', action='store_true', help="don't time drawing")
+    parser.add_argument('--index', choices=('tree', 'grid'), default='tree', 
+                        help='spatial index the world uses')
+    parser.add_argument('--replay', help='input recording to play (on its own level '
+                                         'unless --levels is given)')
+    args = parser.parse_args()
+
+    replay_path = os.path.abspath(args.replay) if args.replay else None
+    if(replay_path and args.levels == DEFAULT_LEVELS):
+        args.levels = [ps.ReplayInput(replay_path).get_level_path()]
+
+    # paths given to us are relative to where we were run from, level
+    # names we don't find there are looked up next to the game
+    out_path = os.path.abspath(args.out)
+    compare_path = os.path.abspath(args.compare) if args.compare else None
+    levels = dict()
+    for level in args.levels:
+        if(os.path.exists(level)):
+            levels[level] = os.path.abspath(level)
+        else:
+            levels[level] = os.path.join(HERE, level)
+
+    # the game loads its assets relative to its own folder
+    os.chdir(HERE)
+
+    # drawing needs a display; everything else doesn't
+    game = None
+    if(not args.no_draw):
+        try:
+            root = tk.Tk()
+            game = ps.Game(root)
+            game.pack()
+        except tk.TclError:
+            print('No display, skipping the draw stage.')
+
+    results = dict()
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for level, path in levels.items():
+            if(level.startswith('x') and level[1:].isdigit()):
+                path = os.path.join(temp_dir, f'level2_{level}.txt')
+                make_wide_level('level2.txt', int(level[1:]), path)
+
+            # huge levels get fewer load/spawn repeats
+            repeats = args.repeats if os.path.getsize(path) < 1000000 else 1
+            results[level] = bench_level(path, args.frames, repeats, game, args.index, replay_path)
+
+    old = None
+    if(compare_path):
+        with open(compare_path, 'r') as in_file:
+            old = json.load(in_file)['results']
+
+    print_results(results, old)
+
+    with open(out_path, 'w') as out_file:
+        json.dump({'commit' : git_commit(),
+                   'time' : time.strftime('%Y-%m-%dT%H:%M:%S'),
+                   'python' : platform.python_version(),
+                   'machine' : platform.machine(),
+                   'frames' : args.frames,
+                   'index' : args.index,
+                   'results' : results}, out_file, indent=2)
+    print(f"Saved to {out_path}")
+
+    return None
+
+
+if(__name__ == '__main__'):
+    main()
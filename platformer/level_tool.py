@@ -0,0 +1,364 @@
+# Level checker and compiler
+# License: Public Domain
+#
+# Checks every level in a folder for the mistakes that otherwise only
+# show up in game (no player, an exit you can't get to, typos), compiles
+# the good ones to .lvb next to them so the game loads those instead,
+# and prints some stats. Levels are handled in parallel, one per core.
+#
+#   python3 level_tool.py                      (every *.txt in this folder)
+#   python3 level_tool.py levels/ level.txt --jobs 4
+#   python3 level_tool.py --no-compile         (check only)
+
+import argparse
+import bisect
+import glob
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+
+import platformer_scroller as ps
+
+# every glyph the game knows, and what it spawns: the tile map's, the
+# player, and whatever tiles are registered
+GLYPHS = {'0' : 'empty',
+          'g' : 'ground',
+          'p' : 'player'}
+GLYPHS.update((glyph, ps.TILES.get_factory(glyph).__name__) for glyph in ps.TILES.get_glyphs())
+
+SOLID = ord('g')
+
+# how far a jump gets, in tiles. Only roughly, the jump depends on the
+# physics rate: at the game's 240 steps a second (Program.PHYSICS_RATE)
+# it's about 4.5 up and 9 across,
+# counting the player being a tile wide so they can take off and land
+# half over an edge
+JUMP_HEIGHT = 4
+JUMP_DISTANCE = 9
+
+# the game's view, to estimate how many objects are spawned at once
+VIEW_WIDTH = 1280
+
+
+def find_standing(lines : list[bytes]) -> list[list[int]]:
+    '''
+    Find every cell the player can stand in: solid below, room for the
+    player's two tiles of height.
+    Parameters:
+        lines : list[bytes] - level rows, see ps.read_level_lines()
+    Returns: list[list[int]] - per column, the rows it can be stood in,
+             top to bottom
+    '''
+    cols = max((len(line) for line in lines), default=0)
+    standing = [[] for col in range(cols)]
+
+    def solid(col : int, row : int) -> bool:
+        return 0 <= row < len(lines) and col < len(lines[row]) and lines[row][col] == SOLID
+
+    for row in range(len(lines) - 1):
+        for match in re.finditer(b'g', lines[row + 1]):
+            col = match.start()
+            if(not solid(col, row) and not solid(col, row - 1)):
+                standing[col].append(row)
+
+    return standing
+
+
+def find_reachable(lines : list[bytes], start : tuple[int, int], jump_height : int = JUMP_HEIGHT,
+                   jump_distance : int = JUMP_DISTANCE, 
+                   goals : set[tuple[int, int]] = None) -> set[tuple[int, int]]:
+    '''
+    Rough search for where the player can get to from the start.
+    From a standing cell you can walk or fall off either side, or jump
+    to any standing cell up to jump_distance columns across that is no
+    more than jump_height rows higher. What's in the way of a jump isn't
+    checked, so this can say yes when the answer is no, not the other way.
+    Parameters:
+        lines : list[bytes] - level rows, see ps.read_level_lines()
+        start : tuple[int, int] - column and row of the player
+        jump_height : int - rows a jump gets up
+        jump_distance : int - columns a jump gets across
+        goals : set[tuple[int, int]] - stop once any of these is reached
+                                       (None to search everywhere)
+    Returns: set[tuple[int, int]] - column and row of every standing
+             cell reached
+    '''
+    standing = find_standing(lines)
+    cols = len(standing)
+
+    # rows of each column we haven't reached yet, and for skipping past
+    # columns with none left, the next column that might still have some
+    unreached = [list(rows) for rows in standing]
+    skip = list(range(cols + 1))
+
+    def next_col(col : int) -> int:
+        root = col
+        while(skip[root] != root):
+            root = skip[root]
+        while(skip[col] != root):
+            skip[col], col = root, skip[col]
+        return root
+
+    reached = set()
+    todo = []
+
+    def reach(col : int, rows : list[int]) -> None:
+        for row in rows:
+            reached.add((col, row))
+            todo.append((col, row))
+            unreached[col].remove(row)
+        if(not unreached[col]):
+            skip[col] = col + 1
+
+    def land(col : int, row : int) -> None:
+        # fall down column col from row, nowhere if we fall out
+        if(0 <= col < cols):
+            rows = standing[col]
+            i = bisect.bisect_left(rows, row)
+            if(i < len(rows) and (col, rows[i]) not in reached):
+                reach(col, [rows[i]])
+
+    land(*start)
+    while(todo):
+        col, row = todo.pop()
+        if(goals and (col, row) in goals):
+            break
+
+        # walk or fall off to either side
+        land(col - 1, row)
+        land(col + 1, row)
+
+        # jump
+        jump_col = next_col(max(0, col - jump_distance))
+        while(jump_col <= min(cols - 1, col + jump_distance)):
+            rows = unreached[jump_col]
+            i = bisect.bisect_left(rows, row - jump_height)
+            if(i < len(rows)):
+                reach(jump_col, rows[i:])
+            jump_col = next_col(jump_col + 1)
+
+    return reached
+
+
+def object_bytes() -> int:
+    '''
+    Estimate the memory one spawned GameObject takes.
+    Parameters: None
+    Returns: int - bytes
+    '''
+    go = ps.CoinTile(0, 0, ps.ImageCache())
+    return sys.getsizeof(go) + sys.getsizeof(go.get_hit_box()) + (2 * sys.getsizeof([]))
+
+
+def check_level(path : str, compile_to : str = None, force : bool = False,
+                jump_height : int = JUMP_HEIGHT, jump_distance : int = JUMP_DISTANCE) -> dict:
+    '''
+    Check one level, compile it if it's good, and work out its stats.
+    Runs in a worker process.
+    Parameters:
+        path : str - level file
+        compile_to : str - where to write the compiled level (None to not compile)
+        force : bool - compile even if the compiled level is up to date
+        jump_height : int - rows a jump gets up
+        jump_distance : int - columns a jump gets across
+    Returns: dict - errors and stats
+    '''
+    errors = []
+    lines = ps.read_level_lines(path)
+    rows = len(lines)
+    cols = max((len(line) for line in lines), default=0)
+
+    # glyphs
+    counts = dict()
+    unknown = dict()
+    for row, line in enumerate(lines):
+        for glyph in set(line.decode('latin-1')):
+            if(glyph not in GLYPHS):
+                unknown.setdefault(glyph, (line.index(ord(glyph)), row))
+            counts[glyph] = counts.get(glyph, 0) + line.count(ord(glyph))
+    for glyph, (col, row) in sorted(unknown.items()):
+        errors.append(f"unknown glyph {glyph!r} ({counts[glyph]} times, first at column {col} row {row})")
+
+    # row widths, short rows would read as empty past their end
+    ragged = [row for row, line in enumerate(lines) if len(line) != cols]
+    if(ragged):
+        errors.append(f"{len(ragged)} rows are shorter than {cols} columns (first is row {ragged[0]})")
+
+    # player
+    players = [(line.index(b'p'), row) for row, line in enumerate(lines) if b'p' in line]
+    if(counts.get('p', 0) != 1):
+        where = f", first at column {players[0][0]} row {players[0][1]}" if players else ''
+        errors.append(f"needs exactly one 'p', has {counts.get('p', 0)}{where}")
+
+    # exit
+    exits = [(match.start(), row) for row, line in enumerate(lines)
+             for match in re.finditer(b'e', line)]
+    if(not exits):
+        errors.append("has no 'e'")
+    elif(len(players) == 1):
+        # standing spots that touch an exit: the player is two tiles tall
+        # and a jump reaches higher still
+        goals = {(col + dc, row + dr) for col, row in exits
+                 for dc in (-1, 0, 1) for dr in range(jump_height + 2)}
+        reached = find_reachable(lines, players[0], jump_height, jump_distance, goals)
+        if(not goals & reached):
+            errors.append(f"no 'e' can be reached from the 'p' "
+                          f"(standing spots reached: {len(reached)})")
+
+    # stats
+    objects = sum(count for glyph, count in counts.items() if glyph in GLYPHS and glyph not in '0g')
+    chunk_columns = ps.LevelGrid.CHUNK_COLUMNS
+    chunk_objects = [0] * max(1, -(-cols // chunk_columns))
+    object_glyphs = re.compile(b'[' + ''.join(GLYPHS).replace('0', '').replace('g', '').encode() + b']')
+    for line in lines:
+        for match in object_glyphs.finditer(line):
+            chunk_objects[match.start() // chunk_columns] += 1
+
+    # chunks loaded at once: the view and load margin either side, plus
+    # the one more the world keeps before evicting
+    loaded_width = VIEW_WIDTH + (2 * ps.World.LOAD_MARGIN)
+    loaded = min(len(chunk_objects), -(-loaded_width // (chunk_columns * ps.World.TILE_SIZE)) + 2)
+    peak = max(sum(chunk_objects[i:i + loaded]) for i in range(len(chunk_objects) - loaded + 1))
+
+    per_object = object_bytes()
+    stats = {'columns' : cols,
+             'rows' : rows,
+             'objects' : objects,
+             'counts' : {glyph : counts[glyph] for glyph in GLYPHS if counts.get(glyph)},
+             # load_level() keeps a list per row of 1 character strings
+             'text_bytes' : rows * sys.getsizeof([None] * cols),
+             'object_bytes' : objects * per_object,
+             'streamed_bytes' : peak * per_object}
+
+    # compile
+    compiled = None
+    if(compile_to and not errors):
+        up_to_date = (os.path.exists(compile_to) and
+                      os.path.getmtime(compile_to) >= os.path.getmtime(path))
+        if(force or not up_to_date):
+            ps.compile_level(path, compile_to)
+            compiled = compile_to
+        stats['compiled_bytes'] = os.path.getsize(compile_to)
+
+    return {'path' : path,
+            'errors' : errors,
+            'stats' : stats,
+            'compiled' : compiled}
+
+
+def find_levels(paths : list[str], pattern : str) -> list[str]:
+    '''
+    Expand folders into the level files in them.
+    Parameters:
+        paths : list[str] - level files and folders
+        pattern : str - glob for level files in folders
+    Returns: list[str] - level files
+    '''
+    levels = []
+    for path in paths:
+        if(os.path.isdir(path)):
+            levels += sorted(glob.glob(os.path.join(path, pattern)))
+        else:
+            levels.append(path)
+    return levels
+
+
+def size(count : int) -> str:
+    '''
+    Format a byte count for people.
+    Parameters:
+        count : int - bytes
+    Returns: str - formatted size
+    '''
+    for unit in ('B', 'KB', 'MB'):
+        if(count < 1024):
+            return f"{count:.0f}{unit}" if unit == 'B' else f"{count:.1f}{unit}"
+        count /= 1024
+    return f"{count:.1f}GB"
+
+
+def print_report(report : dict) -> None:
+    '''
+    Print what we found for one level.
+    Parameters:
+        report : dict - see check_level()
+    Returns: None
+    '''
+    stats = report['stats']
+    status = 'FAIL' if report['errors'] else 'ok'
+    counts = ', '.join(f"{GLYPHS[glyph]} {count}" for glyph, count in stats['counts'].items()
+                       if glyph not in '0g')
+    print(f"{status:<4} {report['path']} ({stats['columns']}x{stats['rows']}, "
+          f"{stats['objects']} objects: {counts})")
+    print(f"     memory: text {size(stats['text_bytes'])}, "
+          f"objects {size(stats['object_bytes'])} all spawned, "
+          f"{size(stats['streamed_bytes'])} streamed", end='')
+    if('compiled_bytes' in stats):
+        print(f", compiled {size(stats['compiled_bytes'])}", end='')
+    print()
+
+    for error in report['errors']:
+        print(f"     error: {error}")
+    if(report['compiled']):
+        print(f"     compiled to {report['compiled']}")
+
+    return None
+
+
+def main() -> None:
+    '''
+    Command line entry point.
+    Parameters: None
+    Returns: None
+    '''
+    parser = argparse.ArgumentParser(description='Check, compile and measure levels.')
+    parser.add_argument('paths', nargs='*', default=[HERE], help='level files and folders of them')
+    parser.add_argument('--pattern', default='*.txt', help='level files to pick up in folders')
+    parser.add_argument('--jobs', type=int, default=None, help='worker processes (default: one per core)')
+    parser.add_argument('--no-compile', action='store_true', help="check only, don't compile")
+    parser.add_argument('--out-dir', help='write compiled levels here instead of next to the level')
+    parser.add_argument('--force', action='store_true', help='compile even if up to date')
+    parser.add_argument('--jump-height', type=int, default=JUMP_HEIGHT, help='rows a jump gets up')
+    parser.add_argument('--jump-distance', type=int, default=JUMP_DISTANCE, help='columns a jump gets across')
+    args = parser.parse_args()
+
+    levels = find_levels(args.paths, args.pattern)
+    if(not levels):
+        print('No levels found.')
+        sys.exit(1)
+
+    targets = []
+    for level in levels:
+        target = None
+        if(not args.no_compile):
+            target = os.path.splitext(level)[0] + ps.LevelBinary.EXTENSION
+            if(args.out_dir):
+                os.makedirs(args.out_dir, exist_ok=True)
+                target = os.path.join(args.out_dir, os.path.basename(target))
+        targets.append(target)
+
+    failed = 0
+    with ProcessPoolExecutor(args.jobs) as pool:
+        jobs = [pool.submit(check_level, level, target, args.force,
+                            args.jump_height, args.jump_distance)
+                for level, target in zip(levels, targets)]
+        for level, job in zip(levels, jobs):
+            try:
+                report = job.result()
+            except (OSError, ValueError) as e:
+                print(f"FAIL {level}\n     error: {e}")
+                failed += 1
+                continue
+            print_report(report)
+            failed += bool(report['errors'])
+
+    print(f"{len(levels)} levels, {failed} failed")
+    sys.exit(1 if failed else 0)
+
+
+if(__name__ == '__main__'):
+    main()
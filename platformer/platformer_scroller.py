@@ -3,11 +3,19 @@
 # License: Public Domain
 # TODO: Some messy and rushed code!!
 
+import bisect
+import csv
+import enum
+import json
 import math
+import mmap
+import re
+import struct
 import tkinter as tk
 from tkinter import messagebox
 import time
 import os
+import sys
 
 #-------------------------------------------------------------------DELTA TIME
 
@@ -47,929 +55,4316 @@ class DeltaTime():
         return delta
 
 
-#----------------------------------------------------------------INPUT HANDLER
-
-class InputHandler:
+class FixedTimestep():
     '''
-    Simple keyboard input interface to tkinter
+    Collects frame time and hands it back out in fixed size steps,
+    so physics runs the same no matter the frame rate.
     '''
-    def __init__(self, root : tk.Tk, input_dict : dict):
+    def __init__(self, rate : float, max_steps : int = 8) -> None:
         '''
         Class init
         Parameters:
-            root : tk.Tk - tk root
-            input_dict : dict - dictionary of the format key=keysym val=name
+            rate : float - steps per second
+            max_steps : int - most steps to run in one frame; any time past
+                              that is dropped so a slow frame can't snowball
         Returns: None
         '''
-        self.__input_status = dict() # status of each keysym
-        self.__input_map = dict()    # map of keysyms to names
+        self.__step = 1 / rate
+        self.__max_steps = max_steps
 
-        # Bind generic keyboard events to their respective handlers
-        root.bind(f'<KeyPress>', lambda e: self.__press_key_event(e.keysym))
-        root.bind(f'<KeyRelease>', lambda e: self.__release_key_event(e.keysym))
+        # time waiting to be simulated
+        self.__accumulator = 0
 
-        # Allows us to turn off keyboard repeat (causes havok)
-        root.bind('<FocusIn>', lambda e: os.system("xset r off"))
-        root.bind('<FocusOut>', lambda e: os.system("xset r on"))
+        return None
 
-        # Create our databases of keysyms
-        # Keysyms have a many-to-one relationship to names 
-        for key in input_dict.keys():
-            self.__input_status[input_dict[key]] = 'up'
-            self.__input_map[key] = input_dict[key]
+    def get_step(self) -> float:
+        '''
+        Get the size of one step
+        Parameters: None
+        Returns: float - step in fractional seconds
+        '''
+        return self.__step
+
+    def add(self, delta : float) -> int:
+        '''
+        Add frame time and find out how many steps are due.
+        Parameters:
+            delta : float - frame time in fractional seconds
+        Returns: int - number of steps to run this frame
+        '''
+        self.__accumulator += delta
+
+        steps = int(self.__accumulator / self.__step)
+        if(steps > self.__max_steps):
+            steps = self.__max_steps
+            self.__accumulator = steps * self.__step
 
-    def __del__(self) -> None:
+        self.__accumulator -= steps * self.__step
+        return steps
+
+    def get_alpha(self) -> float:
         '''
-        Called on class deletion. 
-        Turns back on keyboard repeat
+        How far we are between the last step and the next one.
+        Used to blend drawn positions between steps.
         Parameters: None
-        Returns: None
+        Returns: float - 0 to 1
         '''
-        os.system("xset r on")
-        return None
+        return self.__accumulator / self.__step
+
 
-    def __press_key_event(self, keysym : str) -> None:
+class FrameScheduler():
+    '''
+    Paces a main loop to a target frame rate.
+    Sleeps away most of the time left in the frame, then spins for the
+    last bit, since sleep() alone tends to wake up late.
+    '''
+    SPIN_TIME = 0.001 # how close to the deadline we stop sleeping and spin
+
+    def __init__(self, fps_limit : float = 60) -> None:
         '''
-        Generic event handler for a key press.
+        Class init
         Parameters:
-            keysym : str - keysym passed in from event
+            fps_limit : float - target frame rate (0 = unlimited)
         Returns: None
         '''
-        # set the new status in our database
-        if(keysym in self.__input_map):
-            self.__input_status[self.__input_map[keysym]] = 'pressed'
+        self.__fps_limit = fps_limit
+
+        # when the current frame should end
+        self.__deadline = time.perf_counter()
 
         return None
 
-    def __release_key_event(self, keysym : str) -> None:
+    def get_limit(self) -> float:
         '''
-        Generic event handler for a key release.
+        Get the target frame rate
+        Parameters: None
+        Returns: float - frame rate (0 = unlimited)
+        '''
+        return self.__fps_limit
+
+    def set_limit(self, fps_limit : float) -> None:
+        '''
+        Set the target frame rate
         Parameters:
-            keysym : str - keysym passed in from event
+            fps_limit : float - frame rate (0 = unlimited)
         Returns: None
         '''
-        # set the new status in our database        
-        if(keysym in self.__input_map):
-            self.__input_status[self.__input_map[keysym]] = 'released'
-
+        self.__fps_limit = fps_limit
+        self.__deadline = time.perf_counter()
         return None
-        
 
-    def update(self) -> None:
+    def wait(self) -> None:
         '''
-        Updates key status so we know if a key was just pressed/released
-            or is being held down
-        Intended to be called in an update loop.
+        Waits out whatever is left of the current frame.
+        To be called once at the end of every frame. Time spent doing the
+        frame's work counts towards the frame.
         Parameters: None
         Returns: None
         '''
-        for key in self.__input_status.keys():
-            # makes sure a key that was presed is set to down on next frame
-            if(self.__input_status[key] == 'pressed'):
-                self.__input_status[key] = 'down'
-            
-            # makes sure a key that was released is set to up on next frame
-            if(self.__input_status[key] == 'released'):
-                self.__input_status[key] = 'up'
+        if(not self.__fps_limit):
+            return None
+
+        self.__deadline += 1 / self.__fps_limit
+        now = time.perf_counter()
+
+        # we're running behind, so start fresh instead of rushing
+        # through frames to catch up
+        if(now >= self.__deadline):
+            self.__deadline = now
+            return None
+
+        remaining = self.__deadline - now
+        if(remaining > self.SPIN_TIME):
+            time.sleep(remaining - self.SPIN_TIME)
+
+        while(time.perf_counter() < self.__deadline):
+            pass
 
         return None
 
-    def key_is_up(self, name: str) -> bool:
+
+#---------------------------------------------------------------------PROFILER
+
+def percentile(ordered : list[float], percent : float) -> float:
+    '''
+    Nearest rank percentile: the smallest sample with at least percent
+    of the samples at or below it.
+    Parameters:
+        ordered : list[float] - samples, sorted smallest first
+        percent : float - 0 to 100
+    Returns: float - the percentile
+    '''
+    rank = max(0, math.ceil(len(ordered) * percent / 100) - 1)
+    return ordered[rank]
+
+
+class NullProfiler():
+    '''
+    Profiler that doesn't record anything.
+    Stands in for FrameProfiler when nobody is looking.
+    '''
+    def begin_frame(self) -> None:
         '''
-        Checks if a key is up (not pressed down).
-        Parameters:
-            name : str - name of input to check.
-        Returns: bool - result of check.
+        Start timing a frame.
+        Parameters: None
+        Returns: None
         '''
-        if (name in self.__input_status and 
-            (self.__input_status[name] == 'up' or 
-             self.__input_status[name] == 'released')):
-            # key is up
-            return True
-        
-        # key is down
-        return False
+        return None
 
-    def key_is_down(self, name: str) -> bool:
+    def lap(self, stage : str) -> None:
         '''
-        Checks if a key is pressed down.
+        Charge the time since the last lap to a stage.
         Parameters:
-            name : str - name of input to check.
-        Returns: bool - result of check.
+            stage : str - stage name
+        Returns: None
         '''
-        if (name in self.__input_status.keys() and 
-            (self.__input_status[name] == 'down' or 
-             self.__input_status[name] == 'pressed')):
-            
-            # key is pressed down
-            return True
-        
-        # key is not pressed down
-        return False
+        return None
 
-    def key_is_pressed(self, name: str) -> bool:
+    def end_frame(self) -> None:
         '''
-        Checks if a key has just been pressed down (not held).
-        Parameters:
-            name : str - name of input to check.
-        Returns: bool - result of check.
+        Finish timing a frame.
+        Parameters: None
+        Returns: None
         '''
-        if (name in self.__input_status.keys() and 
-            (self.__input_status[name] == 'pressed')):
-
-            # key has just been pressed down
-            return True
-        
-        # Key has not just been pressed down
-        return False
+        return None
 
-    def key_is_released(self, name: str) -> bool:
+    def draw(self, canvas : tk.Canvas) -> None:
         '''
-        Checks if a key has just been released this frame.
+        Draws the overlay (or in this case, doesn't).
         Parameters:
-            name : str - name of input to check.
-        Returns: bool - result of check.
+            canvas : tk.Canvas - canvas to draw on
+        Returns: None
         '''
-        if (name in self.__input_status.keys() and 
-            (self.__input_status[name] == 'released')):
+        return None
 
-            # Key has just been released
-            return True
-        
-        # key was not just released
-        return False
-        
+    def undraw(self, canvas : tk.Canvas) -> None:
+        '''
+        Removes the overlay from canvas (there isn't one).
+        Parameters:
+            canvas : tk.Canvas - canvas to remove from
+        Returns: None
+        '''
+        return None
 
-#----------------------------------------------------------------------HIT BOX
 
-class HitBox:
+class FrameProfiler(NullProfiler):
     '''
-    Contains information of a rectangle.
-    Can be used to to check intersection with another hitbox
+    Records how long each stage of a frame takes for the last few
+    hundred frames, and can show it as an overlay on a canvas.
+    Stages are timed as laps: every lap() charges the time since the
+    previous one to the named stage.
     '''
-    def __init__(self, x=0, y=0, w=0, h=0):
+    STAGES = ('input', 'collision', 'update', 'draw', 'tk') # stages we time
+    COLORS = ('#3c78d8', '#cc0000', '#6aa84f', '#f1c232', '#8e7cc3') # bar colors
+    REFRESH = 0.25 # seconds between overlay refreshes
+
+    def __init__(self, size : int = 600) -> None:
         '''
         Class init
         Parameters:
-            x : float - x position (center aligned)
-            y : float - y position (center aligned)
-            w : float - width
-            h : float - height
+            size : int - number of frames to keep
         Returns: None
         '''
-        self.__x_pos = x
-        self.__y_pos = y
-        self.__w = w
-        self.__h = h
+        self.__size = size
 
-        # Outline color for debug drawing
-        self.__outline = 'red'
+        # total frames recorded, the ring buffer slot is this mod size
+        self.__count = 0
+
+        # ring buffers: frame work time, time between frame starts
+        # and time spent in each stage
+        self.__frame_times = [0.0] * size
+        self.__intervals = [0.0] * size
+        self.__stage_times = dict()
+        for stage in self.STAGES:
+            self.__stage_times[stage] = [0.0] * size
+
+        # the frame being recorded
+        self.__current = dict.fromkeys(self.STAGES, 0.0)
+        self.__frame_start = None
+        self.__last_start = None
+        self.__last_lap = None
+
+        # overlay canvas items and when they were last refreshed
+        self.__handles = None
+        self.__drawn_time = 0
 
         return None
 
-    def debug_draw(self, canvas : tk.Canvas) -> None:
+    def begin_frame(self) -> None:
         '''
-        Draws outline of hitbox.
-        Parameters:
-            canvas : tk.Canvas - canvas objet to draw to.
+        Start timing a frame.
+        Parameters: None
         Returns: None
         '''
-        # Draw the rectangle to (0,0) then move it to the correct spot.
-        # Makes the math a little easier.
-        handle = canvas.create_rectangle(0, 0, self.__w, self.__h, 
-                                         fill='', outline=self.__outline)
-        canvas.moveto(handle, self.__x_pos - (self.__w / 2), 
-                      self.__y_pos - (self.__h / 2))
+        now = time.perf_counter()
+        self.__last_start = self.__frame_start
+        self.__frame_start = now
+        self.__last_lap = now
+        for stage in self.__current:
+            self.__current[stage] = 0.0
         return None
-    
-    def set_outline(self, outline : str) -> None:
+
+    def lap(self, stage : str) -> None:
         '''
-        Sets outline color.
+        Charge the time since the last lap to a stage.
         Parameters:
-            outline : str - outline color
+            stage : str - stage name
         Returns: None
         '''
-        self.__outline = outline
+        if(self.__last_lap is None):
+            return None
+
+        now = time.perf_counter()
+        self.__current[stage] += now - self.__last_lap
+        self.__last_lap = now
         return None
-    
-    def get_attribs(self) -> tuple[float, float, float, float]:
-        '''
-        Get the x, y, w, h attributes as a tuple.
-        Parameters:
-            None.
-        Returns: tuple[float, float, float, float] - our attributes
-        '''
-        return self.__x_pos, self.__y_pos, self.__w, self.__h
-    
-    def move(self, x : float = None, y : float = None) -> None:
+
+    def end_frame(self) -> None:
         '''
-        Move the hitbox.
-        Parameters:
-            x : float - x position
-            y : float - y position
+        Finish timing a frame and store it in the ring buffer.
+        Parameters: None
         Returns: None
         '''
-        self.__x_pos = x or self.__x_pos
-        self.__y_pos = y or self.__y_pos
+        if(self.__frame_start is None):
+            return None
+
+        slot = self.__count % self.__size
+        self.__frame_times[slot] = time.perf_counter() - self.__frame_start
+        self.__intervals[slot] = 0.0
+        if(self.__last_start is not None):
+            self.__intervals[slot] = self.__frame_start - self.__last_start
+        for stage in self.STAGES:
+            self.__stage_times[stage][slot] = self.__current[stage]
+
+        self.__count += 1
         return None
 
-    def resize(self, w : float = None, h : float = None) -> None:
+    def __slots_in_order(self) -> list[int]:
         '''
-        Resize our hit box.
-        Parameters:
-            w : float - width
-            h : float - height
-        Returns: none
+        Ring buffer slots holding frames, oldest first.
+        Parameters: None
+        Returns: list[int] - slots
         '''
-        self.__w = w or self.__w
-        self.__h = h or self.__h
-        return None
-    
-    def box_hit_test(self, hit_box : 'HitBox'):
+        if(self.__count < self.__size):
+            return list(range(self.__count))
+        start = self.__count % self.__size
+        return list(range(start, self.__size)) + list(range(0, start))
+
+    def get_stats(self) -> dict:
         '''
-        Checks for a colission with another HitBox object.
-        Parameters:
-            hit_box : HitBox - hit box to check against.
+        Summarize the frames in the buffer.
+        Parameters: None
+        Returns: dict - fps, frame time percentiles in ms ('p50', 'p90', 
+                 'p99') and the mean ms of each stage (by stage name)
         '''
+        slots = self.__slots_in_order()
+        stats = {'fps' : 0.0, 'p50' : 0.0, 'p90' : 0.0, 'p99' : 0.0}
+        stats.update(dict.fromkeys(self.STAGES, 0.0))
+        if(not slots):
+            return stats
 
-        # get the basic hit box data
-        x1, y1, width1, height1 = self.get_attribs()
-        x2, y2, width2, height2 = hit_box.get_attribs() 
+        frame_times = sorted(self.__frame_times[slot] for slot in slots)
+        for name, percent in (('p50', 50), ('p90', 90), ('p99', 99)):
+            stats[name] = percentile(frame_times, percent) * 1000
 
-        # This check is just a series of inequality checks.
-        # This function assumes the center is our anchor
-        #   So we need to adjust the values a bit.
-        # 
-        corner1_x = x1 - (width1/2)
-        corner1_y = y1 - (height1/2)
-        corner2_x = x2 - (width2/2)
-        corner2_y = y2 - (height2/2)
-        if(corner1_x < corner2_x + width2 and corner1_x + width1 > corner2_x and 
-        corner1_y < corner2_y + height2 and corner1_y + height1 > corner2_y):
-            return True # colission!
-        
-        # no colission!
-        return False
-    
+        elapsed = sum(self.__intervals[slot] for slot in slots)
+        if(elapsed > 0):
+            stats['fps'] = len(slots) / elapsed
 
-#------------------------------------------------------------------IMAGE CACHE
-class ImageCache:
-    '''
-    Loads and stores images.
-    '''
-    def __init__(self) -> None:
+        for stage in self.STAGES:
+            stats[stage] = (sum(self.__stage_times[stage][slot] for slot in slots) 
+                            / len(slots)) * 1000
+
+        return stats
+
+    def dump_csv(self, path : str) -> None:
         '''
-        Class init
-        Parameters: None.
+        Write the frames in the buffer out as CSV, oldest first.
+        Times are in milliseconds.
+        Parameters:
+            path : str - file to write
         Returns: None
         '''
-        # create our database
-        self.__Cache = dict()
-
+        first = self.__count - len(self.__slots_in_order())
+        try:
+            with open(path, 'w', newline='') as out_file:
+                writer = csv.writer(out_file)
+                writer.writerow(['frame', 'frame_ms', 'interval_ms'] + 
+                                [f'{stage}_ms' for stage in self.STAGES])
+                for i, slot in enumerate(self.__slots_in_order()):
+                    writer.writerow([first + i, 
+                                     f'{self.__frame_times[slot] * 1000:.4f}', 
+                                     f'{self.__intervals[slot] * 1000:.4f}'] + 
+                                    [f'{self.__stage_times[stage][slot] * 1000:.4f}' 
+                                     for stage in self.STAGES])
+        except IOError as e:
+            print(f"Had trouble writing {path}!")
         return None
-        
-    def load_image(self, name : str, path : str) -> None:
+
+    def draw(self, canvas : tk.Canvas) -> None:
         '''
-        Load and store an image
-        Parameters: 
-            name : str - name of image
-            path : str - file path of image
+        Draws the overlay in the top left of the canvas.
+        Items are created once; their text and bars are refreshed a few
+        times a second.
+        Parameters:
+            canvas : tk.Canvas - canvas to draw to.
         Returns: None
         '''
-        # store into database with name as key
-        self.__Cache[name] = tk.PhotoImage(file=path)
+        X = 10          # left edge of the overlay
+        Y = 10          # top edge of the overlay
+        LINE = 18       # line height
+        BAR_X = X + 90  # left edge of the bars
+        MS_WIDTH = 20   # bar pixels per ms
+        FONT = ('Courier', 11)
+        TAGS = ('profiler',)
+
+        if(self.__handles is None):
+            self.__handles = dict()
+            canvas.create_rectangle(X - 5, Y - 5, X + 330, Y + (LINE * (len(self.STAGES) + 2)), 
+                                    fill='black', outline='', stipple='gray50', tags=TAGS)
+            self.__handles['fps'] = canvas.create_text(X, Y, anchor='nw', fill='white', 
+                                                       font=FONT, tags=TAGS)
+            self.__handles['times'] = canvas.create_text(X, Y + LINE, anchor='nw', fill='white', 
+                                                         font=FONT, tags=TAGS)
+            for i, stage in enumerate(self.STAGES):
+                y = Y + (LINE * (i + 2))
+                canvas.create_text(X, y, anchor='nw', fill='white', font=FONT, text=stage, 
+                                   tags=TAGS)
+                self.__handles[stage] = canvas.create_rectangle(BAR_X, y + 3, BAR_X, y + LINE - 3, 
+                                                                fill=self.COLORS[i], outline='', 
+                                                                tags=TAGS)
+                self.__handles[stage + '_ms'] = canvas.create_text(X + 325, y, anchor='ne', 
+                                                                   fill='white', font=FONT, 
+                                                                   tags=TAGS)
+            self.__drawn_time = 0
+
+        # stay on top of anything that came on screen since last frame
+        canvas.tag_raise('profiler')
+
+        now = time.perf_counter()
+        if(now - self.__drawn_time < self.REFRESH):
+            return None
+        self.__drawn_time = now
+
+        stats = self.get_stats()
+        canvas.itemconfigure(self.__handles['fps'], text=f"FPS: {stats['fps']:.1f}")
+        canvas.itemconfigure(self.__handles['times'], 
+                             text=f"p50 {stats['p50']:.2f} p90 {stats['p90']:.2f} "
+                                  f"p99 {stats['p99']:.2f} ms")
+        for i, stage in enumerate(self.STAGES):
+            y = Y + (LINE * (i + 2))
+            width = min(stats[stage] * MS_WIDTH, 170)
+            canvas.coords(self.__handles[stage], BAR_X, y + 3, BAR_X + width, y + LINE - 3)
+            canvas.itemconfigure(self.__handles[stage + '_ms'], text=f"{stats[stage]:.2f}")
 
         return None
 
-    def get(self, name : str) -> tk.PhotoImage:
+    def undraw(self, canvas : tk.Canvas) -> None:
         '''
-        Gets an image from database.
+        Removes the overlay from canvas.
         Parameters:
-            name : str - name of image
-        Returns: tk.Photoimage - image from databse.
-                 None type is name was not found. 
+            canvas : tk.Canvas - canvas to remove from.
+        Returns: None
         '''
-        if(name in self.__Cache):
-            return self.__Cache[name]
-        
+        if(self.__handles is not None):
+            canvas.delete('profiler')
+            self.__handles = None
         return None
-    
 
-#------------------------------------------------------------------GAME OBJECT
-    
-class GameObject:
+
+#----------------------------------------------------------------INPUT HANDLER
+
+class InputState:
     '''
-    Abstract GameObject class.
-    All GameObjects inherit this.
+    Keeps track of named inputs being pressed, held down and released.
+    Doesn't care where the input comes from, see InputHandler and
+    ScriptedInput.
+    Each input is a bit, so the state is a few ints. Presses and releases
+    are latched until the next update(), so a tap that starts and ends
+    between two updates still counts as pressed.
     '''
-    def __init__(self, x : float, y : float, w : float, h : float) -> None:
+    def __init__(self, names : list[str]) -> None:
         '''
         Class init
         Parameters:
-            x : float - x position
-            y : float - y position
-            w : float - width
-            h : float - height
+            names : list[str] - names of the inputs to track
         Returns: None
         '''
-        self.__x = x
-        self.__y = y
-        self.__w = w
-        self.__h = h
+        # name -> its bit
+        self.__bits = dict()
+        for name in names:
+            self.__bits.setdefault(name, 1 << len(self.__bits))
 
-        # messages sent to communicate with game object
-        self.__signals = []
+        self.__down = 0     # inputs down right now
+        self.__previous = 0 # inputs down at the last update()
+        self.__pressed = 0  # inputs pressed since the last update()
+        self.__released = 0 # inputs released since the last update()
 
-        # by default a GameObject will not have a sprite or hitbox 
-        self.__sprite : tk.PhotoImage = None
-        self.__hit_box : HitBox = None
+        # (time, name, True for press/False for release) since the last update()
+        self.__events : list[tuple[float, str, bool]] = []
+
+        # where update() writes each step to, see start_recording()
+        self.__recorder : InputRecorder = None
 
         return None
-    
-    def pop_signal(self) -> str :
+
+    def press(self, name : str, timestamp : float = None) -> None:
         '''
-        Pops a signal off of signal stack
-        Parameters: None
-        Returns: str - signal or None if empty 
+        Marks an input as just pressed.
+        Parameters:
+            name : str - name of input
+            timestamp : float - when it happened (None for now), 
+                                in time.perf_counter() seconds
+        Returns: None
         '''
-        if(len(self.__signals) > 0):
-            return self.__signals.pop()
-        return ''
-    
-    def push_signal(self, signal : str) -> None :
+        bit = self.__bits.get(name, 0)
+        if(bit):
+            # only an up to down change is a press, not a repeat
+            if(not (self.__down & bit)):
+                self.__pressed |= bit
+            self.__down |= bit
+            self.__events.append((time.perf_counter() if timestamp is None else timestamp, name, True))
+
+        return None
+
+    def release(self, name : str, timestamp : float = None) -> None:
         '''
-        Pushes a signal onto signal stack
-        Parameters: 
-            signal : str - signal we wanna push
+        Marks an input as just released.
+        Parameters:
+            name : str - name of input
+            timestamp : float - when it happened (None for now), 
+                                in time.perf_counter() seconds
         Returns: None
         '''
-        self.__signals.append(signal)
+        bit = self.__bits.get(name, 0)
+        if(bit):
+            if(self.__down & bit):
+                self.__released |= bit
+            self.__down &= ~bit
+            self.__events.append((time.perf_counter() if timestamp is None else timestamp, name, False))
+
         return None
-    
-    def get_attribs(self) -> tuple[float, float, float, float]:
-        '''
-        Returns The four main GameObject attributes as a tuple.
-        Parameters: None
-        Returns: tuple[float, float, float, float] - x, y, width, height
-        '''
-        return self.__x, self.__y, self.__w, self.__h
+        
 
-    def get_hit_box(self) -> HitBox :
+    def update(self, delta : float = 0.0) -> None:
         '''
-        Getter for HitBox
-        Parameters: None
-        Returns GameObject HitBox
+        Ends the current tick: forgets what was pressed and released
+            during it, so we know if a key was just pressed/released
+            or is being held down
+        Intended to be called in an update loop.
+        Parameters:
+            delta : float - length of the tick in fractional seconds,
+                            for the recording
+        Returns: None
         '''
-        return self.__hit_box
-    
-    def set_hit_box(self, hit_box : HitBox) -> None :
+        if(self.__recorder is not None):
+            self.__recorder.write_frame(delta, self.__down, self.__pressed, self.__released)
+
+        self.__previous = self.__down
+        self.__pressed = 0
+        self.__released = 0
+        self.__events.clear()
+        return None
+
+    def set_state(self, down : int, pressed : int, released : int) -> None:
         '''
-        Setter for HitBox
-        Parameters: 
-            hit_box : HitBox - HitBox were setting to. 
+        Set the whole state from bitsets, see get_state().
+        Parameters:
+            down : int - inputs down
+            pressed : int - inputs pressed since the last update()
+            released : int - inputs released since the last update()
         Returns: None
         '''
-        self.__hit_box = hit_box
+        self.__down = down
+        self.__pressed = pressed
+        self.__released = released
         return None
-    
-    def draw_hitbox(self, canvas : tk.Canvas) -> None:
+
+    def start_recording(self, recorder : 'InputRecorder') -> None:
         '''
-        Debug drawing feature for HitBox
+        Record the state of every tick from now on, see update().
         Parameters:
-            canvas : tk.Canvase - Canvas objet to draw to.
-        Returns None.
+            recorder : InputRecorder - log to write to
+        Returns: None
         '''
-        if(self.__hit_box):
-            self.__hit_box.debug_draw(canvas)
-    
-    def set_sprite(self, image : tk.PhotoImage) -> None :
+        self.stop_recording()
+        self.__recorder = recorder
+        return None
+
+    def stop_recording(self) -> None:
         '''
-        Setter for sprite
-        Parameters: 
-            image : tk.PhotoImage - image were setting to. 
+        Stop recording and close the log, if we are recording.
+        Parameters: None
         Returns: None
         '''
-        self.__sprite = image
+        if(self.__recorder is not None):
+            self.__recorder.close()
+            self.__recorder = None
+        return None
 
-    def hit_test(self, game_object : 'GameObject') -> bool :
+    def get_names(self) -> list[str]:
         '''
-        Check colission against another GameObject
-        Parameters: 
-            game_object : GamrObject to check against.
-        Returns: bool - the result
+        Get the names of the inputs we track.
+        Parameters: None
+        Returns: list[str] - names, in bit order
         '''
-        hit_box = game_object.get_hit_box()
+        return list(self.__bits)
 
-        # if both GameObjects have a hit box
-        if(self.__hit_box and hit_box):
-            # Check colission
-            return self.__hit_box.box_hit_test(hit_box)
-        
-        # else returns False
-        return False
-    
-    def move(self, x : float = None, y : float = None) -> None:
+    def get_bit(self, name : str) -> int:
         '''
-        Move GameObject tp specific loation.
+        Get the bit an input uses in the state bitsets.
         Parameters:
-            x : float - x position
-            y : float - y position
-        Returns: None
+            name : str - name of input
+        Returns: int - its bit, 0 for inputs we don't track
         '''
-        self.__x = x or self.__x
-        self.__y = y or self.__y
+        return self.__bits.get(name, 0)
 
-        # move the hit box with it
-        if(self.__hit_box):
-            self.__hit_box.move(self.__x, self.__y)
+    def get_state(self) -> tuple[int, int, int]:
+        '''
+        Get the whole state as bitsets, see get_bit().
+        Parameters: None
+        Returns: tuple[int, int, int] - inputs down, pressed since the
+                 last update() and released since the last update()
+        '''
+        return self.__down, self.__pressed, self.__released
 
-        return None
+    def get_events(self) -> list[tuple[float, str, bool]]:
+        '''
+        Get every press and release since the last update(), in order.
+        Parameters: None
+        Returns: list[tuple[float, str, bool]] - time, input name and
+                 True for a press or False for a release
+        '''
+        return list(self.__events)
 
-    def move_relative(self, x : float = 0, y : float = 0) -> None:
+    def key_is_up(self, name: str) -> bool:
         '''
-        Move GameObject relative from wher it os.
+        Checks if a key is up (not pressed down).
         Parameters:
-            x : float - x movement
-            y : float - y movement
-        Returns: None
+            name : str - name of input to check.
+        Returns: bool - result of check.
         '''
-        self.__x += x
-        self.__y += y
-
-        # move the hit box with it
-        if(self.__hit_box):
-            self.__hit_box.move(self.__x, self.__y)
+        bit = self.__bits.get(name, 0)
+        return bool(bit) and not (self.__down & bit)
 
-        return None
+    def key_is_down(self, name: str) -> bool:
+        '''
+        Checks if a key is pressed down.
+        Parameters:
+            name : str - name of input to check.
+        Returns: bool - result of check.
+        '''
+        return bool(self.__down & self.__bits.get(name, 0))
 
-    def draw(self, canvas : tk.Canvas) -> None:
+    def key_is_pressed(self, name: str) -> bool:
         '''
-        Draws game object to canvas.
+        Checks if a key has been pressed since the last update(), even
+        if it has been let go again already.
         Parameters:
-            canvas : tk.Canvas - canvas to draw to.
-        Returns: None
+            name : str - name of input to check.
+        Returns: bool - result of check.
         '''
-        if(self.__sprite):
-            canvas.create_image(self.__x, self.__y, anchor='c', image=self.__sprite)
-        return None
-    
-    def update(self, delta : float) -> None : 
+        return bool(self.__pressed & self.__bits.get(name, 0))
+
+    def key_is_released(self, name: str) -> bool:
         '''
-        'Virtual' update function.
+        Checks if a key has been released since the last update(), even
+        if it has been pressed again already.
         Parameters:
-            delta - delta time in fraction seconds.
-        Returns: None
+            name : str - name of input to check.
+        Returns: bool - result of check.
         '''
-        return None
+        return bool(self.__released & self.__bits.get(name, 0))
 
+    def key_went_down(self, name: str) -> bool:
+        '''
+        Checks if a key is down now and wasn't at the last update().
+        Unlike key_is_pressed() this misses taps between updates.
+        Parameters:
+            name : str - name of input to check.
+        Returns: bool - result of check.
+        '''
+        bit = self.__bits.get(name, 0)
+        return bool(self.__down & ~self.__previous & bit)
+        
 
-#------------------------------------------------------GAME OBJECT DEFINITIONS
-    
-class GroundTile(GameObject):
+class InputHandler(InputState):
     '''
-    The game's floor/ground
+    Simple keyboard input interface to tkinter
+    Holding a key down makes X send a release and a press for every key
+    repeat, both with the same time stamp. Releases are held back until
+    Tk is idle, and dropped if the press of a repeat turned up first.
     '''
-    def __init__(self, x: float, y: float,  image_cache : ImageCache) -> None:
+    REPEAT_TIME = 1 # most ms between the release and press of a key repeat
+
+    def __init__(self, root : tk.Tk, input_dict : dict):
         '''
         Class init
         Parameters:
-            x : float - x position
-            y : float - y position
-            image_cache : ImageCache - to obtain texture
+            root : tk.Tk - tk root
+            input_dict : dict - dictionary of the format key=keysym val=name
         Returns: None
         '''
-        WIDTH = HEIGHT = 40
-        super().__init__(x, y, WIDTH, HEIGHT)
+        # Keysyms have a many-to-one relationship to names 
+        super().__init__(input_dict.values())
 
-        self.set_sprite(image_cache.get('ground'))
+        self.__root = root
+        self.__input_map = dict()    # map of keysyms to names
 
-        # lets make the hit box slightly smaller
-        self.set_hit_box(HitBox(x, y, WIDTH, HEIGHT - 2))
+        # keysym -> (time, serial, after id) of a release we are holding
+        # back in case it's a key repeat
+        self.__held_releases = dict()
 
-        return None
+        # Bind generic keyboard events to their respective handlers
+        root.bind(f'<KeyPress>', lambda e: self.__press_key_event(e))
+        root.bind(f'<KeyRelease>', lambda e: self.__release_key_event(e))
 
-class GrassTile(GameObject):
-    '''
-    Decerative grass
-    '''
-    def __init__(self, x: float, y: float,  image_cache : ImageCache) -> None:
+        # Create our database of keysyms
+        for key in input_dict.keys():
+            self.__input_map[key] = input_dict[key]
+
+    def __press_key_event(self, event : tk.Event) -> None:
         '''
-        Class init
+        Generic event handler for a key press.
         Parameters:
-            x : float - x position
-            y : float - y position
-            image_cache : ImageCache - to obtain texture
+            event : tk.Event - key press event
         Returns: None
         '''
-        WIDTH = HEIGHT = 40
-        super().__init__(x, y, WIDTH, HEIGHT)
-        self.set_sprite(image_cache.get('grass'))
+        keysym = event.keysym
+        if(keysym not in self.__input_map):
+            return None
+
+        if(keysym in self.__held_releases):
+            release_time, release_serial, after_id = self.__held_releases.pop(keysym)
+            self.__root.after_cancel(after_id)
+
+            # a key repeat: the key never really went up
+            if(0 <= event.time - release_time <= self.REPEAT_TIME and event.serial >= release_serial):
+                return None
+
+            self.release(self.__input_map[keysym])
+
+        self.press(self.__input_map[keysym])
 
         return None
 
-class CoinTile(GameObject):
-    def __init__(self, x: float, y: float,  image_cache : ImageCache) -> None:
+    def __release_key_event(self, event : tk.Event) -> None:
         '''
-        Class init
+        Generic event handler for a key release.
         Parameters:
-            x : float - x position
-            y : float - y position
-            image_cache : ImageCache - to obtain texture
+            event : tk.Event - key release event
         Returns: None
         '''
-        WIDTH = HEIGHT = 40
-        super().__init__(x, y, WIDTH, HEIGHT)
+        keysym = event.keysym
+        if(keysym not in self.__input_map):
+            return None
 
-        self.set_sprite(image_cache.get('coin'))
-        self.set_hit_box(HitBox(x, y, WIDTH, HEIGHT))
+        if(keysym in self.__held_releases):
+            self.__root.after_cancel(self.__held_releases[keysym][2])
 
-        # direction of animation
-        self.__dir = 'up'
-        # animation travel
-        self.__y_travel = 0
+        # the press of a key repeat is already queued behind us, so
+        # by the time Tk is idle we know if this was one
+        after_id = self.__root.after_idle(self.__held_release, keysym)
+        self.__held_releases[keysym] = (event.time, event.serial, after_id)
 
         return None
 
-    def update(self, delta: float) -> None:
+    def __held_release(self, keysym : str) -> None:
         '''
-        Update coin's animation.
+        Applies a release that turned out not to be a key repeat.
         Parameters:
-            delta : float - dealta time in fractional seconds
+            keysym : str - keysym of the released key
         Returns: None
         '''
-        SPEED = 40
-        UPPER_BOUND = -10
-        LOWER_BOUND = 0
-        if(self.__dir == 'down'):
-            self.move_relative(0, SPEED * delta)
-            self.__y_travel += SPEED * delta
-        else:
-            self.move_relative(0, -SPEED * delta)
-            self.__y_travel += -SPEED * delta
+        if(self.__held_releases.pop(keysym, None) is not None):
+            self.release(self.__input_map[keysym])
 
-        if(self.__y_travel < UPPER_BOUND):
-            self.__dir = 'down'
-        elif(self.__y_travel > LOWER_BOUND):
-            self.__dir = 'up'
+        return None
 
-        return super().update(delta)
-    
-class CloudTile(GameObject):
+
+class ScriptedInput(InputState):
     '''
-    Decorative cloud
+    Input that plays back a script instead of reading the keyboard.
+    Used to drive a World without Tk.
     '''
-    def __init__(self, x: float, y: float,  image_cache : ImageCache) -> None:
+    def __init__(self, names : list[str], script : dict[int, list[tuple[str, str]]] = None) -> None:
         '''
         Class init
         Parameters:
-            x : float - x position
-            y : float - y position
-            image_cache : ImageCache - to obtain texture
+            names : list[str] - names of the inputs to track
+            script : dict[int, list[tuple[str, str]]] - frame number -> list of
+                     ('press' or 'release', name) to apply on that frame
         Returns: None
         '''
-        WIDTH = HEIGHT = 80
-        super().__init__(x, y, WIDTH, HEIGHT)
-        self.set_sprite(image_cache.get('cloud'))
+        super().__init__(names)
+
+        self.__script = script or dict()
+
+        # frame we are on, counts up every update()
+        self.__frame = 0
+        self.__play_frame()
 
         return None
 
-class PalmTile(GameObject):
-    '''
-    Decorative palm tree
-    '''
-    def __init__(self, x: float, y: float,  image_cache : ImageCache) -> None:
+    def __play_frame(self) -> None:
         '''
-        Class init
-        Parameters:
-            x : float - x position
-            y : float - y position
-            image_cache : ImageCache - to obtain texture
+        Apply the script entries for the current frame.
+        Parameters: None
         Returns: None
         '''
-        WIDTH = 80
-        HEIGHT = 120
-        super().__init__(x, y, WIDTH, HEIGHT)
-        self.set_sprite(image_cache.get('palm'))
+        for action, name in self.__script.get(self.__frame, ()):
+            if(action == 'press'):
+                self.press(name)
+            elif(action == 'release'):
+                self.release(name)
+        return None
 
+    def update(self, delta : float = 0.0) -> None:
+        '''
+        Moves on to the next frame of the script.
+        Intended to be called in an update loop.
+        Parameters:
+            delta : float - step length in fractional seconds
+        Returns: None
+        '''
+        super().update(delta)
+        self.__frame += 1
+        self.__play_frame()
         return None
 
-class ExitTile(GameObject):
+
+class InputRecorder:
     '''
-    Reach this to win the level.
+    Writes the input state of every step to a binary log, so a session
+    can be played back exactly with ReplayInput.
+    Layout, little endian:
+        header - MAGIC, version, then the lengths of the two strings after it
+        names  - input names, newline separated, in bit order (utf-8)
+        level  - path of the level played (utf-8)
+        frames - FRAME per step: delta time, then inputs down, pressed
+                 and released as bitsets (see InputState.get_state())
     '''
-    def __init__(self, x: float, y: float,  image_cache : ImageCache) -> None:
+    MAGIC = b'RPL1'
+    VERSION = 1
+    HEADER = struct.Struct('<4sHHH') # magic, version, names length, level length
+    FRAME = struct.Struct('<dHHH')   # delta, down, pressed, released
+    MAX_INPUTS = 16                  # bits in a FRAME bitset
+
+    def __init__(self, path : str, names : list[str], level_path : str = '') -> None:
         '''
         Class init
         Parameters:
-            x : float - x position
-            y : float - y position
-            image_cache : ImageCache - to obtain texture
+            path : str - where to write the log
+            names : list[str] - input names, in bit order (see InputState.get_names())
+            level_path : str - level being played, for replaying later
         Returns: None
         '''
-        WIDTH = HEIGHT = 40
-        super().__init__(x, y, WIDTH, HEIGHT)
-        
-        self.set_hit_box(HitBox(x, y, WIDTH, HEIGHT))
-        self.set_sprite(image_cache.get('exit'))
+        if(len(names) > self.MAX_INPUTS):
+            raise ValueError(f"can only record {self.MAX_INPUTS} inputs, not {len(names)}")
 
-        self.__dir = 'down'
-        self.y_travel = 0
+        names_data = '\n'.join(names).encode('utf-8')
+        level_data = level_path.encode('utf-8')
+
+        self.__path = path
+        self.__frames = 0
+        self.__file = open(path, 'wb')
+        self.__file.write(self.HEADER.pack(self.MAGIC, self.VERSION, len(names_data), len(level_data)))
+        self.__file.write(names_data)
+        self.__file.write(level_data)
 
         return None
 
-    def update(self, delta: float) -> None:
+    def write_frame(self, delta : float, down : int, pressed : int, released : int) -> None:
         '''
-        Update signs's animation.
+        Record one step.
         Parameters:
-            delta : float - dealta time in fractional seconds
+            delta : float - step length in fractional seconds
+            down : int - inputs down, as a bitset
+            pressed : int - inputs pressed during the step, as a bitset
+            released : int - inputs released during the step, as a bitset
         Returns: None
         '''
-        SPEED = 40
-        UPPERBOUND = -5
-        LOWERBOUND = 5
-        if(self.__dir == 'down'):
-            self.move_relative(0, SPEED * delta)
-            self.y_travel += SPEED * delta
-        else:
-            self.move_relative(0, -SPEED * delta)
-            self.y_travel += -SPEED * delta
+        if(self.__file is not None):
+            self.__file.write(self.FRAME.pack(delta, down, pressed, released))
+            self.__frames += 1
+        return None
 
-        if(self.y_travel < UPPERBOUND):
-            self.__dir = 'down'
-        elif(self.y_travel > LOWERBOUND):
-            self.__dir = 'up'
+    def get_path(self) -> str:
+        '''
+        Get where the log is being written.
+        Parameters: None
+        Returns: str - path to the log
+        '''
+        return self.__path
 
-        return super().update(delta)
+    def get_frame_count(self) -> int:
+        '''
+        Get the number of steps recorded so far.
+        Parameters: None
+        Returns: int - steps
+        '''
+        return self.__frames
 
-class Jerk(GameObject):
+    def close(self) -> None:
+        '''
+        Done recording, closes the log.
+        Parameters: None
+        Returns: None
+        '''
+        if(self.__file is not None):
+            self.__file.close()
+            self.__file = None
+        return None
+
+
+class ReplayInput(InputState):
     '''
-    The game's "monster"
+    Input that plays back a log written by InputRecorder, a step at a
+    time, along with the delta time each step was recorded with.
     '''
-    def __init__(self, x: float, y: float,  image_cache : ImageCache) -> None:
+    def __init__(self, path : str) -> None:
+        '''
+        Class init
+        Parameters:
+            path : str - log to play back
+        Returns: None
+        '''
+        with open(path, 'rb') as in_file:
+            data = in_file.read()
+
+        header = InputRecorder.HEADER
+        if(len(data) < header.size or data[:4] != InputRecorder.MAGIC):
+            raise ValueError(f"{path} isn't an input recording")
+
+        magic, version, names_length, level_length = header.unpack_from(data)
+        if(version != InputRecorder.VERSION):
+            raise ValueError(f"{path} is version {version}, expected {InputRecorder.VERSION}")
+
+        start = header.size
+        names = data[start:start + names_length].decode('utf-8').split('\n')
+        start += names_length
+        self.__level_path = data[start:start + level_length].decode('utf-8')
+        start += level_length
+
+        # a log cut short mid frame just loses that frame
+        end = start + (((len(data) - start) // InputRecorder.FRAME.size) * InputRecorder.FRAME.size)
+        self.__frames = list(InputRecorder.FRAME.iter_unpack(data[start:end]))
+
+        super().__init__(names)
+
+        # step we are on, counts up every update()
+        self.__frame = 0
+        self.__play_frame()
+
+        return None
+
+    def __play_frame(self) -> None:
+        '''
+        Apply the recorded state for the current step.
+        Parameters: None
+        Returns: None
+        '''
+        if(self.__frame < len(self.__frames)):
+            self.set_state(*self.__frames[self.__frame][1:])
+        return None
+
+    def update(self, delta : float = 0.0) -> None:
+        '''
+        Moves on to the next step of the log.
+        Intended to be called in an update loop.
+        Parameters:
+            delta : float - step length in fractional seconds
+        Returns: None
+        '''
+        super().update(delta)
+        self.__frame += 1
+        self.__play_frame()
+        return None
+
+    def get_delta(self) -> float:
+        '''
+        Get the delta time the current step was recorded with.
+        Parameters: None
+        Returns: float - step length in fractional seconds
+                 None type once the log has run out
+        '''
+        if(self.__frame < len(self.__frames)):
+            return self.__frames[self.__frame][0]
+        return None
+
+    def get_frame_count(self) -> int:
+        '''
+        Get the number of steps in the log.
+        Parameters: None
+        Returns: int - steps
+        '''
+        return len(self.__frames)
+
+    def get_duration(self) -> float:
+        '''
+        Get how long the recorded session took to play.
+        Parameters: None
+        Returns: float - sum of the recorded delta times, in seconds
+        '''
+        return math.fsum(frame[0] for frame in self.__frames)
+
+    def get_level_path(self) -> str:
+        '''
+        Get the level the log was recorded on.
+        Parameters: None
+        Returns: str - level path, as the game opened it
+        '''
+        return self.__level_path
+
+
+#----------------------------------------------------------------------HIT BOX
+
+class HitBox:
+    '''
+    Contains information of a rectangle.
+    Can be used to to check intersection with another hitbox
+    '''
+    # levels make thousands of these, so skip the per instance __dict__
+    __slots__ = ('__x_pos', '__y_pos', '__w', '__h', '__outline', '__handle')
+
+    def __init__(self, x=0, y=0, w=0, h=0):
         '''
         Class init
+        Parameters:
+            x : float - x position (center aligned)
+            y : float - y position (center aligned)
+            w : float - width
+            h : float - height
+        Returns: None
+        '''
+        self.__x_pos = x
+        self.__y_pos = y
+        self.__w = w
+        self.__h = h
+
+        # Outline color for debug drawing
+        self.__outline = 'red'
+
+        # canvas item for debug drawing, created on first draw
+        self.__handle = None
+
+        return None
+
+    def debug_draw(self, canvas : tk.Canvas, camera : 'Camera') -> None:
+        '''
+        Draws outline of hitbox.
+        The outline is created once and then moved around on later calls.
+        Parameters:
+            canvas : tk.Canvas - canvas objet to draw to.
+            camera : Camera - camera the canvas is viewed through
+        Returns: None
+        '''
+        x0, y0 = camera.to_screen(self.__x_pos - (self.__w / 2), 
+                                  self.__y_pos - (self.__h / 2))
+
+        if(self.__handle is None):
+            self.__handle = canvas.create_rectangle(x0, y0, x0 + self.__w, y0 + self.__h,
+                                                    fill='', outline=self.__outline, 
+                                                    tags=(camera.TAG,))
+        else:
+            canvas.coords(self.__handle, x0, y0, x0 + self.__w, y0 + self.__h)
+        return None
+
+    def debug_undraw(self, canvas : tk.Canvas) -> None:
+        '''
+        Removes the outline from the canvas.
+        Parameters:
+            canvas : tk.Canvas - canvas objet to remove from.
+        Returns: None
+        '''
+        if(self.__handle is not None):
+            canvas.delete(self.__handle)
+            self.__handle = None
+        return None
+    
+    def set_outline(self, outline : str) -> None:
+        '''
+        Sets outline color.
+        Parameters:
+            outline : str - outline color
+        Returns: None
+        '''
+        self.__outline = outline
+        return None
+    
+    def get_attribs(self) -> tuple[float, float, float, float]:
+        '''
+        Get the x, y, w, h attributes as a tuple.
+        Parameters:
+            None.
+        Returns: tuple[float, float, float, float] - our attributes
+        '''
+        return self.__x_pos, self.__y_pos, self.__w, self.__h
+    
+    def move(self, x : float = None, y : float = None) -> None:
+        '''
+        Move the hitbox.
         Parameters:
             x : float - x position
             y : float - y position
-            image_cache : ImageCache - to obtain texture
         Returns: None
         '''
-        WIDTH = HEIGHT = 40
+        self.__x_pos = x or self.__x_pos
+        self.__y_pos = y or self.__y_pos
+        return None
+
+    def resize(self, w : float = None, h : float = None) -> None:
+        '''
+        Resize our hit box.
+        Parameters:
+            w : float - width
+            h : float - height
+        Returns: none
+        '''
+        self.__w = w or self.__w
+        self.__h = h or self.__h
+        return None
     
-        super().__init__(x, y, WIDTH, HEIGHT)
-        self.set_sprite(image_cache.get('jerk'))
-        self.set_hit_box(HitBox(x, y, WIDTH, HEIGHT))
+    def box_hit_test(self, hit_box : 'HitBox'):
+        '''
+        Checks for a colission with another HitBox object.
+        Parameters:
+            hit_box : HitBox - hit box to check against.
+        '''
 
-        self.__dir = 'left'
-        self.__x_travel = 0
+        # get the basic hit box data
+        x1, y1, width1, height1 = self.get_attribs()
+        x2, y2, width2, height2 = hit_box.get_attribs() 
+
+        # This check is just a series of inequality checks.
+        # This function assumes the center is our anchor
+        #   So we need to adjust the values a bit.
+        # 
+        corner1_x = x1 - (width1/2)
+        corner1_y = y1 - (height1/2)
+        corner2_x = x2 - (width2/2)
+        corner2_y = y2 - (height2/2)
+        if(corner1_x < corner2_x + width2 and corner1_x + width1 > corner2_x and 
+        corner1_y < corner2_y + height2 and corner1_y + height1 > corner2_y):
+            return True # colission!
         
-        return None
+        # no colission!
+        return False
+
+
+def segment_hit(x0 : float, y0 : float, dx : float, dy : float, left : float, 
+                top : float, right : float, bottom : float) -> float:
+    '''
+    Where a line segment enters a box (slab test).
+    Parameters:
+        x0, y0 : float - segment start
+        dx, dy : float - segment length along each axis
+        left, top, right, bottom : float - the box
+    Returns: float - how far along the segment it enters the box
+             (0 to 1, 0 if it starts inside), None if it misses
+    '''
+    enter = 0.0
+    leave = 1.0
+    for start, length, low, high in ((x0, dx, left, right), (y0, dy, top, bottom)):
+        if(length == 0):
+            if(start < low or start > high):
+                return None
+            continue
+
+        near = (low - start) / length
+        far = (high - start) / length
+        if(near > far):
+            near, far = far, near
+        enter = max(enter, near)
+        leave = min(leave, far)
+        if(enter > leave):
+            return None
+
+    return enter
     
-    def update(self, delta: float) -> None:
+
+#-----------------------------------------------------------------SPATIAL HASH
+
+class SpatialHash:
+    '''
+    Uniform grid that buckets GameObjects by the cells their HitBox covers.
+    Lets us find what a HitBox might be touching without checking
+    every GameObject in the game.
+    '''
+    def __init__(self, cell_size : float = 40, by_hit_box : bool = True) -> None:
         '''
-        Update jerk's animation.
+        Class init
         Parameters:
-            delta : float - dealta time in fractional seconds
+            cell_size : float - width and height of a grid cell
+            by_hit_box : bool - bucket by HitBox (for colission) or by the
+                                GameObject's own size (for drawing)
         Returns: None
         '''
-        SPEED = 30
-        RIGHTBOUND = 40
-        LEFTBOUND = -40
+        self.__cell_size = cell_size
+        self.__by_hit_box = by_hit_box
 
-        if(self.__dir == 'left'):
-            if(self.__x_travel > LEFTBOUND):
-                self.move_relative((-SPEED * delta))
-                self.__x_travel += -SPEED * delta
-            else:
-                self.__dir = 'right'
-        if(self.__dir == 'right'):
-            if(self.__x_travel < RIGHTBOUND):
-                self.move_relative((SPEED * delta))
-                self.__x_travel += SPEED * delta
-            else:
-                self.__dir = 'left'
-        return super().update(delta)
+        # cell (column, row) -> GameObjects in that cell
+        # dicts are used as ordered sets so queries come back in a
+        # stable order from run to run
+        self.__cells = dict()
 
-class Player(GameObject):
-    MAX_VELOCITY = 1.2
+        # GameObject -> cell range it is currently stored in
+        self.__ranges = dict()
 
-    def __init__(self, x: float, y: float,  image_cache : ImageCache) -> None:
-        super().__init__(x, y, 40, 80)
+        return None
 
-        self.set_sprite(image_cache.get('dude'))
+    def __key(self, game_object : 'GameObject') -> HitBox:
+        '''
+        Get the box a GameObject is bucketed by.
+        GameObject has the same get_attribs() as HitBox, so either works.
+        Parameters:
+            game_object : GameObject - object to look up
+        Returns: HitBox - box to use, None type if there is none
+        '''
+        if(self.__by_hit_box):
+            return game_object.get_hit_box()
+        return game_object
+
+    def __cell_range(self, hit_box : HitBox) -> tuple[int, int, int, int]:
+        '''
+        Find the range of cells a HitBox covers.
+        Parameters:
+            hit_box : HitBox - hit box to look up
+        Returns: tuple[int, int, int, int] - first/last column, first/last row
+        '''
+        x, y, w, h = hit_box.get_attribs()
+        size = self.__cell_size
+
+        # edges that land exactly on a cell border don't spill into the
+        # next cell, since box_hit_test uses strict inequalities
+        col0 = math.floor((x - (w / 2)) / size)
+        row0 = math.floor((y - (h / 2)) / size)
+        col1 = max(col0, math.ceil((x + (w / 2)) / size) - 1)
+        row1 = max(row0, math.ceil((y + (h / 2)) / size) - 1)
+
+        return col0, col1, row0, row1
+
+    def __add(self, game_object : 'GameObject', cell_range : tuple[int, int, int, int]) -> None:
+        '''
+        Store a GameObject in every cell of a range.
+        Parameters:
+            game_object : GameObject - object to store
+            cell_range : tuple[int, int, int, int] - range from __cell_range
+        Returns: None
+        '''
+        col0, col1, row0, row1 = cell_range
+        for row in range(row0, row1 + 1):
+            for col in range(col0, col1 + 1):
+                self.__cells.setdefault((col, row), dict())[game_object] = None
+        self.__ranges[game_object] = cell_range
+        return None
+
+    def __discard(self, game_object : 'GameObject') -> None:
+        '''
+        Take a GameObject out of every cell it is stored in.
+        Parameters:
+            game_object : GameObject - object to take out
+        Returns: None
+        '''
+        col0, col1, row0, row1 = self.__ranges.pop(game_object)
+        for row in range(row0, row1 + 1):
+            for col in range(col0, col1 + 1):
+                cell = self.__cells[(col, row)]
+                del cell[game_object]
+                if(not cell):
+                    del self.__cells[(col, row)]
+        return None
+
+    def insert(self, game_object : 'GameObject') -> None:
+        '''
+        Add a GameObject to the grid.
+        GameObjects without a HitBox are ignored when bucketing by HitBox.
+        Parameters:
+            game_object : GameObject - object to add
+        Returns: None
+        '''
+        hit_box = self.__key(game_object)
+        if(hit_box and game_object not in self.__ranges):
+            self.__add(game_object, self.__cell_range(hit_box))
+        return None
+
+    def remove(self, game_object : 'GameObject') -> None:
+        '''
+        Remove a GameObject from the grid.
+        Parameters:
+            game_object : GameObject - object to remove
+        Returns: None
+        '''
+        if(game_object in self.__ranges):
+            self.__discard(game_object)
+        return None
+
+    def update(self, game_object : 'GameObject') -> None:
+        '''
+        Re-bucket a GameObject after it has moved.
+        Cheap when the object is still in the same cells.
+        Parameters:
+            game_object : GameObject - object that moved
+        Returns: None
+        '''
+        old_range = self.__ranges.get(game_object)
+        if(old_range is None):
+            return None
+
+        new_range = self.__cell_range(self.__key(game_object))
+        if(new_range != old_range):
+            self.__discard(game_object)
+            self.__add(game_object, new_range)
+        return None
+
+    def query(self, hit_box : HitBox) -> list['GameObject']:
+        '''
+        Find every GameObject whose HitBox (or size) overlaps the given one.
+        Results are ordered by cell, top row first, left to right.
+        Parameters:
+            hit_box : HitBox - area to look in
+        Returns: list[GameObject] - overlapping GameObjects
+        '''
+        col0, col1, row0, row1 = self.__cell_range(hit_box)
+        found = dict()
+        for row in range(row0, row1 + 1):
+            for col in range(col0, col1 + 1):
+                cell = self.__cells.get((col, row))
+                if(cell):
+                    for go in cell:
+                        if(go not in found and hit_box.box_hit_test(self.__key(go))):
+                            found[go] = None
+        return list(found)
+
+    def __len__(self) -> int:
+        '''
+        Number of GameObjects in the grid.
+        Parameters: None
+        Returns: int - object count
+        '''
+        return len(self.__ranges)
+
+
+#--------------------------------------------------------------------AABB TREE
+
+class AABBTreeNode:
+    '''
+    Node of an AABBTree. Leaves hold a GameObject, branches always have
+    two children. Bounds are stored as edges, not center and size.
+    '''
+    __slots__ = ('left', 'top', 'right', 'bottom', 'parent', 'child1', 'child2', 
+                 'height', 'game_object')
+
+    def __init__(self, left : float = 0, top : float = 0, right : float = 0, 
+                 bottom : float = 0, game_object : 'GameObject' = None) -> None:
+        '''
+        Class init
+        Parameters:
+            left, top, right, bottom : float - bounds
+            game_object : GameObject - object held by a leaf (None for a branch)
+        Returns: None
+        '''
+        self.left = left
+        self.top = top
+        self.right = right
+        self.bottom = bottom
+        self.parent : AABBTreeNode = None
+        self.child1 : AABBTreeNode = None
+        self.child2 : AABBTreeNode = None
+
+        # leaves are 0, branches are one more than their tallest child
+        self.height = 0
+        self.game_object = game_object
+
+        return None
+
+    def is_leaf(self) -> bool:
+        '''
+        Checks if this is a leaf.
+        Parameters: None
+        Returns: bool - result of check
+        '''
+        return self.child1 is None
+
+    def fit(self) -> None:
+        '''
+        Resize a branch to just hold its children.
+        Parameters: None
+        Returns: None
+        '''
+        child1 = self.child1
+        child2 = self.child2
+        self.left = min(child1.left, child2.left)
+        self.top = min(child1.top, child2.top)
+        self.right = max(child1.right, child2.right)
+        self.bottom = max(child1.bottom, child2.bottom)
+        self.height = 1 + max(child1.height, child2.height)
+        return None
+
+
+class AABBTree:
+    '''
+    Dynamic bounding volume tree of GameObjects.
+    Unlike SpatialHash it doesn't care how big things are, and it can
+    cast rays. Leaves are kept a little bigger than their GameObject 
+    ("fat"), so small moves don't touch the tree at all.
+    Same interface as SpatialHash, so either works as a GameObject index.
+    '''
+    def __init__(self, margin : float = 8, by_hit_box : bool = True) -> None:
+        '''
+        Class init
+        Parameters:
+            margin : float - how much bigger than their box leaves are made
+            by_hit_box : bool - index by HitBox (for colission) or by the
+                                GameObject's own size (for drawing)
+        Returns: None
+        '''
+        self.__margin = margin
+        self.__by_hit_box = by_hit_box
+        self.__root : AABBTreeNode = None
+
+        # GameObject -> its leaf
+        # (dict keeps insertion order, so runs are repeatable)
+        self.__leaves = dict()
+
+        # leaves inserted but not in the tree yet. A whole level gets 
+        # inserted before anything is asked of the tree, so they wait
+        # here and are built into a balanced tree all at once
+        self.__pending : list[AABBTreeNode] = []
+
+        return None
+
+    def __key(self, game_object : 'GameObject') -> HitBox:
+        '''
+        Get the box a GameObject is indexed by.
+        GameObject has the same get_attribs() as HitBox, so either works.
+        Parameters:
+            game_object : GameObject - object to look up
+        Returns: HitBox - box to use, None type if there is none
+        '''
+        if(self.__by_hit_box):
+            return game_object.get_hit_box()
+        return game_object
+
+    @staticmethod
+    def __bounds(hit_box : HitBox) -> tuple[float, float, float, float]:
+        '''
+        Get the edges of a HitBox.
+        Parameters:
+            hit_box : HitBox - box to look at
+        Returns: tuple[float, float, float, float] - left, top, right, bottom
+        '''
+        x, y, w, h = hit_box.get_attribs()
+        return x - (w / 2), y - (h / 2), x + (w / 2), y + (h / 2)
+
+    def __insert_leaf(self, leaf : AABBTreeNode) -> None:
+        '''
+        Put a leaf where it makes the tree grow least, then rebalance
+        on the way back up.
+        Parameters:
+            leaf : AABBTreeNode - leaf to insert
+        Returns: None
+        '''
+        if(self.__root is None):
+            self.__root = leaf
+            leaf.parent = None
+            return None
+
+        # walk down, taking whichever child grows the least, until it's
+        # cheaper to pair the leaf up with the node we are at
+        # (cost is perimeter, which is what queries pay for)
+        left, top, right, bottom = leaf.left, leaf.top, leaf.right, leaf.bottom
+        node = self.__root
+        while(node.child1 is not None):
+            perimeter = (node.right - node.left) + (node.bottom - node.top)
+            combined = self.__grown(node, left, top, right, bottom)
+
+            # cost of making a new parent for node and leaf here, and the 
+            # growth every node below us will have to pay for anyway
+            cost = 2 * combined
+            inherited = 2 * (combined - perimeter)
+
+            child1 = node.child1
+            cost1 = self.__grown(child1, left, top, right, bottom) + inherited
+            if(child1.child1 is not None):
+                cost1 -= (child1.right - child1.left) + (child1.bottom - child1.top)
+
+            child2 = node.child2
+            cost2 = self.__grown(child2, left, top, right, bottom) + inherited
+            if(child2.child1 is not None):
+                cost2 -= (child2.right - child2.left) + (child2.bottom - child2.top)
+
+            if(cost < cost1 and cost < cost2):
+                break
+            node = child1 if cost1 < cost2 else child2
+
+        # give node and leaf a new parent
+        old_parent = node.parent
+        branch = AABBTreeNode()
+        branch.parent = old_parent
+        branch.child1 = node
+        branch.child2 = leaf
+        node.parent = branch
+        leaf.parent = branch
+        branch.fit()
+
+        if(old_parent is None):
+            self.__root = branch
+        elif(old_parent.child1 is node):
+            old_parent.child1 = branch
+        else:
+            old_parent.child2 = branch
+
+        self.__refit(branch.parent)
+        return None
+
+    @staticmethod
+    def __grown(node : AABBTreeNode, left : float, top : float, right : float, 
+                bottom : float) -> float:
+        '''
+        Perimeter (well, half of it) of a node grown to hold a box.
+        Parameters:
+            node : AABBTreeNode - node to grow
+            left, top, right, bottom : float - box to hold
+        Returns: float - width plus height of the grown node
+        '''
+        return ((node.right if node.right > right else right) - 
+                (node.left if node.left < left else left) + 
+                (node.bottom if node.bottom > bottom else bottom) - 
+                (node.top if node.top < top else top))
+
+    def __build(self, leaves : list[AABBTreeNode]) -> AABBTreeNode:
+        '''
+        Build a balanced subtree from scratch, splitting the leaves in
+        half across the longer side each time.
+        Much quicker than inserting a whole level one leaf at a time.
+        Parameters:
+            leaves : list[AABBTreeNode] - leaves to build from
+        Returns: AABBTreeNode - root of the subtree
+        '''
+        if(len(leaves) == 1):
+            return leaves[0]
+
+        left = min(leaf.left for leaf in leaves)
+        top = min(leaf.top for leaf in leaves)
+        right = max(leaf.right for leaf in leaves)
+        bottom = max(leaf.bottom for leaf in leaves)
+        if(right - left >= bottom - top):
+            leaves = sorted(leaves, key=lambda leaf: leaf.left + leaf.right)
+        else:
+            leaves = sorted(leaves, key=lambda leaf: leaf.top + leaf.bottom)
+
+        half = len(leaves) // 2
+        branch = AABBTreeNode()
+        branch.child1 = self.__build(leaves[:half])
+        branch.child2 = self.__build(leaves[half:])
+        branch.child1.parent = branch
+        branch.child2.parent = branch
+        branch.fit()
+        return branch
+
+    def __flush(self) -> None:
+        '''
+        Put pending leaves in the tree.
+        Into an empty tree they are built in one go, otherwise they are
+        inserted one at a time.
+        Parameters: None
+        Returns: None
+        '''
+        pending = self.__pending
+        self.__pending = []
+        if(self.__root is None and len(pending) > 1):
+            self.__root = self.__build(pending)
+            self.__root.parent = None
+        else:
+            for leaf in pending:
+                self.__insert_leaf(leaf)
+        return None
+
+    def __remove_leaf(self, leaf : AABBTreeNode) -> None:
+        '''
+        Take a leaf out of the tree. Its sibling takes its parent's place.
+        Parameters:
+            leaf : AABBTreeNode - leaf to remove
+        Returns: None
+        '''
+        if(leaf is self.__root):
+            self.__root = None
+            return None
+
+        parent = leaf.parent
+        grand_parent = parent.parent
+        sibling = parent.child2 if parent.child1 is leaf else parent.child1
+
+        if(grand_parent is None):
+            self.__root = sibling
+            sibling.parent = None
+        else:
+            if(grand_parent.child1 is parent):
+                grand_parent.child1 = sibling
+            else:
+                grand_parent.child2 = sibling
+            sibling.parent = grand_parent
+            self.__refit(grand_parent)
+
+        leaf.parent = None
+        return None
+
+    def __refit(self, node : AABBTreeNode) -> None:
+        '''
+        Resize and rebalance every branch from node up to the root.
+        Parameters:
+            node : AABBTreeNode - first branch to fix
+        Returns: None
+        '''
+        while(node is not None):
+            node = self.__balance(node)
+            node.fit()
+            node = node.parent
+        return None
+
+    def __balance(self, node : AABBTreeNode) -> AABBTreeNode:
+        '''
+        If one side of a branch is more than one level taller than the
+        other, rotate the taller child up into its place.
+        Parameters:
+            node : AABBTreeNode - branch to balance
+        Returns: AABBTreeNode - whatever is in the branch's place now
+        '''
+        if(node.is_leaf() or node.height < 2):
+            return node
+
+        child1 = node.child1
+        child2 = node.child2
+        balance = child2.height - child1.height
+        if(-1 <= balance <= 1):
+            return node
+
+        # the taller child moves up, node goes down to become its child
+        if(balance > 1):
+            up, other = child2, child1
+        else:
+            up, other = child1, child2
+
+        # up keeps its taller child, node gets the shorter one
+        grand1 = up.child1
+        grand2 = up.child2
+        if(grand1.height < grand2.height):
+            grand1, grand2 = grand2, grand1
+
+        up.parent = node.parent
+        if(node.parent is None):
+            self.__root = up
+        elif(node.parent.child1 is node):
+            node.parent.child1 = up
+        else:
+            node.parent.child2 = up
+
+        node.child1 = other
+        node.child2 = grand2
+        grand2.parent = node
+        node.parent = up
+        node.fit()
+
+        up.child1 = node
+        up.child2 = grand1
+        up.fit()
+
+        return up
+
+    def insert(self, game_object : 'GameObject') -> None:
+        '''
+        Add a GameObject to the tree.
+        GameObjects without a HitBox are ignored when indexing by HitBox.
+        Parameters:
+            game_object : GameObject - object to add
+        Returns: None
+        '''
+        hit_box = self.__key(game_object)
+        if(hit_box and game_object not in self.__leaves):
+            left, top, right, bottom = self.__bounds(hit_box)
+            margin = self.__margin
+            leaf = AABBTreeNode(left - margin, top - margin, right + margin, bottom + margin, 
+                                game_object)
+            self.__leaves[game_object] = leaf
+            self.__pending.append(leaf)
+        return None
+
+    def remove(self, game_object : 'GameObject') -> None:
+        '''
+        Remove a GameObject from the tree.
+        Parameters:
+            game_object : GameObject - object to remove
+        Returns: None
+        '''
+        leaf = self.__leaves.pop(game_object, None)
+        if(leaf is not None):
+            if(self.__pending):
+                self.__flush()
+            self.__remove_leaf(leaf)
+        return None
+
+    def update(self, game_object : 'GameObject') -> None:
+        '''
+        Move a GameObject's leaf after it has moved.
+        Nothing happens while it is still inside its fat bounds.
+        Parameters:
+            game_object : GameObject - object that moved
+        Returns: None
+        '''
+        leaf = self.__leaves.get(game_object)
+        if(leaf is None):
+            return None
+
+        left, top, right, bottom = self.__bounds(self.__key(game_object))
+        if(leaf.left <= left and leaf.top <= top and right <= leaf.right and 
+           bottom <= leaf.bottom):
+            return None
+
+        if(self.__pending):
+            self.__flush()
+
+        margin = self.__margin
+        self.__remove_leaf(leaf)
+        leaf.left = left - margin
+        leaf.top = top - margin
+        leaf.right = right + margin
+        leaf.bottom = bottom + margin
+        self.__insert_leaf(leaf)
+        return None
+
+    def query(self, hit_box : HitBox) -> list['GameObject']:
+        '''
+        Find every GameObject whose HitBox (or size) overlaps the given one.
+        Parameters:
+            hit_box : HitBox - area to look in
+        Returns: list[GameObject] - overlapping GameObjects
+        '''
+        if(self.__pending):
+            self.__flush()
+
+        found = []
+        if(self.__root is None):
+            return found
+
+        left, top, right, bottom = self.__bounds(hit_box)
+        stack = [self.__root]
+        while(stack):
+            node = stack.pop()
+            if(node.left > right or node.right < left or 
+               node.top > bottom or node.bottom < top):
+                continue
+
+            if(node.child1 is None):
+                if(hit_box.box_hit_test(self.__key(node.game_object))):
+                    found.append(node.game_object)
+            else:
+                stack.append(node.child2)
+                stack.append(node.child1)
+
+        return found
+
+    def ray_cast(self, x0 : float, y0 : float, 
+                 x1 : float, y1 : float) -> list[tuple[float, 'GameObject']]:
+        '''
+        Find every GameObject a line segment passes through.
+        Parameters:
+            x0 : float - start x
+            y0 : float - start y
+            x1 : float - end x
+            y1 : float - end y
+        Returns: list[tuple[float, GameObject]] - how far along the segment
+                 each GameObject is hit (0 to 1) and the GameObject, 
+                 nearest first
+        '''
+        if(self.__pending):
+            self.__flush()
+
+        hits = []
+        if(self.__root is None):
+            return hits
+
+        dx = x1 - x0
+        dy = y1 - y0
+        stack = [self.__root]
+        while(stack):
+            node = stack.pop()
+            if(segment_hit(x0, y0, dx, dy, node.left, node.top, 
+                           node.right, node.bottom) is None):
+                continue
+
+            if(node.child1 is None):
+                fraction = segment_hit(x0, y0, dx, dy, 
+                                       *self.__bounds(self.__key(node.game_object)))
+                if(fraction is not None):
+                    hits.append((fraction, node.game_object))
+            else:
+                stack.append(node.child2)
+                stack.append(node.child1)
+
+        hits.sort(key=lambda hit: hit[0])
+        return hits
+
+    def get_height(self) -> int:
+        '''
+        How many levels deep the tree is.
+        Parameters: None
+        Returns: int - height (0 for an empty tree or a single leaf)
+        '''
+        if(self.__pending):
+            self.__flush()
+        if(self.__root is None):
+            return 0
+        return self.__root.height
+
+    def __len__(self) -> int:
+        '''
+        Number of GameObjects in the tree.
+        Parameters: None
+        Returns: int - object count
+        '''
+        return len(self.__leaves)
+
+
+#---------------------------------------------------------------------TILE MAP
+
+class TileMap:
+    '''
+    Static collision layer built straight from the level grid.
+    Solid cells are stored one byte each, column by column, so a
+    collision check is just index arithmetic instead of a GameObject
+    per tile.
+    Cells are loaded a chunk of columns at a time (see LevelGrid), 
+    cells in chunks that aren't loaded are empty.
+    '''
+    def __init__(self, cols : int, rows : int, solid : str = 'g', tile_size : float = 40, 
+                 inset : float = 1, chunk_columns : int = 32) -> None:
+        '''
+        Class init
+        Parameters:
+            cols : int - width of the level in cells
+            rows : int - height of the level in cells
+            solid : str - level character for solid cells
+            tile_size : float - width and height of a cell
+            inset : float - how much the solid part of a cell is shrunk
+                            from the top and bottom (matches the old
+                            GroundTile hit box)
+            chunk_columns : int - columns per chunk
+        Returns: None
+        '''
+        self.__solid = solid
+        self.__tile_size = tile_size
+        self.__inset = inset
+        self.__rows = rows
+        self.__cols = cols
+        self.__chunk_columns = chunk_columns
+
+        # chunk index -> one byte per cell, column-major since levels 
+        # are wide and we scroll along x
+        self.__chunks = dict()
+
+        # drawing state, see draw()
+        # column -> canvas items drawn for that column
+        self.__drawn_columns = dict()
+        self.__hitbox_drawn = False
+
+        return None
+
+    def load_chunk(self, index : int, chunk_rows : list[str]) -> None:
+        '''
+        Load the cells of a chunk.
+        Parameters:
+            index : int - chunk index
+            chunk_rows : list[str] - the chunk's part of every level row,
+                                     see LevelGrid.read_chunk()
+        Returns: None
+        '''
+        rows = self.__rows
+        cells = bytearray(self.__chunk_columns * rows)
+        for i, row in enumerate(chunk_rows[:rows]):
+            # jump from one solid cell to the next
+            j = row.find(self.__solid, 0, self.__chunk_columns)
+            while(j != -1):
+                cells[(j * rows) + i] = 1
+                j = row.find(self.__solid, j + 1, self.__chunk_columns)
+        self.__chunks[index] = cells
+        return None
+
+    def unload_chunk(self, index : int) -> None:
+        '''
+        Drop the cells of a chunk, they are empty until loaded again.
+        Parameters:
+            index : int - chunk index
+        Returns: None
+        '''
+        self.__chunks.pop(index, None)
+        return None
+
+    def __cell(self, col : int, row : int) -> int:
+        '''
+        Get a cell that is known to be inside the map.
+        Parameters:
+            col : int - cell column
+            row : int - cell row
+        Returns: int - 1 if solid, 0 if not (or not loaded)
+        '''
+        chunk = self.__chunks.get(col // self.__chunk_columns)
+        if(chunk is None):
+            return 0
+        return chunk[((col % self.__chunk_columns) * self.__rows) + row]
+
+    def get_size(self) -> tuple[int, int]:
+        '''
+        Get the size of the map in cells.
+        Parameters: None
+        Returns: tuple[int, int] - columns, rows
+        '''
+        return self.__cols, self.__rows
+
+    def is_solid(self, col : int, row : int) -> bool:
+        '''
+        Checks if a cell is solid. Cells outside the map are not.
+        Parameters:
+            col : int - cell column
+            row : int - cell row
+        Returns: bool - result of check
+        '''
+        if(0 <= col < self.__cols and 0 <= row < self.__rows):
+            return self.__cell(col, row) == 1
+        return False
+
+    def get_cell_center(self, col : int, row : int) -> tuple[float, float]:
+        '''
+        Get the world position of the center of a cell.
+        Parameters:
+            col : int - cell column
+            row : int - cell row
+        Returns: tuple[float, float] - x, y
+        '''
+        half = self.__tile_size / 2
+        return (col * self.__tile_size) + half, (row * self.__tile_size) + half
+
+    def __overlap_range(self, hit_box : HitBox) -> tuple[int, int, int, int]:
+        '''
+        Find the cells whose solid part a HitBox could overlap.
+        Parameters:
+            hit_box : HitBox - hit box to look up
+        Returns: tuple[int, int, int, int] - first/last column, first/last row
+        '''
+        x, y, w, h = hit_box.get_attribs()
+        size = self.__tile_size
+        inset = self.__inset
+
+        left = x - (w / 2)
+        right = x + (w / 2)
+        top = y - (h / 2)
+        bottom = y + (h / 2)
+
+        # same strict inequalities as HitBox.box_hit_test
+        col0 = max(0, math.floor(left / size))
+        col1 = min(self.__cols - 1, math.ceil(right / size) - 1)
+        row0 = max(0, math.floor((top - size + inset) / size) + 1)
+        row1 = min(self.__rows - 1, math.ceil((bottom - inset) / size) - 1)
+
+        return col0, col1, row0, row1
+
+    def hit_test(self, hit_box : HitBox) -> tuple[int, int]:
+        '''
+        Find the first solid cell under a HitBox.
+        Rows are searched top to bottom, then columns left to right.
+        Parameters:
+            hit_box : HitBox - hit box to check
+        Returns: tuple[int, int] - column and row of the cell
+                 None type if nothing solid is hit.
+        '''
+        col0, col1, row0, row1 = self.__overlap_range(hit_box)
+        for row in range(row0, row1 + 1):
+            for col in range(col0, col1 + 1):
+                if(self.__cell(col, row)):
+                    return col, row
+        return None
+
+    def overlaps_cell(self, hit_box : HitBox, col : int, row : int) -> bool:
+        '''
+        Checks if a HitBox overlaps the solid part of a cell (solid or not).
+        Parameters:
+            hit_box : HitBox - hit box to check
+            col : int - cell column
+            row : int - cell row
+        Returns: bool - result of check
+        '''
+        col0, col1, row0, row1 = self.__overlap_range(hit_box)
+        return col0 <= col <= col1 and row0 <= row <= row1
+
+    def sweep(self, hit_box : HitBox, dx : float, dy : float) -> tuple[float, int, int]:
+        '''
+        Swept colission: moves a HitBox along (dx, dy) and finds the
+        first solid cell it runs into on the way.
+        Cells the HitBox already overlaps are left to hit_test().
+        Parameters:
+            hit_box : HitBox - hit box at the start of the move
+            dx : float - x distance to move
+            dy : float - y distance to move
+        Returns: tuple[float, int, int] - time of impact (0 to 1, how far
+                 along the move it touches) and the cell's column and row.
+                 None type if it reaches the end without hitting anything.
+        '''
+        x, y, w, h = hit_box.get_attribs()
+        size = self.__tile_size
+        inset = self.__inset
+
+        # every cell the HitBox passes over
+        col0, col1, row0, row1 = self.__overlap_range(HitBox(x + (dx / 2), y + (dy / 2), 
+                                                             w + abs(dx), h + abs(dy)))
+
+        first = None
+        for col in range(col0, col1 + 1):
+            for row in range(row0, row1 + 1):
+                if(not self.__cell(col, row)):
+                    continue
+
+                # solid part of the cell grown by half the HitBox, so
+                # we only have to follow the HitBox's center
+                left = (col * size) - (w / 2)
+                right = ((col + 1) * size) + (w / 2)
+                top = (row * size) + inset - (h / 2)
+                bottom = ((row + 1) * size) - inset + (h / 2)
+
+                # sliding along an edge, or already inside, isn't running
+                # into it (same strict inequalities as box_hit_test)
+                if(dx == 0 and not left < x < right):
+                    continue
+                if(dy == 0 and not top < y < bottom):
+                    continue
+                if(left < x < right and top < y < bottom):
+                    continue
+
+                time_of_impact = segment_hit(x, y, dx, dy, left, top, right, bottom)
+                if(time_of_impact is not None and 
+                   (first is None or time_of_impact < first[0])):
+                    first = (time_of_impact, col, row)
+
+        return first
+
+    def draw(self, canvas : tk.Canvas, camera : 'Camera', view : HitBox, 
+             sprite : tk.PhotoImage, draw_hitbox : bool = False) -> None:
+        '''
+        Draws the solid cells in view to canvas.
+        Cells never move, so each column is created as canvas items once
+        when it comes into view and deleted when it leaves.
+        Parameters:
+            canvas : tk.Canvas - canvas to draw to.
+            camera : Camera - camera the canvas is viewed through
+            view : HitBox - area of the world to draw
+            sprite : tk.PhotoImage - image for a solid cell
+            draw_hitbox : bool - also draw the solid area of each cell
+        Returns: None
+        '''
+        # toggling hit boxes means every column needs redrawing
+        if(draw_hitbox != self.__hitbox_drawn):
+            self.undraw(canvas)
+            self.__hitbox_drawn = draw_hitbox
+
+        x, y, w, h = view.get_attribs()
+        col0 = max(0, math.floor((x - (w / 2)) / self.__tile_size))
+        col1 = min(self.__cols - 1, math.floor((x + (w / 2)) / self.__tile_size))
+
+        for col in list(self.__drawn_columns):
+            if(col < col0 or col > col1):
+                canvas.delete(*self.__drawn_columns.pop(col))
+
+        half = self.__tile_size / 2
+        created = False
+        for col in range(col0, col1 + 1):
+            if(col in self.__drawn_columns):
+                continue
+
+            items = []
+            for row in range(self.__rows):
+                if(self.is_solid(col, row)):
+                    x, y = camera.to_screen(*self.get_cell_center(col, row))
+                    items.append(canvas.create_image(x, y, anchor='c', image=sprite, 
+                                                     tags=(camera.TAG, 'tile_map')))
+                    if(draw_hitbox):
+                        items.append(canvas.create_rectangle(x - half, y - half + self.__inset, 
+                                                             x + half, y + half - self.__inset, 
+                                                             fill='', outline='red', 
+                                                             tags=(camera.TAG, 'tile_map')))
+            self.__drawn_columns[col] = items
+            created = created or len(items) > 0
+
+        # the ground always sits behind everything else
+        if(created):
+            canvas.tag_lower('tile_map')
+
+        return None
+
+    def undraw(self, canvas : tk.Canvas) -> None:
+        '''
+        Removes the map from canvas.
+        Parameters:
+            canvas : tk.Canvas - canvas to remove from.
+        Returns: None
+        '''
+        canvas.delete('tile_map')
+        self.__drawn_columns = dict()
+        return None
+
+
+#-----------------------------------------------------------------------CAMERA
+
+class Camera:
+    '''
+    World space offset of the view.
+    GameObjects keep their world positions; the offset is only applied
+    when drawing. Everything drawn in world space is tagged with TAG so
+    the whole canvas can be scrolled with a single move.
+    '''
+    TAG = 'world'
+
+    def __init__(self, w : float, h : float, x : float = 0, y : float = 0) -> None:
+        '''
+        Class init
+        Parameters:
+            w : float - viewport width
+            h : float - viewport height
+            x : float - x offset
+            y : float - y offset
+        Returns: None
+        '''
+        self.__w = w
+        self.__h = h
+        self.__x_pos = x
+        self.__y_pos = y
+
+        # offset at the last physics step, for interpolation
+        self.__prev_x = x
+        self.__prev_y = y
+
+        # offset the canvas items currently reflect, see apply()
+        self.__applied_x = x
+        self.__applied_y = y
+
+        return None
+
+    def get_offset(self) -> tuple[float, float]:
+        '''
+        Get the current offset.
+        Parameters: None
+        Returns: tuple[float, float] - x, y
+        '''
+        return self.__x_pos, self.__y_pos
+
+    def move(self, x : float = None, y : float = None) -> None:
+        '''
+        Move camera to a specific offset.
+        Parameters:
+            x : float - x offset
+            y : float - y offset
+        Returns: None
+        '''
+        if(x is not None):
+            self.__x_pos = x
+        if(y is not None):
+            self.__y_pos = y
+        return None
+
+    def move_relative(self, x : float = 0, y : float = 0) -> None:
+        '''
+        Move camera relative from where it is.
+        Parameters:
+            x : float - x movement
+            y : float - y movement
+        Returns: None
+        '''
+        self.__x_pos += x
+        self.__y_pos += y
+        return None
+
+    def save_position(self) -> None:
+        '''
+        Remember the current offset as the one from the last step.
+        To be called before every physics step.
+        Parameters: None
+        Returns: None
+        '''
+        self.__prev_x = self.__x_pos
+        self.__prev_y = self.__y_pos
+        return None
+
+    def get_view(self, margin : float = 0) -> HitBox:
+        '''
+        Get the area of the world the camera can see.
+        Parameters:
+            margin : float - how far to grow the area past each screen edge
+        Returns: HitBox - visible area in world space
+        '''
+        return HitBox(self.__x_pos + (self.__w / 2), self.__y_pos + (self.__h / 2), 
+                      self.__w + (margin * 2), self.__h + (margin * 2))
+
+    def to_screen(self, x : float, y : float) -> tuple[float, float]:
+        '''
+        Convert a world position to where it currently sits on the canvas.
+        Parameters:
+            x : float - world x
+            y : float - world y
+        Returns: tuple[float, float] - canvas x, y
+        '''
+        return x - self.__applied_x, y - self.__applied_y
+
+    def apply(self, canvas : tk.Canvas, alpha : float = 1) -> None:
+        '''
+        Scrolls every world item on the canvas to the current offset.
+        To be called once per frame before drawing.
+        Parameters:
+            canvas : tk.Canvas - canvas to scroll
+            alpha : float - how far between the last step and this one
+                            to draw (see FixedTimestep.get_alpha())
+        Returns: None
+        '''
+        x, y = self.__x_pos, self.__y_pos
+        if(alpha < 1):
+            x = self.__prev_x + ((x - self.__prev_x) * alpha)
+            y = self.__prev_y + ((y - self.__prev_y) * alpha)
+
+        if(self.__applied_x != x or self.__applied_y != y):
+            canvas.move(self.TAG, self.__applied_x - x, self.__applied_y - y)
+            self.__applied_x = x
+            self.__applied_y = y
+        return None
+
+
+#------------------------------------------------------------------IMAGE CACHE
+class ImageCache:
+    '''
+    Loads and stores images.
+    Images can come one file each, or all from a single packed atlas image
+    with a JSON manifest saying where each one is (see build_atlas()):
+        {"version" : 1, "image" : "atlas.png", "width" : 256, "height" : 160,
+         "regions" : {"coin" : {"x" : 0, "y" : 0, "w" : 40, "h" : 40, 
+                                "source" : "coin.png"}, ...}}
+    Paths in the manifest are relative to the manifest.
+    '''
+    MANIFEST_VERSION = 1
+    ATLAS_WIDTH = 256 # widest an atlas is packed, unless an image is wider
+
+    def __init__(self) -> None:
+        '''
+        Class init
+        Parameters: None.
+        Returns: None
+        '''
+        # create our database
+        self.__Cache = dict()
+
+        return None
+        
+    def load_image(self, name : str, path : str) -> None:
+        '''
+        Load and store an image
+        Parameters: 
+            name : str - name of image
+            path : str - file path of image
+        Returns: None
+        '''
+        # store into database with name as key
+        self.__Cache[name] = tk.PhotoImage(file=path)
+
+        return None
+
+    def get(self, name : str) -> tk.PhotoImage:
+        '''
+        Gets an image from database.
+        Parameters:
+            name : str - name of image
+        Returns: tk.Photoimage - image from databse.
+                 None type is name was not found. 
+        '''
+        if(name in self.__Cache):
+            return self.__Cache[name]
+        
+        return None
+
+    def get_names(self) -> list[str]:
+        '''
+        Gets the name of every stored image.
+        Parameters: None
+        Returns: list[str] - image names
+        '''
+        return list(self.__Cache)
+
+    def load_atlas(self, manifest_path : str) -> list[str]:
+        '''
+        Loads every image in an atlas.
+        The atlas is read and decoded once, then each region is copied out
+        into an image of its own, since a canvas item can't show part of
+        an image.
+        Parameters:
+            manifest_path : str - atlas manifest (see build_atlas())
+        Returns: list[str] - names of the images loaded
+        '''
+        manifest = self.read_manifest(manifest_path)
+        folder = os.path.dirname(manifest_path)
+        atlas = tk.PhotoImage(file=os.path.join(folder, manifest['image']))
+
+        for name, region in manifest['regions'].items():
+            x, y = region['x'], region['y']
+            image = tk.PhotoImage(width=region['w'], height=region['h'])
+            image.tk.call(image, 'copy', atlas, 
+                          '-from', x, y, x + region['w'], y + region['h'], '-to', 0, 0)
+            self.__Cache[name] = image
+
+        return list(manifest['regions'])
+
+    def load_images(self, images : dict[str, str], manifest_path : str = None) -> bool:
+        '''
+        Loads a set of images, from an atlas if there is an up to date one
+        holding all of them, otherwise one file each.
+        Parameters:
+            images : dict[str, str] - image name -> file path
+            manifest_path : str - atlas manifest to try first (None for no atlas)
+        Returns: bool - True if they came from the atlas
+        '''
+        if(manifest_path and self.is_atlas_fresh(images, manifest_path)):
+            self.load_atlas(manifest_path)
+            return True
+
+        for name, path in images.items():
+            self.load_image(name, path)
+
+        return False
+
+    @staticmethod
+    def read_manifest(manifest_path : str) -> dict:
+        '''
+        Reads and checks an atlas manifest.
+        Parameters:
+            manifest_path : str - manifest file
+        Returns: dict - the manifest
+        Raises: ValueError - not a manifest we can read
+        '''
+        with open(manifest_path, 'r') as in_file:
+            manifest = json.load(in_file)
+
+        if(not isinstance(manifest, dict) or 
+           manifest.get('version') != ImageCache.MANIFEST_VERSION):
+            raise ValueError(f"{manifest_path} is not a version "
+                             f"{ImageCache.MANIFEST_VERSION} atlas manifest")
+
+        return manifest
+
+    @staticmethod
+    def is_atlas_fresh(images : dict[str, str], manifest_path : str) -> bool:
+        '''
+        Checks an atlas holds every image and is newer than all of them.
+        Parameters:
+            images : dict[str, str] - image name -> file path
+            manifest_path : str - atlas manifest
+        Returns: bool - True if the atlas can be loaded in their place
+        '''
+        try:
+            manifest = ImageCache.read_manifest(manifest_path)
+            folder = os.path.dirname(manifest_path)
+            built = min(os.path.getmtime(manifest_path), 
+                        os.path.getmtime(os.path.join(folder, manifest['image'])))
+
+            for name, path in images.items():
+                if(name not in manifest['regions'] or os.path.getmtime(path) > built):
+                    return False
+        except (OSError, ValueError, KeyError):
+            return False
+
+        return True
+
+    @staticmethod
+    def pack(sizes : dict[str, tuple[int, int]], 
+             max_width : int = ATLAS_WIDTH) -> tuple[int, int, dict]:
+        '''
+        Packs rectangles into shelves, tallest first.
+        Each shelf is as tall as the first (tallest) rectangle on it, and
+        a rectangle that doesn't fit on the current shelf starts a new one.
+        Parameters:
+            sizes : dict[str, tuple[int, int]] - name -> width, height
+            max_width : int - widest a shelf can be
+        Returns: tuple[int, int, dict] - width, height, and name -> x, y, w, h
+        '''
+        max_width = max([max_width] + [w for w, h in sizes.values()])
+        order = sorted(sizes, key=lambda name: (-sizes[name][1], -sizes[name][0], name))
+
+        regions = dict()
+        width = 0
+        shelf_x = shelf_y = shelf_height = 0
+        for name in order:
+            w, h = sizes[name]
+            if(shelf_x + w > max_width):
+                shelf_y += shelf_height
+                shelf_x = shelf_height = 0
+
+            regions[name] = (shelf_x, shelf_y, w, h)
+            shelf_x += w
+            shelf_height = max(shelf_height, h)
+            width = max(width, shelf_x)
+
+        return width, shelf_y + shelf_height, regions
+
+
+def build_atlas(images : dict[str, str], manifest_path : str, 
+                max_width : int = ImageCache.ATLAS_WIDTH) -> str:
+    '''
+    Packs images into one atlas image and writes it with its manifest.
+    Uses PIL if it's installed, otherwise Tk (which needs a display).
+    The atlas image goes next to the manifest, same name, .png.
+    Parameters:
+        images : dict[str, str] - image name -> file path
+        manifest_path : str - where to write the manifest
+        max_width : int - widest the atlas can be
+    Returns: str - path of the atlas image
+    '''
+    try:
+        from PIL import Image
+    except ImportError:
+        Image = None
+
+    folder = os.path.dirname(manifest_path)
+    image_path = os.path.splitext(manifest_path)[0] + '.png'
+
+    # only Tk needs a root to make images with, and must outlive them
+    root = None
+    if(Image):
+        sources = {name : Image.open(path).convert('RGBA') for name, path in images.items()}
+        sizes = {name : source.size for name, source in sources.items()}
+    else:
+        root = tk.Tk()
+        root.withdraw()
+        sources = {name : tk.PhotoImage(master=root, file=path) for name, path in images.items()}
+        sizes = {name : (source.width(), source.height()) for name, source in sources.items()}
+
+    width, height, regions = ImageCache.pack(sizes, max_width)
+
+    if(Image):
+        atlas = Image.new('RGBA', (width, height))
+        for name, (x, y, w, h) in regions.items():
+            atlas.paste(sources[name], (x, y))
+        atlas.save(image_path)
+    else:
+        atlas = tk.PhotoImage(master=root, width=width, height=height)
+        for name, (x, y, w, h) in regions.items():
+            atlas.tk.call(atlas, 'copy', sources[name], '-to', x, y)
+        atlas.write(image_path, format='png')
+
+    manifest = {'version' : ImageCache.MANIFEST_VERSION,
+                'image' : os.path.basename(image_path),
+                'width' : width,
+                'height' : height,
+                'regions' : {name : {'x' : x, 'y' : y, 'w' : w, 'h' : h,
+                                     'source' : os.path.relpath(images[name], folder or '.')}
+                             for name, (x, y, w, h) in regions.items()}}
+
+    # written last, so a half built atlas never looks up to date
+    with open(manifest_path, 'w') as out_file:
+        json.dump(manifest, out_file, indent=2)
+
+    if(root):
+        root.destroy()
+
+    return image_path
+    
+
+#--------------------------------------------------------------------MESSAGE BUS
+
+class MessageKind(enum.IntEnum):
+    '''
+    Every kind of message a GameObject can be sent.
+    '''
+    MOVE_LEFT = 0
+    MOVE_RIGHT = 1
+    MOVE_NEUTRAL = 2
+    JUMP = 3
+    HIT_GROUND = 4 # value: y to snap to
+
+
+class Message:
+    '''
+    One message: a kind and a payload slot.
+    Messages belong to a MessageBus and are reused every frame, so
+    read them in the frame they're sent and don't hold on to them.
+    '''
+    __slots__ = ('kind', 'value')
+
+    def __init__(self, kind : MessageKind = MessageKind.MOVE_NEUTRAL, value : float = 0.0) -> None:
+        '''
+        Class init
+        Parameters:
+            kind : MessageKind - what the message means
+            value : float - payload, if the kind has one
+        Returns: None
+        '''
+        self.kind = kind
+        self.value = value
+        return None
+
+    def __repr__(self) -> str:
+        return f"Message({self.kind.name}, {self.value})"
+
+
+class MessageBus:
+    '''
+    Delivers Messages to GameObjects, either to one object or broadcast
+    to everything subscribed to a kind.
+    Messages come out of a pool that is recycled by new_frame(), so
+    sending doesn't allocate once the pool is big enough.
+    '''
+    POOL_SIZE = 64 # messages to start the pool with, it grows if needed
+
+    def __init__(self) -> None:
+        '''
+        Class init
+        Parameters: None
+        Returns: None
+        '''
+        self.__pool = [Message() for i in range(self.POOL_SIZE)]
+
+        # messages of the pool in use this frame
+        self.__used = 0
+
+        # kind -> GameObjects subscribed to it (a dict for its ordering)
+        self.__subscribers = {kind : dict() for kind in MessageKind}
+
+        # GameObjects sent something this frame
+        self.__recipients = dict()
+
+        return None
+
+    def __take(self, kind : MessageKind, value : float) -> Message:
+        '''
+        Get a message out of the pool.
+        Parameters:
+            kind : MessageKind - what the message means
+            value : float - payload
+        Returns: Message - the filled in message
+        '''
+        if(self.__used == len(self.__pool)):
+            self.__pool.append(Message())
+
+        message = self.__pool[self.__used]
+        self.__used += 1
+        message.kind = kind
+        message.value = value
+        return message
+
+    def send(self, target : 'GameObject', kind : MessageKind, value : float = 0.0) -> None:
+        '''
+        Send a message to one GameObject.
+        Parameters:
+            target : GameObject - who gets it
+            kind : MessageKind - what the message means
+            value : float - payload, if the kind has one
+        Returns: None
+        '''
+        target.push_message(self.__take(kind, value))
+        self.__recipients[target] = None
+        return None
+
+    def broadcast(self, kind : MessageKind, value : float = 0.0) -> int:
+        '''
+        Send one message to every GameObject subscribed to its kind.
+        They all get the same Message.
+        Parameters:
+            kind : MessageKind - what the message means
+            value : float - payload, if the kind has one
+        Returns: int - how many GameObjects got it
+        '''
+        subscribers = self.__subscribers[kind]
+        if(not subscribers):
+            return 0
+
+        message = self.__take(kind, value)
+        for target in subscribers:
+            target.push_message(message)
+            self.__recipients[target] = None
+        return len(subscribers)
+
+    def subscribe(self, kind : MessageKind, game_object : 'GameObject') -> None:
+        '''
+        Have a GameObject get every broadcast of a kind.
+        Parameters:
+            kind : MessageKind - kind to get
+            game_object : GameObject - who gets it
+        Returns: None
+        '''
+        self.__subscribers[kind][game_object] = None
+        return None
+
+    def unsubscribe(self, kind : MessageKind, game_object : 'GameObject') -> None:
+        '''
+        Stop a GameObject getting broadcasts of a kind.
+        Parameters:
+            kind : MessageKind - kind to stop getting
+            game_object : GameObject - who was getting it
+        Returns: None
+        '''
+        self.__subscribers[kind].pop(game_object, None)
+        return None
+
+    def unsubscribe_all(self, game_object : 'GameObject') -> None:
+        '''
+        Stop a GameObject getting any broadcasts, and drop any messages
+        still waiting for it.
+        Parameters:
+            game_object : GameObject - who was getting them
+        Returns: None
+        '''
+        for subscribers in self.__subscribers.values():
+            subscribers.pop(game_object, None)
+        if(game_object in self.__recipients):
+            del self.__recipients[game_object]
+            game_object.clear_messages()
+        return None
+
+    def get_sent(self) -> list[Message]:
+        '''
+        Get the messages sent this frame, for debugging.
+        Parameters: None
+        Returns: list[Message] - messages, oldest first
+        '''
+        return self.__pool[:self.__used]
+
+    def new_frame(self) -> None:
+        '''
+        Start a new frame: last frame's messages go back in the pool, and
+        any that weren't read (their GameObject didn't update) are dropped.
+        Parameters: None
+        Returns: None
+        '''
+        for target in self.__recipients:
+            target.clear_messages()
+        self.__recipients.clear()
+        self.__used = 0
+        return None
+
+
+#------------------------------------------------------------------GAME OBJECT
+    
+class GameObject:
+    '''
+    Abstract GameObject class.
+    All GameObjects inherit this.
+    Subclasses must declare __slots__ too (empty if they add nothing),
+    or they get a __dict__ back.
+    '''
+    # levels make thousands of these, so skip the per instance __dict__
+    __slots__ = ('__x', '__y', '__w', '__h', '__messages', '__sprite', '__hit_box', 
+                 '__prev_x', '__prev_y', '__handle', '__drawn_at', '__indexes')
+
+    def __init__(self, x : float, y : float, w : float, h : float) -> None:
+        '''
+        Class init
+        Parameters:
+            x : float - x position
+            y : float - y position
+            w : float - width
+            h : float - height
+        Returns: None
+        '''
+        self.__x = x
+        self.__y = y
+        self.__w = w
+        self.__h = h
+
+        # messages sent to communicate with game object, see MessageBus
+        self.__messages : list[Message] = []
+
+        # by default a GameObject will not have a sprite or hitbox 
+        self.__sprite : tk.PhotoImage = None
+        self.__hit_box : HitBox = None
+
+        # position at the last physics step, for interpolation
+        self.__prev_x = x
+        self.__prev_y = y
+
+        # canvas item and the position it was last drawn at
+        # (retained between frames, see draw())
+        self.__handle = None
+        self.__drawn_at = None
+
+        # spatial indexes we are registered in
+        self.__indexes : list[SpatialHash | AABBTree] = []
+
+        return None
+    
+    def pop_message(self) -> Message :
+        '''
+        Pops a message off of message stack
+        Parameters: None
+        Returns: Message - newest message, None type if empty 
+        '''
+        if(self.__messages):
+            return self.__messages.pop()
+        return None
+    
+    def push_message(self, message : Message) -> None :
+        '''
+        Pushes a message onto message stack, see MessageBus for sending
+        Parameters: 
+            message : Message - message we wanna push
+        Returns: None
+        '''
+        self.__messages.append(message)
+        return None
+
+    def clear_messages(self) -> None :
+        '''
+        Drops every message on the message stack
+        Parameters: None
+        Returns: None
+        '''
+        self.__messages.clear()
+        return None
+    
+    def get_attribs(self) -> tuple[float, float, float, float]:
+        '''
+        Returns The four main GameObject attributes as a tuple.
+        Parameters: None
+        Returns: tuple[float, float, float, float] - x, y, width, height
+        '''
+        return self.__x, self.__y, self.__w, self.__h
+
+    def save_position(self) -> None:
+        '''
+        Remember the current position as the one from the last step.
+        To be called before every physics step.
+        Parameters: None
+        Returns: None
+        '''
+        self.__prev_x = self.__x
+        self.__prev_y = self.__y
+        return None
+
+    def get_draw_position(self, alpha : float = 1) -> tuple[float, float]:
+        '''
+        Get the position to draw at, blended between the last step and
+        this one.
+        Parameters:
+            alpha : float - 0 is the last step, 1 is now
+        Returns: tuple[float, float] - x, y
+        '''
+        if(alpha >= 1):
+            return self.__x, self.__y
+        return (self.__prev_x + ((self.__x - self.__prev_x) * alpha), 
+                self.__prev_y + ((self.__y - self.__prev_y) * alpha))
+
+    def get_hit_box(self) -> HitBox :
+        '''
+        Getter for HitBox
+        Parameters: None
+        Returns GameObject HitBox
+        '''
+        return self.__hit_box
+    
+    def set_hit_box(self, hit_box : HitBox) -> None :
+        '''
+        Setter for HitBox
+        Parameters: 
+            hit_box : HitBox - HitBox were setting to. 
+        Returns: None
+        '''
+        self.__hit_box = hit_box
+        for index in self.__indexes:
+            index.remove(self)
+            index.insert(self)
+        return None
+
+    def add_index(self, index : SpatialHash | AABBTree) -> None :
+        '''
+        Registers GameObject with a spatial index.
+        The index is kept up to date as the GameObject moves.
+        Parameters: 
+            index : SpatialHash | AABBTree - index to register with
+        Returns: None
+        '''
+        if(index not in self.__indexes):
+            self.__indexes.append(index)
+            index.insert(self)
+        return None
+
+    def remove_index(self, index : SpatialHash | AABBTree) -> None :
+        '''
+        Unregisters GameObject from a spatial index.
+        Parameters: 
+            index : SpatialHash | AABBTree - index to unregister from
+        Returns: None
+        '''
+        if(index in self.__indexes):
+            self.__indexes.remove(index)
+            index.remove(self)
+        return None
+
+    def remove_all_indexes(self) -> None :
+        '''
+        Unregisters GameObject from every spatial index.
+        To be called when the GameObject is despawned.
+        Parameters: None
+        Returns: None
+        '''
+        for index in self.__indexes:
+            index.remove(self)
+        self.__indexes = []
+        return None
+    
+    def draw_hitbox(self, canvas : tk.Canvas, camera : Camera) -> None:
+        '''
+        Debug drawing feature for HitBox
+        Parameters:
+            canvas : tk.Canvase - Canvas objet to draw to.
+            camera : Camera - camera the canvas is viewed through
+        Returns None.
+        '''
+        if(self.__hit_box):
+            self.__hit_box.debug_draw(canvas, camera)
+
+    def undraw_hitbox(self, canvas : tk.Canvas) -> None:
+        '''
+        Removes the debug drawing of the HitBox
+        Parameters:
+            canvas : tk.Canvase - Canvas objet to remove from.
+        Returns None.
+        '''
+        if(self.__hit_box):
+            self.__hit_box.debug_undraw(canvas)
+    
+    def set_sprite(self, image : tk.PhotoImage) -> None :
+        '''
+        Setter for sprite
+        Parameters: 
+            image : tk.PhotoImage - image were setting to. 
+        Returns: None
+        '''
+        self.__sprite = image
+
+    def hit_test(self, game_object : 'GameObject') -> bool :
+        '''
+        Check colission against another GameObject
+        Parameters: 
+            game_object : GamrObject to check against.
+        Returns: bool - the result
+        '''
+        hit_box = game_object.get_hit_box()
+
+        # if both GameObjects have a hit box
+        if(self.__hit_box and hit_box):
+            # Check colission
+            return self.__hit_box.box_hit_test(hit_box)
+        
+        # else returns False
+        return False
+    
+    def move(self, x : float = None, y : float = None) -> None:
+        '''
+        Move GameObject tp specific loation.
+        Parameters:
+            x : float - x position
+            y : float - y position
+        Returns: None
+        '''
+        self.__x = x or self.__x
+        self.__y = y or self.__y
+
+        # move the hit box with it
+        if(self.__hit_box):
+            self.__hit_box.move(self.__x, self.__y)
+
+        # and keep the spatial indexes in sync
+        for index in self.__indexes:
+            index.update(self)
+
+        return None
+
+    def move_relative(self, x : float = 0, y : float = 0) -> None:
+        '''
+        Move GameObject relative from wher it os.
+        Parameters:
+            x : float - x movement
+            y : float - y movement
+        Returns: None
+        '''
+        self.__x += x
+        self.__y += y
+
+        # move the hit box with it
+        if(self.__hit_box):
+            self.__hit_box.move(self.__x, self.__y)
+
+        # and keep the spatial indexes in sync
+        for index in self.__indexes:
+            index.update(self)
+
+        return None
+
+    def draw(self, canvas : tk.Canvas, camera : Camera, alpha : float = 1) -> None:
+        '''
+        Draws game object to canvas.
+        The canvas item is created on the first call and only moved
+        on later calls, and only when the GameObject has moved.
+        Camera scrolling is handled by Camera.apply().
+        Parameters:
+            canvas : tk.Canvas - canvas to draw to.
+            camera : Camera - camera the canvas is viewed through
+            alpha : float - how far between the last step and this one
+                            to draw (see get_draw_position())
+        Returns: None
+        '''
+        if(not self.__sprite):
+            return None
+
+        position = self.get_draw_position(alpha)
+
+        if(self.__handle is None):
+            x, y = camera.to_screen(*position)
+            self.__handle = canvas.create_image(x, y, anchor='c', image=self.__sprite, 
+                                                tags=(camera.TAG,))
+        elif(self.__drawn_at != position):
+            canvas.coords(self.__handle, *camera.to_screen(*position))
+
+        self.__drawn_at = position
+        return None
+
+    def get_handle(self) -> int:
+        '''
+        Getter for the canvas item the GameObject is drawn with
+        Parameters: None
+        Returns: int - canvas item, None type if not drawn
+        '''
+        return self.__handle
+
+    def undraw(self, canvas : tk.Canvas) -> None:
+        '''
+        Removes game object from canvas.
+        To be called when the GameObject is despawned.
+        Parameters:
+            canvas : tk.Canvas - canvas to remove from.
+        Returns: None
+        '''
+        if(self.__handle is not None):
+            canvas.delete(self.__handle)
+            self.__handle = None
+            self.__drawn_at = None
+
+        self.undraw_hitbox(canvas)
+        return None
+    
+    def update(self, delta : float) -> None : 
+        '''
+        'Virtual' update function.
+        Parameters:
+            delta - delta time in fraction seconds.
+        Returns: None
+        '''
+        return None
+
+
+#------------------------------------------------------GAME OBJECT DEFINITIONS
+    
+class GrassTile(GameObject):
+    '''
+    Decerative grass
+    '''
+    __slots__ = ()
+
+    def __init__(self, x: float, y: float,  image_cache : ImageCache) -> None:
+        '''
+        Class init
+        Parameters:
+            x : float - x position
+            y : float - y position
+            image_cache : ImageCache - to obtain texture
+        Returns: None
+        '''
+        WIDTH = HEIGHT = 40
+        super().__init__(x, y, WIDTH, HEIGHT)
+        self.set_sprite(image_cache.get('grass'))
+
+        return None
+
+class CoinTile(GameObject):
+    __slots__ = ('__dir', '__y_travel')
+
+    def __init__(self, x: float, y: float,  image_cache : ImageCache) -> None:
+        '''
+        Class init
+        Parameters:
+            x : float - x position
+            y : float - y position
+            image_cache : ImageCache - to obtain texture
+        Returns: None
+        '''
+        WIDTH = HEIGHT = 40
+        super().__init__(x, y, WIDTH, HEIGHT)
+
+        self.set_sprite(image_cache.get('coin'))
+        self.set_hit_box(HitBox(x, y, WIDTH, HEIGHT))
+
+        # direction of animation
+        self.__dir = 'up'
+        # animation travel
+        self.__y_travel = 0
+
+        return None
+
+    def update(self, delta: float) -> None:
+        '''
+        Update coin's animation.
+        Parameters:
+            delta : float - dealta time in fractional seconds
+        Returns: None
+        '''
+        SPEED = 40
+        UPPER_BOUND = -10
+        LOWER_BOUND = 0
+        if(self.__dir == 'down'):
+            self.move_relative(0, SPEED * delta)
+            self.__y_travel += SPEED * delta
+        else:
+            self.move_relative(0, -SPEED * delta)
+            self.__y_travel += -SPEED * delta
+
+        if(self.__y_travel < UPPER_BOUND):
+            self.__dir = 'down'
+        elif(self.__y_travel > LOWER_BOUND):
+            self.__dir = 'up'
+
+        return super().update(delta)
+    
+class CloudTile(GameObject):
+    '''
+    Decorative cloud
+    '''
+    __slots__ = ()
+
+    def __init__(self, x: float, y: float,  image_cache : ImageCache) -> None:
+        '''
+        Class init
+        Parameters:
+            x : float - x position
+            y : float - y position
+            image_cache : ImageCache - to obtain texture
+        Returns: None
+        '''
+        WIDTH = HEIGHT = 80
+        super().__init__(x, y, WIDTH, HEIGHT)
+        self.set_sprite(image_cache.get('cloud'))
+
+        return None
+
+class PalmTile(GameObject):
+    '''
+    Decorative palm tree
+    '''
+    __slots__ = ()
+
+    def __init__(self, x: float, y: float,  image_cache : ImageCache) -> None:
+        '''
+        Class init
+        Parameters:
+            x : float - x position
+            y : float - y position
+            image_cache : ImageCache - to obtain texture
+        Returns: None
+        '''
+        WIDTH = 80
+        HEIGHT = 120
+        super().__init__(x, y, WIDTH, HEIGHT)
+        self.set_sprite(image_cache.get('palm'))
+
+        return None
+
+class ExitTile(GameObject):
+    '''
+    Reach this to win the level.
+    '''
+    __slots__ = ('__dir', 'y_travel')
+
+    def __init__(self, x: float, y: float,  image_cache : ImageCache) -> None:
+        '''
+        Class init
+        Parameters:
+            x : float - x position
+            y : float - y position
+            image_cache : ImageCache - to obtain texture
+        Returns: None
+        '''
+        WIDTH = HEIGHT = 40
+        super().__init__(x, y, WIDTH, HEIGHT)
+        
+        self.set_hit_box(HitBox(x, y, WIDTH, HEIGHT))
+        self.set_sprite(image_cache.get('exit'))
+
+        self.__dir = 'down'
+        self.y_travel = 0
+
+        return None
+
+    def update(self, delta: float) -> None:
+        '''
+        Update signs's animation.
+        Parameters:
+            delta : float - dealta time in fractional seconds
+        Returns: None
+        '''
+        SPEED = 40
+        UPPERBOUND = -5
+        LOWERBOUND = 5
+        if(self.__dir == 'down'):
+            self.move_relative(0, SPEED * delta)
+            self.y_travel += SPEED * delta
+        else:
+            self.move_relative(0, -SPEED * delta)
+            self.y_travel += -SPEED * delta
+
+        if(self.y_travel < UPPERBOUND):
+            self.__dir = 'down'
+        elif(self.y_travel > LOWERBOUND):
+            self.__dir = 'up'
+
+        return super().update(delta)
+
+class Jerk(GameObject):
+    '''
+    The game's "monster"
+    '''
+    __slots__ = ('__dir', '__x_travel')
+
+    def __init__(self, x: float, y: float,  image_cache : ImageCache) -> None:
+        '''
+        Class init
+        Parameters:
+            x : float - x position
+            y : float - y position
+            image_cache : ImageCache - to obtain texture
+        Returns: None
+        '''
+        WIDTH = HEIGHT = 40
+    
+        super().__init__(x, y, WIDTH, HEIGHT)
+        self.set_sprite(image_cache.get('jerk'))
+        self.set_hit_box(HitBox(x, y, WIDTH, HEIGHT))
+
+        self.__dir = 'left'
+        self.__x_travel = 0
+        
+        return None
+    
+    def update(self, delta: float) -> None:
+        '''
+        Update jerk's animation.
+        Parameters:
+            delta : float - dealta time in fractional seconds
+        Returns: None
+        '''
+        SPEED = 30
+        RIGHTBOUND = 40
+        LEFTBOUND = -40
+
+        if(self.__dir == 'left'):
+            if(self.__x_travel > LEFTBOUND):
+                self.move_relative((-SPEED * delta))
+                self.__x_travel += -SPEED * delta
+            else:
+                self.__dir = 'right'
+        if(self.__dir == 'right'):
+            if(self.__x_travel < RIGHTBOUND):
+                self.move_relative((SPEED * delta))
+                self.__x_travel += SPEED * delta
+            else:
+                self.__dir = 'left'
+        return super().update(delta)
+
+class Player(GameObject):
+    MAX_VELOCITY = 1.2
+    __slots__ = ('on_ground', 'x_vel', 'y_vel', '__is_dead', '__tile_map')
+
+    def __init__(self, x: float, y: float,  image_cache : ImageCache) -> None:
+        super().__init__(x, y, 40, 80)
+
+        self.set_sprite(image_cache.get('dude'))
+
+        self.on_ground = True
+        self.x_vel = 0
+        self.y_vel = 0
+        self.__is_dead = False
+
+        # ground to sweep our moves against, see set_tile_map()
+        self.__tile_map : TileMap = None
+
+        self.set_hit_box(HitBox(x, y, 40, 80))
+
+    def set_tile_map(self, tile_map : TileMap) -> None:
+        '''
+        Set the ground the player can't fall through, however long a
+        frame takes.
+        Parameters:
+            tile_map : TileMap - ground (None to not check)
+        Returns: None
+        '''
+        self.__tile_map = tile_map
+        return None
+
+    def is_dead(self):
+        '''
+        Returns true if player should be dead
+        Parameter: None
+        Return: bool
+        '''
+        return self.__is_dead
+
+    def __swept_move(self, dx : float, dy : float) -> tuple[float, float]:
+        '''
+        Cuts a move short if it would carry us clean through the ground.
+        A long frame makes y_vel big enough to skip a whole row of tiles
+        between two ground checks. When the end of the move misses the
+        first solid cell in the way, we stop just inside that cell
+        instead, so the next ground check lands us on it.
+        Parameters:
+            dx : float - x distance we want to move
+            dy : float - y distance we want to move
+        Returns: tuple[float, float] - x and y distance we can move
+        '''
+        NUDGE = 1 # how far into the cell we stop
+
+        if(self.__tile_map is None or (dx == 0 and dy == 0)):
+            return dx, dy
+
+        hit_box = self.get_hit_box()
+        hit = self.__tile_map.sweep(hit_box, dx, dy)
+        if(hit is None):
+            return dx, dy
+
+        # if we still overlap it after the move, the ground check will
+        # catch it like any other landing
+        time_of_impact, col, row = hit
+        x, y, w, h = hit_box.get_attribs()
+        if(self.__tile_map.overlaps_cell(HitBox(x + dx, y + dy, w, h), col, row)):
+            return dx, dy
+
+        fraction = min(1.0, time_of_impact + (NUDGE / max(abs(dx), abs(dy))))
+        return dx * fraction, dy * fraction
+    
+    def update(self, delta : float) -> None:
+        '''
+        Update on-screen player
+        Parameters:
+            delta : float
+        Returns: None
+        '''
+        GRAVITY = 4
+        WALKSPEED = 5
+        JUMP_STRENGTH = -2.5
+
+        message = self.pop_message()
+
+        # consume all the messages sent from the game
+        # and act accordenly 
+        while message:
+            kind = message.kind
+
+            if(kind == MessageKind.MOVE_LEFT):
+                if(self.x_vel > (self.MAX_VELOCITY * -1)):
+                    self.x_vel -= WALKSPEED * delta
+            elif(kind == MessageKind.MOVE_RIGHT):
+                if(self.x_vel < self.MAX_VELOCITY):
+                    self.x_vel += WALKSPEED * delta
+            elif(kind == MessageKind.MOVE_NEUTRAL):
+                if(self.x_vel < 0):
+                    self.x_vel += 2 * delta
+                elif(self.x_vel > 0):
+                    self.x_vel -= 2 * delta
+
+            if(kind == MessageKind.JUMP and self.on_ground):
+                self.y_vel = JUMP_STRENGTH
+                self.on_ground = False
+
+            self.on_ground = False
+            if(kind == MessageKind.HIT_GROUND and self.y_vel > 0):
+                self.on_ground = True
+                self.move(y=message.value)
+                self.y_vel = 0
+
+            if(self.on_ground == False):
+                self.y_vel += GRAVITY * delta
+                
+            message = self.pop_message()
+        
+        self.move_relative(*self.__swept_move(self.x_vel, self.y_vel))
+        
+        # check for falling death
+        if(self.get_attribs()[1] > 800):
+            self.__is_dead = True
+
+        return super().update(delta)
+    
+
+#----------------------------------------------------------------TILE REGISTRY
+
+class TileRegistry:
+    '''
+    Which GameObject each level glyph spawns, and where in its cell.
+    World spawns whatever is registered here, so a new tile type is a
+    GameObject subclass and a register() call.
+    '''
+    TILE_SIZE = 40 # pixel size of a level cell
+
+    def __init__(self) -> None:
+        '''
+        Class init
+        Parameters: None
+        Returns: None
+        '''
+        # glyph -> (factory, x offset, y offset)
+        self.__factories = dict()
+
+        # matches any registered glyph, built when first needed
+        self.__pattern : re.Pattern = None
+
+        return None
+
+    def register(self, glyph : str, factory : type[GameObject], 
+                 x_offset : float = 20, y_offset : float = 20) -> None:
+        '''
+        Spawn a GameObject for every glyph in the level.
+        Parameters:
+            glyph : str - level character
+            factory : type[GameObject] - GameObject class (or anything
+                      called like one, with x, y and an ImageCache)
+            x_offset : float - x of the object from the cell's left edge
+            y_offset : float - y of the object from the cell's top edge
+        Returns: None
+        '''
+        self.__factories[glyph] = (factory, x_offset, y_offset)
+        self.__pattern = None
+        return None
+
+    def unregister(self, glyph : str) -> None:
+        '''
+        Stop spawning anything for a glyph.
+        Parameters:
+            glyph : str - level character
+        Returns: None
+        '''
+        self.__factories.pop(glyph, None)
+        self.__pattern = None
+        return None
+
+    def get_glyphs(self) -> list[str]:
+        '''
+        Get every registered glyph.
+        Parameters: None
+        Returns: list[str] - glyphs, in the order registered
+        '''
+        return list(self.__factories)
+
+    def get_factory(self, glyph : str) -> type[GameObject]:
+        '''
+        Get what a glyph spawns.
+        Parameters:
+            glyph : str - level character
+        Returns: type[GameObject] - factory
+                 None type if the glyph isn't registered
+        '''
+        if(glyph in self.__factories):
+            return self.__factories[glyph][0]
+        return None
+
+    def find(self, chunk_rows : list[str], col0 : int = 0) -> dict[str, list[tuple[int, int]]]:
+        '''
+        Find the cells of a chunk that spawn something, skipping over
+        the empty ones without looking at them one at a time.
+        Parameters:
+            chunk_rows : list[str] - rows of a chunk, see LevelGrid.read_chunk()
+            col0 : int - column the chunk starts at
+        Returns: dict[str, list[tuple[int, int]]] - glyph -> column and row
+                 of each of its cells, in reading order
+        '''
+        if(not self.__factories):
+            return dict()
+
+        if(self.__pattern is None):
+            self.__pattern = re.compile('[' + re.escape(''.join(self.__factories)) + ']')
+
+        found = dict()
+        for row, line in enumerate(chunk_rows):
+            for match in self.__pattern.finditer(line):
+                found.setdefault(match.group(), []).append((col0 + match.start(), row))
+        return found
+
+    def group(self, objects : list[tuple[int, int, str]]) -> dict[str, list[tuple[int, int]]]:
+        '''
+        Same as find(), for a compiled level's object table, which has
+        already picked out the cells that aren't empty or ground.
+        Parameters:
+            objects : list[tuple[int, int, str]] - column, row and glyph of
+                      each cell, see LevelBinary.read_objects()
+        Returns: dict[str, list[tuple[int, int]]] - glyph -> column and row
+                 of each of its cells, in the table's order
+        '''
+        found = dict()
+        for col, row, glyph in objects:
+            if(glyph in self.__factories):
+                found.setdefault(glyph, []).append((col, row))
+        return found
+
+    def spawn(self, glyph : str, cells : list[tuple[int, int]], 
+              image_cache : ImageCache) -> list[GameObject]:
+        '''
+        Spawn the GameObjects for every cell of one glyph.
+        Parameters:
+            glyph : str - level character, must be registered
+            cells : list[tuple[int, int]] - column and row of each cell
+            image_cache : ImageCache - to obtain textures
+        Returns: list[GameObject] - one per cell, in the same order
+        '''
+        factory, x_offset, y_offset = self.__factories[glyph]
+        size = self.TILE_SIZE
+        return [factory((size * col) + x_offset, (size * row) + y_offset, image_cache) 
+                for col, row in cells]
+
+
+# the game's own tiles, register more here
+TILES = TileRegistry()
+TILES.register('b', GrassTile)
+TILES.register('c', CoinTile)
+TILES.register('t', PalmTile, 40, -20)
+TILES.register('e', ExitTile)
+TILES.register('j', Jerk)
+TILES.register('l', CloudTile, 40, 40)
+
+
+#------------------------------------------------------------------------LEVEL
+
+def load_level(path : str) -> list[list[str]] :
+    '''
+    Parse level file into list of list contaning level data
+    Parameters:
+        path : str - path to file
+    Returns: list[list[str]] - level data
+    '''
+
+    EOF = ''
+    buffer = ''
+    data = []
+    row = 0
+
+    try:
+        with open(path, 'r') as in_file:
+            buffer = in_file.readline()
+            while buffer != EOF:
+                data.append([])
+                for char in buffer:
+                    data[row].append(char)
+                row += 1
+                buffer = in_file.readline()
+
+    except IOError as e:
+        print(f"Had trouble reading {path}!")
+
+    return data
+
+
+class LevelGrid:
+    '''
+    A parsed level, handed out a chunk of columns at a time so the
+    World only has to spawn the part of the level near the camera.
+    LevelStream does the same straight from a file.
+    '''
+    CHUNK_COLUMNS = 32 # columns per chunk, a screen's worth
+
+    def __init__(self, level_data : list[list[str]], 
+                 chunk_columns : int = CHUNK_COLUMNS) -> None:
+        '''
+        Class init
+        Parameters:
+            level_data : list[list[str]] - parsed level, see load_level()
+            chunk_columns : int - columns per chunk
+        Returns: None
+        '''
+        self.__chunk_columns = chunk_columns
+        self.__rows = [''.join(row).rstrip('\r\n') for row in level_data]
+        self.__cols = max((len(row) for row in self.__rows), default=0)
+
+        return None
+
+    def get_size(self) -> tuple[int, int]:
+        '''
+        Get the size of the level in cells.
+        Parameters: None
+        Returns: tuple[int, int] - columns, rows
+        '''
+        return self.__cols, len(self.__rows)
+
+    def get_chunk_columns(self) -> int:
+        '''
+        Get the number of columns in a chunk.
+        Parameters: None
+        Returns: int - columns per chunk
+        '''
+        return self.__chunk_columns
+
+    def get_path(self) -> str:
+        '''
+        Get the file the level came from.
+        Parameters: None
+        Returns: str - None type, a parsed level has no file
+        '''
+        return None
+
+    def get_player_cell(self) -> tuple[int, int]:
+        '''
+        Find where the player starts.
+        Parameters: None
+        Returns: tuple[int, int] - column and row of the first 'p'
+                 None type if there isn't one
+        '''
+        for row, line in enumerate(self.__rows):
+            col = line.find('p')
+            if(col != -1):
+                return col, row
+        return None
+
+    def read_chunk(self, index : int) -> list[str]:
+        '''
+        Get one chunk of the level.
+        Parameters:
+            index : int - chunk index, chunk 0 starts at column 0
+        Returns: list[str] - the chunk's part of every row, top to bottom
+                 (shorter where a row ends early)
+        '''
+        col0 = index * self.__chunk_columns
+        return [line[col0:col0 + self.__chunk_columns] for line in self.__rows]
+
+    def close(self) -> None:
+        '''
+        Done with the level.
+        Parameters: None
+        Returns: None
+        '''
+        return None
+
+
+class LevelStream:
+    '''
+    Reads a level file a chunk of columns at a time, so even levels
+    thousands of screens wide start right away.
+    Where each row starts is found once, after that a chunk is just a
+    seek and a short read per row. Same interface as LevelGrid.
+    '''
+    BLOCK_SIZE = 1 << 20 # bytes read at a time while finding rows
+
+    def __init__(self, path : str, 
+                 chunk_columns : int = LevelGrid.CHUNK_COLUMNS) -> None:
+        '''
+        Class init
+        Parameters:
+            path : str - path to level file
+            chunk_columns : int - columns per chunk
+        Returns: None
+        '''
+        self.__path = path
+        self.__chunk_columns = chunk_columns
+
+        # byte offset and length (without line ending) of each row
+        self.__row_starts = []
+        self.__row_lengths = []
+
+        # column and row of the first 'p'
+        self.__player_cell = None
+
+        self.__file = None
+        try:
+            self.__file = open(path, 'rb')
+            self.__find_rows()
+        except IOError as e:
+            print(f"Had trouble reading {path}!")
+
+            # an empty level, not whatever we got through before the error
+            self.__row_starts = []
+            self.__row_lengths = []
+            self.__player_cell = None
+            self.close()
+
+        return None
+
+    def __find_rows(self) -> None:
+        '''
+        One pass over the file to find where every row starts and ends,
+        and where the player is.
+        Parameters: None
+        Returns: None
+        '''
+        starts = [0]
+        line_ends = []
+        player_offset = None
+        position = 0
+
+        block = self.__file.read(self.BLOCK_SIZE)
+        while(block):
+            if(player_offset is None):
+                found = block.find(b'p')
+                if(found != -1):
+                    player_offset = position + found
+
+            found = block.find(b'\n')
+            while(found != -1):
+                line_ends.append(position + found)
+                starts.append(position + found + 1)
+                found = block.find(b'\n', found + 1)
+
+            position += len(block)
+            block = self.__file.read(self.BLOCK_SIZE)
+
+        # a file ending in a line break doesn't have an empty last row
+        if(starts[-1] == position):
+            starts.pop()
+        else:
+            line_ends.append(position)
+
+        for start, end in zip(starts, line_ends):
+            # drop the \r of \r\n line endings
+            if(end > start):
+                self.__file.seek(end - 1)
+                if(self.__file.read(1) == b'\r'):
+                    end -= 1
+            self.__row_starts.append(start)
+            self.__row_lengths.append(end - start)
+
+        if(player_offset is not None):
+            row = bisect.bisect_right(self.__row_starts, player_offset) - 1
+            self.__player_cell = (player_offset - self.__row_starts[row], row)
+
+        return None
+
+    def get_size(self) -> tuple[int, int]:
+        '''
+        Get the size of the level in cells.
+        Parameters: None
+        Returns: tuple[int, int] - columns, rows
+        '''
+        return max(self.__row_lengths, default=0), len(self.__row_lengths)
+
+    def get_chunk_columns(self) -> int:
+        '''
+        Get the number of columns in a chunk.
+        Parameters: None
+        Returns: int - columns per chunk
+        '''
+        return self.__chunk_columns
+
+    def get_path(self) -> str:
+        '''
+        Get the file the level came from.
+        Parameters: None
+        Returns: str - path to level file
+        '''
+        return self.__path
+
+    def get_player_cell(self) -> tuple[int, int]:
+        '''
+        Find where the player starts.
+        Parameters: None
+        Returns: tuple[int, int] - column and row of the first 'p'
+                 None type if there isn't one
+        '''
+        return self.__player_cell
+
+    def read_chunk(self, index : int) -> list[str]:
+        '''
+        Read one chunk of the level.
+        Parameters:
+            index : int - chunk index, chunk 0 starts at column 0
+        Returns: list[str] - the chunk's part of every row, top to bottom
+                 (shorter where a row ends early)
+        '''
+        col0 = index * self.__chunk_columns
+        chunk_rows = []
+        for start, length in zip(self.__row_starts, self.__row_lengths):
+            if(col0 >= length):
+                chunk_rows.append('')
+                continue
+            self.__file.seek(start + col0)
+            data = self.__file.read(min(self.__chunk_columns, length - col0))
+            chunk_rows.append(data.decode('latin-1'))
+        return chunk_rows
+
+    def close(self) -> None:
+        '''
+        Done with the level, closes the file.
+        Parameters: None
+        Returns: None
+        '''
+        if(self.__file is not None):
+            self.__file.close()
+            self.__file = None
+        return None
+
+
+def read_level_lines(path : str) -> list[bytes]:
+    '''
+    Reads a level file as raw rows, without line endings.
+    Parameters:
+        path : str - path to level file
+    Returns: list[bytes] - one bytes per row, top to bottom
+    '''
+    with open(path, 'rb') as in_file:
+        lines = in_file.read().split(b'\n')
+
+    # a file ending in a line break doesn't have an empty last row
+    if(lines and not lines[-1]):
+        lines.pop()
+    return [line[:-1] if line.endswith(b'\r') else line for line in lines]
+
+
+def compile_level(path : str, out_path : str = None) -> str:
+    '''
+    Compiles a level file to the binary format LevelBinary loads.
+    Layout, little endian:
+        header  - LevelBinary.HEADER, padded to LevelBinary.GRID_OFFSET
+        grid    - uint8 glyph per cell, column by column (a chunk of
+                  columns is one run of bytes), short rows padded with '0'
+        objects - every cell that isn't empty or ground, in grid order, as
+                  uint32 columns, then uint32 rows, then uint8 glyphs
+    Parameters:
+        path : str - level file to compile
+        out_path : str - where to write it (None for path with .lvb)
+    Returns: str - path written to
+    '''
+    if(out_path is None):
+        out_path = os.path.splitext(path)[0] + LevelBinary.EXTENSION
+
+    lines = read_level_lines(path)
+    rows = len(lines)
+    cols = max((len(line) for line in lines), default=0)
+
+    # every row is a slice through the column major grid
+    grid = bytearray(b'0' * (cols * rows))
+    for row, line in enumerate(lines):
+        grid[row:len(line) * rows:rows] = line
+
+    objects = []
+    for row, line in enumerate(lines):
+        for match in re.finditer(rb'[^0g]', line):
+            objects.append((match.start(), row, line[match.start()]))
+    objects.sort()
+
+    player_col, player_row = -1, -1
+    for row, line in enumerate(lines):
+        col = line.find(b'p')
+        if(col != -1):
+            player_col, player_row = col, row
+            break
+
+    header = LevelBinary.HEADER.pack(LevelBinary.MAGIC, LevelBinary.VERSION, 0, cols, rows, 
+                                     player_col, player_row, len(objects))
+
+    with open(out_path, 'wb') as out_file:
+        out_file.write(header.ljust(LevelBinary.GRID_OFFSET, b'\0'))
+        out_file.write(grid)
+        # keep the uint32 arrays 4 byte aligned
+        out_file.write(b'\0' * (-len(grid) % 4))
+        out_file.write(struct.pack(f'<{len(objects)}I', *(col for col, row, glyph in objects)))
+        out_file.write(struct.pack(f'<{len(objects)}I', *(row for col, row, glyph in objects)))
+        out_file.write(bytes(glyph for col, row, glyph in objects))
+
+    return out_path
+
+
+class LevelBinary:
+    '''
+    A compiled level (see compile_level()), memory mapped, so loading
+    is only reading the header no matter how big the level is.
+    Chunks are sliced straight out of the mapped grid. Same interface
+    as LevelGrid.
+    '''
+    EXTENSION = '.lvb'
+    MAGIC = b'LVB1'
+    VERSION = 1
+
+    # magic, version, flags, columns, rows, player column, player row
+    # (-1 for no player), object count
+    HEADER = struct.Struct('<4sHHIIiiI')
+    GRID_OFFSET = 32 # where the grid starts, after the padded header
+
+    def __init__(self, path : str, 
+                 chunk_columns : int = LevelGrid.CHUNK_COLUMNS) -> None:
+        '''
+        Class init
+        Parameters:
+            path : str - path to compiled level file
+            chunk_columns : int - columns per chunk
+        Returns: None
+        '''
+        self.__path = path
+        self.__chunk_columns = chunk_columns
+        self.__cols = 0
+        self.__rows = 0
+        self.__player_cell = None
+
+        self.__file = None
+        self.__map = None
+        self.__views = []
+        self.__grid = memoryview(b'')
+        self.__object_cols = []
+        self.__object_rows = []
+        self.__object_glyphs = memoryview(b'')
+
+        try:
+            self.__file = open(path, 'rb')
+            if(os.fstat(self.__file.fileno()).st_size >= self.GRID_OFFSET):
+                self.__map = mmap.mmap(self.__file.fileno(), 0, access=mmap.ACCESS_READ)
+        except IOError as e:
+            # an empty level, like LevelStream gives
+            print(f"Had trouble reading {path}!")
+            self.close()
+            return None
+
+        if(self.__map is None or self.__map[:4] != self.MAGIC):
+            self.close()
+            raise ValueError(f"{path} isn't a compiled level")
+
+        (magic, version, flags, self.__cols, self.__rows, 
+         player_col, player_row, count) = self.HEADER.unpack_from(self.__map)
+        if(version != self.VERSION):
+            self.close()
+            raise ValueError(f"{path} is version {version}, expected {self.VERSION}")
+
+        if(player_row != -1):
+            self.__player_cell = (player_col, player_row)
+
+        data = memoryview(self.__map)
+        grid_end = self.GRID_OFFSET + (self.__cols * self.__rows)
+        cols_start = grid_end + (-grid_end % 4)
+        rows_start = cols_start + (4 * count)
+        glyphs_start = rows_start + (4 * count)
+
+        self.__grid = data[self.GRID_OFFSET:grid_end]
+        self.__object_glyphs = data[glyphs_start:glyphs_start + count]
+        self.__views = [data, self.__grid, self.__object_glyphs]
+        if(sys.byteorder == 'little'):
+            self.__object_cols = data[cols_start:rows_start].cast('I')
+            self.__object_rows = data[rows_start:glyphs_start].cast('I')
+            self.__views += [self.__object_cols, self.__object_rows]
+        else:
+            self.__object_cols = struct.unpack_from(f'<{count}I', self.__map, cols_start)
+            self.__object_rows = struct.unpack_from(f'<{count}I', self.__map, rows_start)
+
+        return None
+
+    def get_size(self) -> tuple[int, int]:
+        '''
+        Get the size of the level in cells.
+        Parameters: None
+        Returns: tuple[int, int] - columns, rows
+        '''
+        return self.__cols, self.__rows
+
+    def get_chunk_columns(self) -> int:
+        '''
+        Get the number of columns in a chunk.
+        Parameters: None
+        Returns: int - columns per chunk
+        '''
+        return self.__chunk_columns
+
+    def get_path(self) -> str:
+        '''
+        Get the file the level came from.
+        Parameters: None
+        Returns: str - path to level file
+        '''
+        return self.__path
+
+    def get_player_cell(self) -> tuple[int, int]:
+        '''
+        Find where the player starts.
+        Parameters: None
+        Returns: tuple[int, int] - column and row of the first 'p'
+                 None type if there isn't one
+        '''
+        return self.__player_cell
+
+    def read_chunk(self, index : int) -> list[str]:
+        '''
+        Read one chunk of the level.
+        Parameters:
+            index : int - chunk index, chunk 0 starts at column 0
+        Returns: list[str] - the chunk's part of every row, top to bottom
+        '''
+        rows = self.__rows
+        col0 = min(index * self.__chunk_columns, self.__cols)
+        col1 = min(col0 + self.__chunk_columns, self.__cols)
+        data = self.__grid[col0 * rows:col1 * rows].tobytes()
+        return [data[row::rows].decode('latin-1') for row in range(rows)]
+
+    def read_objects(self, index : int) -> list[tuple[int, int, str]]:
+        '''
+        Read the object table for one chunk of the level.
+        Parameters:
+            index : int - chunk index
+        Returns: list[tuple[int, int, str]] - column, row and glyph of every
+                 cell in the chunk that isn't empty or ground, column by column
+        '''
+        col0 = index * self.__chunk_columns
+        start = bisect.bisect_left(self.__object_cols, col0)
+        end = bisect.bisect_left(self.__object_cols, col0 + self.__chunk_columns)
+        glyphs = self.__object_glyphs[start:end].tobytes().decode('latin-1')
+        return list(zip(self.__object_cols[start:end], self.__object_rows[start:end], glyphs))
+
+    def close(self) -> None:
+        '''
+        Done with the level, unmaps and closes the file.
+        Parameters: None
+        Returns: None
+        '''
+        # views into the map have to go before it can be closed
+        for view in reversed(self.__views):
+            view.release()
+        self.__views = []
+        self.__grid = memoryview(b'')
+        self.__object_cols = []
+        self.__object_rows = []
+        self.__object_glyphs = memoryview(b'')
+
+        if(self.__map is not None):
+            self.__map.close()
+            self.__map = None
+        if(self.__file is not None):
+            self.__file.close()
+            self.__file = None
+        return None
+
+
+def open_level(path : str, 
+               chunk_columns : int = LevelGrid.CHUNK_COLUMNS) -> LevelStream | LevelBinary:
+    '''
+    Opens a level for World to stream from.
+    A .txt level with an up to date compiled copy next to it (same name,
+    .lvb) loads the compiled copy instead.
+    Parameters:
+        path : str - level file, .txt or compiled .lvb
+        chunk_columns : int - columns per chunk
+    Returns: LevelStream | LevelBinary - the opened level
+    '''
+    root, extension = os.path.splitext(path)
+    if(extension == LevelBinary.EXTENSION):
+        return LevelBinary(path, chunk_columns)
+
+    compiled = root + LevelBinary.EXTENSION
+    try:
+        if(os.path.getmtime(compiled) >= os.path.getmtime(path)):
+            return LevelBinary(compiled, chunk_columns)
+    except OSError:
+        pass
+
+    return LevelStream(path, chunk_columns)
+
+
+#------------------------------------------------------------------------WORLD
+
+class NullRenderer:
+    '''
+    Renderer that doesn't draw anything.
+    Lets a World run without Tk, see Game for the real thing.
+    '''
+    def draw(self, world : 'World', alpha : float = 1) -> None:
+        '''
+        Draws the world (or in this case, doesn't).
+        Parameters:
+            world : World - world to draw
+            alpha : float - how far between the last physics step and
+                            this one to draw moving things
+        Returns: None
+        '''
+        return None
+
+    def remove(self, game_object : GameObject) -> None:
+        '''
+        Forget about a GameObject that was despawned.
+        Parameters:
+            game_object : GameObject - object that was removed
+        Returns: None
+        '''
+        return None
+
+
+class World:
+    '''
+    The game simulation: level, GameObjects, player physics, scoring
+    and winning/dying. Knows nothing about Tk; drawing is left to a
+    renderer and input comes from any InputState.
+    '''
+    INPUTS = ('move_left', 'move_right', 'jump', 'hitbox') # inputs we read
+    TILE_SIZE = 40        # width and height of a tile
+    VIEW_CELL_SIZE = 160  # grid cell size for finding what is on screen
+    SLEEP_MARGIN = 640    # how far off screen things are still updated
+    TREE_MARGIN = 16      # how far things move before the AABB tree notices
+
+    # how far past the sleep margin level chunks are loaded, so things
+    # are spawned before they wake up (palms and clouds stick out a tile)
+    LOAD_MARGIN = SLEEP_MARGIN + (2 * TILE_SIZE)
+
+    def __init__(self, level : list[list[str]] | LevelGrid | LevelStream | LevelBinary, 
+                 input_state : InputState, 
+                 image_cache : ImageCache = None, renderer : NullRenderer = None, 
+                 w : float = 1280, h : float = 720, profiler : NullProfiler = None, 
+                 index : str = 'tree', tiles : TileRegistry = None) -> None:
+        '''
+        Class init
+        Parameters:
+            level : list[list[str]] | LevelGrid | LevelStream | LevelBinary - 
+                    the level, parsed (see load_level()) or streamed from
+                    a file (see open_level())
+            input_state : InputState - where player input comes from
+            image_cache : ImageCache - to obtain textures (None for no textures)
+            renderer : NullRenderer - told about despawned GameObjects
+                                      (None for no renderer)
+            w : float - viewport width
+            h : float - viewport height
+            profiler : NullProfiler - times each stage of a step
+                                      (None for no profiling)
+            index : str - spatial index for colission and view queries,
+                          'tree' (AABBTree) or 'grid' (SpatialHash)
+            tiles : TileRegistry - what each glyph spawns (None for TILES)
+        Returns: None
+        Raises: ValueError - the level has no player
+        '''
+        self.input_state = input_state
+        self.image_cache = image_cache or ImageCache()
+        self.__renderer = renderer or NullRenderer()
+        self.profiler = profiler or NullProfiler()
+
+        self.__score = 0
+
+        self.__player : Player 
+
+        self.alive = True
+
+        # 'won' or 'died' once the game is over
+        self.result = None
+
+        # number of steps simulated so far
+        self.steps = 0
+
+        # debug drawing of hit boxes, toggled by the 'hitbox' input
+        self.draw_hitbox = False
+
+        self.game_objects = []
+
+        # spatial index of every GameObject with a hit box
+        if(index == 'grid'):
+            self.__index = SpatialHash(self.TILE_SIZE)
+        else:
+            self.__index = AABBTree(self.TREE_MARGIN)
+
+        # the level is read and spawned a chunk of columns at a time as
+        # the camera gets close, and dropped again once far behind
+        if(isinstance(level, list)):
+            level = LevelGrid(level)
+        self.__level = level
+        cols, rows = level.get_size()
+
+        # an unreadable level file comes to us empty, so this catches both
+        if(level.get_player_cell() is None):
+            raise ValueError(f"{level.get_path() or 'level'} has no player ('p'), "
+                             f"or couldn't be read")
+
+        # ground is static, so it lives in a tile map instead of GameObjects
+        self.__tile_map = TileMap(cols, rows, 'g', self.TILE_SIZE, 
+                                  chunk_columns=level.get_chunk_columns())
+
+        # what part of the world we are looking at
+        self.__camera = Camera(w, h)
+
+        # spatial index of every GameObject by size, for finding what is
+        # on screen (or close enough to keep updating)
+        if(index == 'grid'):
+            self.__view_index = SpatialHash(self.VIEW_CELL_SIZE, by_hit_box=False)
+        else:
+            self.__view_index = AABBTree(self.TREE_MARGIN, by_hit_box=False)
+
+        # GameObject -> the cell it spawned from as (row * columns) + column,
+        # so sorting by it gives the level's reading order, which is also
+        # the drawing order
+        self.__order = dict()
+
+        # chunk index -> GameObjects spawned from it, for loaded chunks
+        self.__chunks = dict()
+
+        # cells whose GameObject was despawned (coins collected and so
+        # on), so they don't come back if their chunk is loaded again
+        self.__removed_cells = set()
+
+        # (first, last) chunks the last stream wanted loaded
+        self.__chunk_range = None
+
+        # what the level's glyphs spawn, and how much of it we have
+        self.__tiles = tiles or TILES
+        self.__spawn_stats = {'chunks' : 0, 'cells' : 0, 'objects' : dict(), 'seconds' : 0.0}
+
+        # the player is always around, whatever is loaded
+        col, row = level.get_player_cell()
+        self.__player = Player((40 * col) + 20, (40 * row), self.image_cache)
+        self.__add(self.__player, (row * cols) + col)
+        self.__player.set_tile_map(self.__tile_map)
+
+        # messages for GameObjects, input is broadcast to whoever listens
+        self.__bus = MessageBus()
+        for kind in (MessageKind.MOVE_LEFT, MessageKind.MOVE_RIGHT, 
+                     MessageKind.MOVE_NEUTRAL, MessageKind.JUMP):
+            self.__bus.subscribe(kind, self.__player)
 
-        self.on_ground = True
-        self.x_vel = 0
-        self.y_vel = 0
-        self.__is_dead = False
+        self.__stream_chunks()
 
-        self.set_hit_box(HitBox(x, y, 40, 80))
+        return None
 
-    def is_dead(self):
+    def __add(self, game_object : GameObject, cell : int) -> None:
         '''
-        Returns true if player should be dead
-        Parameter: None
-        Return: bool
+        Adds a GameObject to the world.
+        Parameters:
+            game_object : GameObject - object to add
+            cell : int - cell it spawned from, see __order
+        Returns: None
         '''
-        return self.__is_dead
-    
-    def update(self, delta : float) -> None:
+        self.game_objects.append(game_object)
+        self.__order[game_object] = cell
+        game_object.add_index(self.__index)
+        game_object.add_index(self.__view_index)
+        return None
+
+    def __spawn_chunk(self, index : int) -> None:
         '''
-        Update on-screen player
+        Loads a chunk of the level, spawning its GameObjects.
         Parameters:
-            delta : float
+            index : int - chunk index
         Returns: None
         '''
-        GRAVITY = 4
-        WALKSPEED = 5
-        JUMP_STRENGTH = -2.5
-
-        signal = self.pop_signal()
-
-        # consume all the signals sent from the game
-        # and act accordenly 
-        while signal:
-            signal_tokens = signal.split(' ')
-
-            if(signal == 'move_left'):
-                if(self.x_vel > (self.MAX_VELOCITY * -1)):
-                    self.x_vel -= WALKSPEED * delta
-            elif(signal == 'move_right'):
-                if(self.x_vel < self.MAX_VELOCITY):
-                    self.x_vel += WALKSPEED * delta
-            elif(signal == 'move_neutral'):
-                if(self.x_vel < 0):
-                    self.x_vel += 2 * delta
-                elif(self.x_vel > 0):
-                    self.x_vel -= 2 * delta
-
-            if(signal == 'jump' and self.on_ground):
-                self.y_vel = JUMP_STRENGTH
-                self.on_ground = False
-
-            self.on_ground = False
-            if(signal_tokens[0] == 'hit_ground' and self.y_vel > 0):
-                self.on_ground = True
-                self.move(y=float(signal_tokens[1]))
-                self.y_vel = 0
-
-            if(self.on_ground == False):
-                self.y_vel += GRAVITY * delta
-                
-            signal = self.pop_signal()
-        
-        self.move_relative(self.x_vel, self.y_vel)
-        
-        # check for falling death
-        if(self.get_attribs()[1] > 800):
-            self.__is_dead = True
+        chunk_rows = self.__level.read_chunk(index)
+        self.__tile_map.load_chunk(index, chunk_rows)
 
-        return super().update(delta)
-    
+        start = time.perf_counter()
+        cols = self.__level.get_size()[0]
+        col0 = index * self.__level.get_chunk_columns()
+        stats = self.__spawn_stats
 
-#------------------------------------------------------------------GAME CANVAS
+        # compiled levels list their objects, so there is nothing to scan
+        if(isinstance(self.__level, LevelBinary)):
+            found = self.__tiles.group(self.__level.read_objects(index))
+        else:
+            found = self.__tiles.find(chunk_rows, col0)
+
+        # built a glyph at a time, then added in reading order, which
+        # is the order the level draws and updates in
+        spawned = []
+        for glyph, cells in found.items():
+            cells = [(col, row) for col, row in cells 
+                     if (row * cols) + col not in self.__removed_cells]
+            game_objects = self.__tiles.spawn(glyph, cells, self.image_cache)
+            spawned += zip([(row * cols) + col for col, row in cells], game_objects)
+            stats['objects'][glyph] = stats['objects'].get(glyph, 0) + len(cells)
+        spawned.sort(key=lambda pair: pair[0])
+
+        chunk = dict()
+        for cell, go in spawned:
+            self.__add(go, cell)
+            chunk[go] = None
+
+        stats['chunks'] += 1
+        stats['cells'] += sum(len(row) for row in chunk_rows)
+        stats['seconds'] += time.perf_counter() - start
+
+        self.__chunks[index] = chunk
+        return None
 
-class Game(tk.Canvas):
-    __WIDTH = 1280  # width of canvas
-    __HEIGHT = 720  # height of canvas
-    __X_RES = 32    # num of horz tiles
-    __Y_RES = 18    # num of vert tiles
-    __LEVEL_PATH = 'level2.txt' # data file to load from
-    __GRAVITY = 4
+    def __evict_chunk(self, index : int) -> None:
+        '''
+        Drops a chunk of the level and its GameObjects.
+        Parameters:
+            index : int - chunk index
+        Returns: None
+        '''
+        evicted = self.__chunks.pop(index)
+        for go in evicted:
+            self.__renderer.remove(go)
+            self.__bus.unsubscribe_all(go)
+            go.remove_all_indexes()
+            del self.__order[go]
+        self.game_objects = [go for go in self.game_objects if go not in evicted]
+        self.__tile_map.unload_chunk(index)
+        return None
 
-    def __init__(self, root : tk.Tk) -> None:
+    def __stream_chunks(self) -> None:
         '''
-        Class init
+        Loads the chunks around the camera and the player, and drops
+        the ones that are more than a chunk further away than that.
         Parameters: None
         Returns: None
         '''
-        # init base canvas
-        super().__init__(width=self.__WIDTH, height=self.__HEIGHT)
+        cols = self.__level.get_size()[0]
+        chunk_width = self.__level.get_chunk_columns() * self.TILE_SIZE
+        last_chunk = max(0, (cols - 1) // self.__level.get_chunk_columns())
 
-        
-        input_defs = {'a' : 'move_left', 'Left' : 'move_left', 'd' : 'move_right', 
-                  'Right' : 'move_right', 'w' : 'jump', 'space' : 'jump', 'Up' : 'jump',
-                  'h': 'hitbox'}
+        view_x, view_y, view_w, view_h = self.__camera.get_view().get_attribs()
+        player_x = self.__player.get_attribs()[0]
+        left = min(view_x - (view_w / 2), player_x) - self.LOAD_MARGIN
+        right = max(view_x + (view_w / 2), player_x) + self.LOAD_MARGIN
 
-        self.input_handler = InputHandler(root, input_defs)
+        first = max(0, math.floor(left / chunk_width))
+        last = min(last_chunk, math.floor(right / chunk_width))
 
-        self.delta_time = DeltaTime()
+        # nothing to do until the camera or player crosses into another chunk
+        if(self.__chunk_range == (first, last)):
+            return None
+        self.__chunk_range = (first, last)
 
-        self.level_data = self.__load_level(self.__LEVEL_PATH)
-        self.image_cache = ImageCache()
+        for index in list(self.__chunks):
+            if(index < first - 1 or index > last + 1):
+                self.__evict_chunk(index)
 
-        self.image_cache.load_image('ground', 'assets/ground.png')
-        self.image_cache.load_image('coin', 'assets/coin.png')
-        self.image_cache.load_image('cloud', 'assets/cloud.png')
-        self.image_cache.load_image('jerk', 'assets/jerk.png')
-        self.image_cache.load_image('palm', 'assets/palm.png')
-        self.image_cache.load_image('exit', 'assets/exit.png')
-        self.image_cache.load_image('grass', 'assets/grass.png')
-        self.image_cache.load_image('dude', 'assets/dude.png')
+        for index in range(first, last + 1):
+            if(index not in self.__chunks):
+                self.__spawn_chunk(index)
 
-        self.__score = 0
+        return None
 
-        self.__player : Player 
-        self.__ground = []
+    def get_score(self) -> float:
+        '''
+        Getter for score
+        Parameters: None
+        Returns: float - score
+        '''
+        return self.__score
 
-        self.alive = True
+    def get_spawn_stats(self) -> dict:
+        '''
+        Get how much spawning the world has done.
+        Parameters: None
+        Returns: dict - chunks loaded, level cells looked at, GameObjects
+                 spawned per glyph, and seconds spent spawning them
+        '''
+        stats = dict(self.__spawn_stats)
+        stats['objects'] = dict(stats['objects'])
+        return stats
 
-        self.game_objects = []
+    def get_player(self) -> 'Player':
+        '''
+        Getter for the player
+        Parameters: None
+        Returns: Player - the player
+        '''
+        return self.__player
 
-        self.__draw_hitbox = False
+    def get_message_bus(self) -> MessageBus:
+        '''
+        Getter for the message bus
+        Parameters: None
+        Returns: MessageBus - the bus GameObjects get their messages from
+        '''
+        return self.__bus
 
-        self.__spawn_tiles(self.level_data, self.image_cache)
+    def get_camera(self) -> Camera:
+        '''
+        Getter for the camera
+        Parameters: None
+        Returns: Camera - the camera
+        '''
+        return self.__camera
 
-        return None
+    def get_tile_map(self) -> TileMap:
+        '''
+        Getter for the ground tile map
+        Parameters: None
+        Returns: TileMap - the tile map
+        '''
+        return self.__tile_map
 
-    def __load_level(self, path : str) -> list[list[str]] :
+    def query_view(self, view : HitBox) -> list[GameObject]:
         '''
-        Parse level file into list of list contaning level data
+        Find every GameObject inside an area of the world.
         Parameters:
-            path : str - path to file
-        Returns: list[list[str]] - level data
+            view : HitBox - area to look in
+        Returns: list[GameObject] - GameObjects in spawn (drawing) order
         '''
+        return sorted(self.__view_index.query(view), key=self.__order.get)
 
-        EOF = ''
-        buffer = ''
-        data = []
-        row = 0
-
-        try:
-            with open(path, 'r') as in_file:
-                buffer = in_file.readline()
-                while buffer != EOF:
-                    data.append([])
-                    for char in buffer:
-                        data[row].append(char)
-                    row += 1
-                    buffer = in_file.readline()
+    def __despawn(self, game_object : GameObject) -> None:
+        '''
+        Removes a GameObject from the world.
+        Parameters:
+            game_object : GameObject - object to remove
+        Returns: None
+        '''
+        self.__renderer.remove(game_object)
+        self.__bus.unsubscribe_all(game_object)
+        game_object.remove_all_indexes()
+        self.game_objects.remove(game_object)
+
+        # remember it's gone in case its chunk is loaded again
+        cell = self.__order.pop(game_object, None)
+        if(cell is not None):
+            self.__removed_cells.add(cell)
+            chunk = (cell % self.__level.get_size()[0]) // self.__level.get_chunk_columns()
+            self.__chunks.get(chunk, dict()).pop(game_object, None)
+        return None
 
-        except IOError as e:
-            print(f"Had trouble reading {path}!")
+    def step(self, delta : float) -> None:
+        '''
+        Advance the simulation by one step.
+        Parameters:
+            delta : float - step length in fractional seconds
+        Returns: None
+        '''
+        hit_ground = False
+        self.steps += 1
 
-        return data
-    
-    def __spawn_tiles(self, level_data : list[list[str]], image_cache : ImageCache ) -> None :
-        for i, row in enumerate(level_data):
-            for j, val in enumerate(row):
-                if(val == 'g'):
-                    self.game_objects.append(GroundTile((40 * j) + 20, (40 * i) + 20, image_cache))
-                    self.__ground.append(self.game_objects[-1])
-                if(val == 'b'):
-                    self.game_objects.append(GrassTile((40 * j) + 20, (40 * i) + 20, image_cache))
-                if(val == 'c'):
-                    self.game_objects.append(CoinTile((40 * j) + 20, (40 * i) + 20, image_cache))
-                if(val == 't'):
-                    self.game_objects.append(PalmTile((40 * j) + 40, (40 * i) - 20, image_cache))
-                if(val == 'e'):
-                    self.game_objects.append(ExitTile((40 * j) + 20, (40 * i) + 20, image_cache))
-                if(val == 'j'):
-                    self.game_objects.append(Jerk((40 * j) + 20, (40 * i) + 20, image_cache))
-                if(val == 'l'):
-                    self.game_objects.append(CloudTile((40 * j) + 40, (40 * i) + 40, image_cache))
-                if(val == 'p'):
-                    self.game_objects.append(Player((40 * j) + 20, (40 * i), image_cache))
-                    self.__player = self.game_objects[-1]
-
-    def __draw_game_objects(self) -> None:
-        self.create_text(1000, 24, text=f"score: {self.__score:<8.2f}", font=('Arial', 24))
-        for i, go in enumerate(self.game_objects):
-            go.draw(self)
-            if(self.__draw_hitbox):
-                go.draw_hitbox(self)
-        return None
+        # last step's messages have all been read by now
+        self.__bus.new_frame()
 
-    def __update_game_objects(self, delta : float) -> None:
+        self.__stream_chunks()
 
-        hit_ground = False
+        if(self.input_state.key_is_released('hitbox')):
+            self.draw_hitbox = not self.draw_hitbox
 
         # lets get the player attribs first
         p_x, p_y, P_w, p_h = self.__player.get_attribs()
 
+        # and where that is on screen
+        cam_x, cam_y = self.__camera.get_offset()
+        p_x -= cam_x
+
         
-        if(self.input_handler.key_is_down('move_left')):
-            self.__player.push_signal('move_left')
+        if(self.input_state.key_is_down('move_left')):
+            self.__bus.broadcast(MessageKind.MOVE_LEFT)
 
-        elif(self.input_handler.key_is_down('move_right')):
-            self.__player.push_signal('move_right')
+        elif(self.input_state.key_is_down('move_right')):
+            self.__bus.broadcast(MessageKind.MOVE_RIGHT)
         else:
-            self.__player.push_signal('move_neutral')
+            self.__bus.broadcast(MessageKind.MOVE_NEUTRAL)
             
-        if(self.input_handler.key_is_pressed('jump')):
-            self.__player.push_signal('jump')
-
-        for gr in self.__ground:
-            if(self.__player.hit_test(gr)):
-                ground_y = gr.get_attribs()[1] - 56
-                self.__player.push_signal(f"hit_ground {ground_y}")
-                hit_ground = True
-                break
+        if(self.input_state.key_is_pressed('jump')):
+            self.__bus.broadcast(MessageKind.JUMP)
 
-        for go in self.game_objects:
+        self.profiler.lap('input')
+
+        # only look at what the player is actually touching, in spawn
+        # order so it doesn't matter which index found them
+        touching = sorted((go for go in self.__index.query(self.__player.get_hit_box())
+                           if go is not self.__player), key=self.__order.get)
+
+        ground = self.__tile_map.hit_test(self.__player.get_hit_box())
+        if(ground):
+            ground_y = self.__tile_map.get_cell_center(*ground)[1] - 56
+            self.__bus.send(self.__player, MessageKind.HIT_GROUND, ground_y)
+            hit_ground = True
+
+        for go in touching:
             if(isinstance(go, CoinTile)):
                 if(self.__player.hit_test(go)):
-                    self.game_objects.remove(go)
+                    self.__despawn(go)
                     self.__score += 3.14
 
             if(isinstance(go, Jerk)):
@@ -978,14 +4373,28 @@ class Game(tk.Canvas):
                     if(hit_ground):
                         self.die()
                     else:
-                        self.game_objects.remove(go)
+                        self.__despawn(go)
                     
             if(isinstance(go, ExitTile)):
                 if(self.__player.hit_test(go)):
                     self.win()
+                    self.profiler.lap('collision')
+                    # still end the input tick, so it's recorded
+                    self.input_state.update(delta)
                     return None
 
-        for i, go in enumerate(self.game_objects):
+        self.profiler.lap('collision')
+
+        # things far off screen sleep until the camera gets close
+        awake = self.query_view(self.__camera.get_view(self.SLEEP_MARGIN))
+        if(self.__player not in awake):
+            awake.append(self.__player)
+
+        self.__camera.save_position()
+        for go in awake:
+            go.save_position()
+
+        for i, go in enumerate(awake):
             go.update(delta)
 
         if(self.__player.is_dead()):
@@ -993,24 +4402,219 @@ class Game(tk.Canvas):
 
         # the scrolling magic starts here
         if(p_x > 800):
-            for go in self.game_objects:
-                go.move_relative(-400 * delta, 0)
+            self.__camera.move_relative(400 * delta, 0)
+
+        self.profiler.lap('update')
 
-        self.input_handler.update()
+        self.input_state.update(delta)
+
+        self.profiler.lap('input')
         
         return None
         
     def despawn_all(self):
+        for go in self.game_objects:
+            self.__renderer.remove(go)
+            self.__bus.unsubscribe_all(go)
+            go.remove_all_indexes()
         self.game_objects = []            
+        self.__order = dict()
+        self.__chunks = dict()
+        self.__chunk_range = None
+        self.__level.close()
 
     def die(self):
-        messagebox.showinfo(title="oops", message="You've died horribly \n :/")
+        self.result = self.result or 'died'
         self.alive = False
 
     def win(self):
-        messagebox.showinfo(title="oops", message="You've won horribly \n :/")
+        self.result = self.result or 'won'
         self.alive = False
 
+
+#------------------------------------------------------------------GAME CANVAS
+
+class Game(tk.Canvas):
+    __WIDTH = 1280  # width of canvas
+    __HEIGHT = 720  # height of canvas
+    __X_RES = 32    # num of horz tiles
+    __Y_RES = 18    # num of vert tiles
+    __DRAW_MARGIN = 80     # how far off screen things are still drawn
+    __LEVEL_PATH = 'level2.txt' # data file to load from
+    __GRAVITY = 4
+
+    # every texture, name -> file, and the atlas they can be packed into
+    IMAGES = {'ground' : 'assets/ground.png', 'coin' : 'assets/coin.png', 
+              'cloud' : 'assets/cloud.png', 'jerk' : 'assets/jerk.png', 
+              'palm' : 'assets/palm.png', 'exit' : 'assets/exit.png', 
+              'grass' : 'assets/grass.png', 'dude' : 'assets/dude.png'}
+    ATLAS_PATH = 'assets/atlas.json'
+
+    def __init__(self, root : tk.Tk, physics_rate : float = 0, 
+                 profiler : NullProfiler = None, record_path : str = None) -> None:
+        '''
+        Class init
+        Parameters:
+            root : tk.Tk - tk root
+            physics_rate : float - fixed physics steps per second 
+                                   (0 = one step per frame)
+            profiler : NullProfiler - times each stage of a frame
+                                      (None for no profiling)
+            record_path : str - file to record every step's input to, for
+                                run_replay() (None to not record)
+        Returns: None
+        '''
+        # init base canvas
+        super().__init__(width=self.__WIDTH, height=self.__HEIGHT)
+
+        
+        input_defs = {'a' : 'move_left', 'Left' : 'move_left', 'd' : 'move_right', 
+                  'Right' : 'move_right', 'w' : 'jump', 'space' : 'jump', 'Up' : 'jump',
+                  'h': 'hitbox', 'p' : 'profile', 'o' : 'profile_dump'}
+
+        self.input_handler = InputHandler(root, input_defs)
+
+        self.delta_time = DeltaTime()
+
+        self.profiler = profiler or NullProfiler()
+
+        # whether the profiler overlay is shown, and the profiler keys 
+        # that were down last frame
+        self.__show_profile = False
+        self.__profile_keys = set()
+
+        # fixed physics steps, None steps once per frame with the frame time
+        self.__timestep : FixedTimestep = None
+        if(physics_rate):
+            self.__timestep = FixedTimestep(physics_rate)
+
+        # read a chunk at a time as we go, see World
+        self.level = open_level(self.__LEVEL_PATH)
+
+        if(record_path):
+            self.input_handler.start_recording(
+                InputRecorder(record_path, self.input_handler.get_names(), self.__LEVEL_PATH))
+        # one atlas file if it's been built (see build_atlas()), else a file each
+        self.image_cache = ImageCache()
+        self.image_cache.load_images(self.IMAGES, self.ATLAS_PATH)
+
+        self.alive = True
+
+        # GameObjects currently drawn, in drawing order
+        self.__visible = dict()
+
+        # whether hit boxes were drawn last frame
+        self.__draw_hitbox = False
+
+        # canvas item for the score display and the score it shows
+        self.__score_handle = None
+        self.__drawn_score = None
+
+        # the simulation itself, we are its renderer
+        self.world = World(self.level, self.input_handler, self.image_cache, self, 
+                           self.__WIDTH, self.__HEIGHT, self.profiler)
+
+        return None
+
+    def draw(self, world : World, alpha : float = 1) -> None:
+        '''
+        Draws the score and every GameObject on screen.
+        Canvas items are kept between frames, so this only creates
+        items for new objects and moves the ones that have moved.
+        Parameters:
+            world : World - world to draw
+            alpha : float - how far between the last physics step and
+                            this one to draw moving things
+        Returns: None
+        '''
+        camera = world.get_camera()
+        score = world.get_score()
+
+        if(self.__score_handle is None):
+            self.__score_handle = self.create_text(1000, 24, text='', font=('Arial', 24))
+        if(self.__drawn_score != score):
+            self.itemconfigure(self.__score_handle, text=f"score: {score:<8.2f}")
+            self.__drawn_score = score
+
+        # hitbox outlines are retained too, so clear them when hidden
+        if(self.__draw_hitbox and not world.draw_hitbox):
+            for go in self.__visible:
+                go.undraw_hitbox(self)
+        self.__draw_hitbox = world.draw_hitbox
+
+        # scroll everything already on the canvas in one go
+        camera.apply(self, alpha)
+
+        # only bother with what is on (or just off) screen
+        view = camera.get_view(self.__DRAW_MARGIN)
+
+        world.get_tile_map().draw(self, camera, view, self.image_cache.get('ground'), 
+                                  self.__draw_hitbox)
+
+        visible = dict.fromkeys(world.query_view(view))
+
+        # free the canvas items of anything that went off screen
+        for go in self.__visible:
+            if(go not in visible):
+                go.undraw(self)
+
+        for i, go in enumerate(visible):
+            go.draw(self, camera, alpha)
+            if(self.__draw_hitbox):
+                go.draw_hitbox(self, camera)
+
+        # things that just came on screen were created on top of
+        # everything, so tuck each one back under whatever follows it
+        above = None
+        for go in reversed(visible):
+            handle = go.get_handle()
+            if(handle is None):
+                continue
+            if(go not in self.__visible and above is not None):
+                self.tag_lower(handle, above)
+            above = handle
+
+        self.__visible = visible
+        return None
+
+    def remove(self, game_object : GameObject) -> None:
+        '''
+        Removes a despawned GameObject's items from the canvas.
+        Parameters:
+            game_object : GameObject - object that was removed
+        Returns: None
+        '''
+        game_object.undraw(self)
+        self.__visible.pop(game_object, None)
+        return None
+        
+    def despawn_all(self):
+        # the profiler outlives us, don't leave it holding our item ids
+        self.profiler.undraw(self)
+        self.world.get_tile_map().undraw(self)
+        self.world.despawn_all()
+        self.input_handler.stop_recording()
+        self.__visible = dict()
+
+    def __profile_key_released(self, name : str) -> bool:
+        '''
+        Checks if a profiler key went up since last frame.
+        The world only updates key status when it steps, so we keep
+        track of these ourselves.
+        Parameters:
+            name : str - name of input to check.
+        Returns: bool - result of check.
+        '''
+        if(self.input_handler.key_is_down(name)):
+            self.__profile_keys.add(name)
+            return False
+
+        if(name in self.__profile_keys):
+            self.__profile_keys.discard(name)
+            return True
+
+        return False
+
     def update(self) -> None :
         '''
         Canvas widget update function.
@@ -1020,27 +4624,65 @@ class Game(tk.Canvas):
         '''
         delta = self.delta_time.get()
 
-        # clear the entire screen
-        self.delete('all')
+        if(self.__profile_key_released('profile')):
+            self.__show_profile = not self.__show_profile
+            if(not self.__show_profile):
+                self.profiler.undraw(self)
+
+        if(self.__profile_key_released('profile_dump')):
+            self.profiler.dump_csv('profile.csv')
+            print(f"Saved frame timings to {os.path.abspath('profile.csv')}")
+
+        self.profiler.lap('input')
+
+        if(self.__timestep):
+            # run as many fixed steps as the frame time covers, then draw
+            # part way to the next one
+            steps = self.__timestep.add(delta)
+            for step in range(steps):
+                if(not self.world.alive):
+                    break
+                self.world.step(self.__timestep.get_step())
+            self.draw(self.world, self.__timestep.get_alpha())
+        else:
+            self.world.step(delta)
+            self.draw(self.world)
+
+        if(self.__show_profile):
+            self.profiler.draw(self)
 
-        if(self.input_handler.key_is_released('hitbox')):
-            self.__draw_hitbox = not self.__draw_hitbox
+        self.profiler.lap('draw')
 
-        self.__update_game_objects(delta)
-        self.__draw_game_objects()
+        if(self.world.result == 'died'):
+            messagebox.showinfo(title="oops", message="You've died horribly \n :/")
+        elif(self.world.result == 'won'):
+            messagebox.showinfo(title="oops", message="You've won horribly \n :/")
+        self.alive = self.world.alive
 
         # update base class
         super().update()
         super().update_idletasks()
 
+        self.profiler.lap('tk')
+
 
 #-----------------------------------------------------------------MAIN PROGRAM
 
 class Program:
-    def __init__(self) -> None:
+    # fixed physics steps per second. Jumps are only as high as the
+    # levels were built for at 240 steps a second, so the frame rate
+    # is kept from changing them
+    PHYSICS_RATE = 240
+
+    def __init__(self, record_path : str = None, physics_rate : float = PHYSICS_RATE) -> None:
         '''
         Class init
-        Parameters: None
+        Parameters:
+            record_path : str - file to record input to (None to not
+                                record), games after the first get
+                                -2, -3... added to the name
+            physics_rate : float - fixed physics steps per second 
+                                   (0 = one step per frame)
         Returns: None
         '''
 
@@ -1053,8 +4695,23 @@ class Program:
         # program will run until this is False
         self.running = True
 
+        # fixed physics steps per second (0 = one step per frame)
+        self.physics_rate = physics_rate
+
+        # keeps us from running flat out, a frame per physics step. With
+        # a step per frame this is the physics rate too, so it stays at
+        # the rate jumps were built for
+        self.frame_scheduler = FrameScheduler(physics_rate or self.PHYSICS_RATE)
+
+        # frame timings, kept across games (press p to show, o to save)
+        self.profiler = FrameProfiler()
+
+        # input recording, and how many games have been played
+        self.record_path = record_path
+        self.games = 1
+
         # create and pack our canvas object
-        self.game = Game(self.root)
+        self.game = Game(self.root, self.physics_rate, self.profiler, self.get_record_path())
         self.game.pack()
 
         # bind window close button to close_program() method
@@ -1062,6 +4719,18 @@ class Program:
 
         return None
 
+    def get_record_path(self) -> str:
+        '''
+        Get the file to record the current game's input to.
+        Parameters: None
+        Returns: str - path, None type if we aren't recording
+        '''
+        if(not self.record_path or self.games == 1):
+            return self.record_path
+
+        root, extension = os.path.splitext(self.record_path)
+        return f"{root}-{self.games}{extension}"
+
     def close_program(self):
         '''
         sets self.running to False
@@ -1077,19 +4746,24 @@ class Program:
         Parameters: None
         Returns: None
         '''
+        self.profiler.begin_frame()
 
         self.game.update()
 
         if(self.game.alive == False):
             self.game.despawn_all()
             self.game.destroy()
-            self.game = Game(self.root)
+            self.games += 1
+            self.game = Game(self.root, self.physics_rate, self.profiler, self.get_record_path())
             self.game.pack()
 
         # update root window
         self.root.update_idletasks()
         self.root.update()
 
+        self.profiler.lap('tk')
+        self.profiler.end_frame()
+
         return None
 
     def main_loop(self) -> None:
@@ -1104,11 +4778,192 @@ class Program:
             # Call program update 
             self.update()
 
+            # wait for the next frame
+            self.frame_scheduler.wait()
+
         # destroy root window when program is done
+        self.game.input_handler.stop_recording()
         self.root.destroy()
 
 
+def run_headless(level_path : str, frames : int, delta : float = 1 / 120, 
+                 input_state : InputState = None, physics_rate : float = 0) -> World:
+    '''
+    Runs the game without Tk, as fast as it will go.
+    Parameters:
+        level_path : str - level file to play
+        frames : int - most frames to run, stops early if the game ends
+        delta : float - frame time to simulate, in fractional seconds
+        input_state : InputState - player input (None for no input)
+        physics_rate : float - fixed physics steps per second, run like
+                               Game does (0 = one step per frame)
+    Returns: World - the world after the run
+    '''
+    world = World(open_level(level_path), input_state or ScriptedInput(World.INPUTS))
+    timestep = FixedTimestep(physics_rate) if physics_rate else None
+
+    for frame in range(frames):
+        if(not world.alive):
+            break
+
+        if(timestep is None):
+            world.step(delta)
+            continue
+
+        for step in range(timestep.add(delta)):
+            if(not world.alive):
+                break
+            world.step(timestep.get_step())
+
+    return world
+
+
+def run_replay(replay_path : str, level_path : str = None, 
+               physics_rate : float = 0) -> World:
+    '''
+    Plays back an input recording without Tk, as fast as it will go.
+    Every step gets the input and delta time it was recorded with, so
+    the run matches the recorded game.
+    With a physics rate, the recorded steps are played as frames through
+    fixed steps instead, the way Game would have run them.
+    Parameters:
+        replay_path : str - recording, see InputRecorder
+        level_path : str - level to play (None for the recorded one)
+        physics_rate : float - fixed physics steps per second 
+                               (0 = the recorded steps)
+    Returns: World - the world after the run
+    '''
+    replay = ReplayInput(replay_path)
+    level = open_level(level_path or replay.get_level_path())
+
+    if(not physics_rate):
+        world = World(level, replay)
+        delta = replay.get_delta()
+        while(world.alive and delta is not None):
+            world.step(delta)
+            delta = replay.get_delta()
+        return world
+
+    input_state = InputState(replay.get_names())
+    world = World(level, input_state)
+    timestep = FixedTimestep(physics_rate)
+
+    delta = replay.get_delta()
+    while(world.alive and delta is not None):
+        # presses and releases wait for the next step, like they do
+        # in InputHandler when a frame runs no steps
+        down, pressed, released = replay.get_state()
+        held_down, held_pressed, held_released = input_state.get_state()
+        input_state.set_state(down, held_pressed | pressed, held_released | released)
+
+        for step in range(timestep.add(delta)):
+            if(not world.alive):
+                break
+            world.step(timestep.get_step())
+
+        replay.update(delta)
+        delta = replay.get_delta()
+
+    return world
+
+
+def replay_main(replay_path : str, level_path : str = None, physics_rate : float = 0) -> None:
+    '''
+    Replays a recording headless and prints how it went.
+    Parameters:
+        replay_path : str - recording, see InputRecorder
+        level_path : str - level to play (None for the recorded one)
+        physics_rate : float - fixed physics steps per second 
+                               (0 = the recorded steps)
+    Returns: None
+    '''
+    start = time.perf_counter()
+    world = run_replay(replay_path, level_path, physics_rate)
+    elapsed = time.perf_counter() - start
+
+    duration = ReplayInput(replay_path).get_duration()
+    print(f"result: {world.result or 'still playing'}")
+    print(f"score: {world.get_score():.2f}")
+    print(f"steps: {world.steps} in {elapsed:.3f}s "
+          f"({duration:.1f}s of play, {duration / elapsed:.0f}x real time)")
+
+    return None
+
+
+def headless_main(frames : int, physics_rate : float = 0) -> None:
+    '''
+    Soak test: runs level2.txt headless, holding right and jumping
+    once a second, and prints how it went.
+    Parameters:
+        frames : int - most frames to run
+        physics_rate : float - fixed physics steps per second 
+                               (0 = one step per frame)
+    Returns: None
+    '''
+    RATE = 120
+    script = {0 : [('press', 'move_right')]}
+    for frame in range(RATE // 2, frames, RATE):
+        script[frame] = [('press', 'jump')]
+        script[frame + 10] = [('release', 'jump')]
+
+    start = time.perf_counter()
+    world = run_headless('level2.txt', frames, 1 / RATE, 
+                         ScriptedInput(World.INPUTS, script), physics_rate)
+    elapsed = time.perf_counter() - start
+
+    print(f"result: {world.result or 'still playing'}")
+    print(f"score: {world.get_score():.2f}")
+    print(f"steps: {world.steps} in {elapsed:.3f}s ({world.steps / elapsed:.0f} steps/s)")
+
+    stats = world.get_spawn_stats()
+    print(f"spawned: {sum(stats['objects'].values())} objects from {stats['chunks']} chunks "
+          f"({stats['cells']} cells) in {stats['seconds'] * 1000:.2f}ms")
+
+    return None
+
+
 # Conditional call to main program loop
 if(__name__ == '__main__'):
-    program = Program()
+    # fixed physics steps per second, for the game, --headless and --replay
+    # (0 for a step per frame, which is what those two default to)
+    # python3 platformer_scroller.py --physics-rate 120 ...
+    physics_rate = None
+    if('--physics-rate' in sys.argv):
+        index = sys.argv.index('--physics-rate')
+        physics_rate = float(sys.argv[index + 1])
+        del sys.argv[index:index + 2]
+
+    # python3 platformer_scroller.py --headless [frames]
+    if('--headless' in sys.argv):
+        args = sys.argv[sys.argv.index('--headless') + 1:]
+        headless_main(int(args[0]) if args else 10000, physics_rate or 0)
+        sys.exit()
+
+    # python3 platformer_scroller.py --replay session.rpl [level.txt]
+    if('--replay' in sys.argv):
+        args = sys.argv[sys.argv.index('--replay') + 1:]
+        replay_main(*args[:2], physics_rate=physics_rate or 0)
+        sys.exit()
+
+    # python3 platformer_scroller.py --compile level.txt [out.lvb]
+    if('--compile' in sys.argv):
+        args = sys.argv[sys.argv.index('--compile') + 1:]
+        print(f"wrote {compile_level(*args[:2])}")
+        sys.exit()
+
+    # python3 platformer_scroller.py --atlas [assets/atlas.json]
+    if('--atlas' in sys.argv):
+        args = sys.argv[sys.argv.index('--atlas') + 1:]
+        print(f"wrote {build_atlas(Game.IMAGES, *(args[:1] or [Game.ATLAS_PATH]))}")
+        sys.exit()
+
+    # python3 platformer_scroller.py --record session.rpl
+    record_path = None
+    if('--record' in sys.argv):
+        record_path = sys.argv[sys.argv.index('--record') + 1]
+
+    if(physics_rate is None):
+        physics_rate = Program.PHYSICS_RATE
+
+    program = Program(record_path, physics_rate)
     program.main_loop()
\ No newline at end of file
@@ -7,7 +7,6 @@ import math
 import tkinter as tk
 from tkinter import messagebox
 import time
-import os
 
 #-------------------------------------------------------------------DELTA TIME
 
@@ -47,12 +46,88 @@ class DeltaTime():
         return delta
 
 
+class FrameScheduler():
+    '''
+    Paces a main loop to a target frame rate.
+    Sleeps away most of the time left in the frame, then spins for the
+    last bit, since sleep() alone tends to wake up late.
+    '''
+    SPIN_TIME = 0.001 # how close to the deadline we stop sleeping and spin
+
+    def __init__(self, fps_limit : float = 60) -> None:
+        '''
+        Class init
+        Parameters:
+            fps_limit : float - target frame rate (0 = unlimited)
+        Returns: None
+        '''
+        self.__fps_limit = fps_limit
+
+        # when the current frame should end
+        self.__deadline = time.perf_counter()
+
+        return None
+
+    def get_limit(self) -> float:
+        '''
+        Get the target frame rate
+        Parameters: None
+        Returns: float - frame rate (0 = unlimited)
+        '''
+        return self.__fps_limit
+
+    def set_limit(self, fps_limit : float) -> None:
+        '''
+        Set the target frame rate
+        Parameters:
+            fps_limit : float - frame rate (0 = unlimited)
+        Returns: None
+        '''
+        self.__fps_limit = fps_limit
+        self.__deadline = time.perf_counter()
+        return None
+
+    def wait(self) -> None:
+        '''
+        Waits out whatever is left of the current frame.
+        To be called once at the end of every frame. Time spent doing the
+        frame's work counts towards the frame.
+        Parameters: None
+        Returns: None
+        '''
+        if(not self.__fps_limit):
+            return None
+
+        self.__deadline += 1 / self.__fps_limit
+        now = time.perf_counter()
+
+        # we're running behind, so start fresh instead of rushing
+        # through frames to catch up
+        if(now >= self.__deadline):
+            self.__deadline = now
+            return None
+
+        remaining = self.__deadline - now
+        if(remaining > self.SPIN_TIME):
+            time.sleep(remaining - self.SPIN_TIME)
+
+        while(time.perf_counter() < self.__deadline):
+            pass
+
+        return None
+
+
 #----------------------------------------------------------------INPUT HANDLER
 
 class InputHandler:
     '''
     Simple keyboard input interface to tkinter
+    Holding a key down makes X send a release and a press for every key
+    repeat, both with the same time stamp. Releases are held back until
+    Tk is idle, and dropped if the press of a repeat turned up first.
     '''
+    REPEAT_TIME = 1 # most ms between the release and press of a key repeat
+
     def __init__(self, root : tk.Tk, input_dict : dict):
         '''
         Class init
@@ -61,16 +136,17 @@ class InputHandler:
             input_dict : dict - dictionary of the format key=keysym val=name
         Returns: None
         '''
+        self.__root = root
         self.__input_status = dict() # status of each keysym
         self.__input_map = dict()    # map of keysyms to names
 
-        # Bind generic keyboard events to their respective handlers
-        root.bind(f'<KeyPress>', lambda e: self.__press_key_event(e.keysym))
-        root.bind(f'<KeyRelease>', lambda e: self.__release_key_event(e.keysym))
+        # keysym -> (time, serial, after id) of a release we are holding
+        # back in case it's a key repeat
+        self.__held_releases = dict()
 
-        # Allows us to turn off keyboard repeat (causes havok)
-        root.bind('<FocusIn>', lambda e: os.system("xset r off"))
-        root.bind('<FocusOut>', lambda e: os.system("xset r on"))
+        # Bind generic keyboard events to their respective handlers
+        root.bind(f'<KeyPress>', lambda e: self.__press_key_event(e))
+        root.bind(f'<KeyRelease>', lambda e: self.__release_key_event(e))
 
         # Create our databases of keysyms
         # Keysyms have a many-to-one relationship to names 
@@ -78,38 +154,60 @@ class InputHandler:
             self.__input_status[input_dict[key]] = 'up'
             self.__input_map[key] = input_dict[key]
 
-    def __del__(self) -> None:
+    def __press_key_event(self, event : tk.Event) -> None:
         '''
-        Called on class deletion. 
-        Turns back on keyboard repeat
-        Parameters: None
+        Generic event handler for a key press.
+        Parameters:
+            event : tk.Event - key press event
         Returns: None
         '''
-        os.system("xset r on")
+        keysym = event.keysym
+        if(keysym not in self.__input_map):
+            return None
+
+        if(keysym in self.__held_releases):
+            release_time, release_serial, after_id = self.__held_releases.pop(keysym)
+            self.__root.after_cancel(after_id)
+
+            # a key repeat: the key never really went up
+            if(0 <= event.time - release_time <= self.REPEAT_TIME and event.serial >= release_serial):
+                return None
+
+        # set the new status in our database
+        self.__input_status[self.__input_map[keysym]] = 'pressed'
+
         return None
 
-    def __press_key_event(self, keysym : str) -> None:
+    def __release_key_event(self, event : tk.Event) -> None:
         '''
-        Generic event handler for a key press.
+        Generic event handler for a key release.
         Parameters:
-            keysym : str - keysym passed in from event
+            event : tk.Event - key release event
         Returns: None
         '''
-        # set the new status in our database
-        if(keysym in self.__input_map):
-            self.__input_status[self.__input_map[keysym]] = 'pressed'
+        keysym = event.keysym
+        if(keysym not in self.__input_map):
+            return None
+
+        if(keysym in self.__held_releases):
+            self.__root.after_cancel(self.__held_releases[keysym][2])
+
+        # the press of a key repeat is already queued behind us, so
+        # by the time Tk is idle we know if this was one
+        after_id = self.__root.after_idle(self.__held_release, keysym)
+        self.__held_releases[keysym] = (event.time, event.serial, after_id)
 
         return None
 
-    def __release_key_event(self, keysym : str) -> None:
+    def __held_release(self, keysym : str) -> None:
         '''
-        Generic event handler for a key release.
+        Applies a release that turned out not to be a key repeat.
         Parameters:
-            keysym : str - keysym passed in from event
+            keysym : str - keysym of the released key
         Returns: None
         '''
         # set the new status in our database        
-        if(keysym in self.__input_map):
+        if(self.__held_releases.pop(keysym, None) is not None):
             self.__input_status[self.__input_map[keysym]] = 'released'
 
         return None
@@ -1049,6 +1147,11 @@ class Program:
         # program will run until this is False
         self.running = True
 
+        # keeps us from running flat out. Player physics is per frame, so
+        # this also sets how high the player jumps (about 4.4 tiles at 240,
+        # 2 at 120); uncapped it was however fast the machine could go
+        self.frame_scheduler = FrameScheduler(240)
+
         # create and pack our canvas object
         self.game = Game(self.root)
         self.game.pack()
@@ -1100,6 +1203,9 @@ class Program:
             # Call program update 
             self.update()
 
+            # wait for the next frame
+            self.frame_scheduler.wait()
+
         # destroy root window when program is done
         self.root.destroy()
 
@@ -0,0 +1,710 @@
+# Demonstration of sweep and prune, a broad phase for colission checks
+# between lots of bodies
+# Written by Gabriel Gillette
+# License: Public Domain
+
+import bisect
+import math
+import random
+import sys
+import tkinter as tk
+import time
+
+
+def box_colission(x1 : float, y1 : float, width1 : float, height1 : float, 
+                  x2 : float, y2 : float, width2 : float, height2 : float) -> bool:
+    '''
+    Box-Box colission check.
+    Also known as Axis Aligned Bounding Boxes (AABB).
+    Parameters:
+        x1 : float - box 1 x coord (center)
+        y1 : float - box 1 y coord (center)
+        width1 : float - box 1 width
+        height1 : float - box 2 height
+        x2 : float - box 2 x coord (center)
+        y2 : float - box 2 y coord (center)
+        width2 : float - box 2 width
+        height2 : float - box 2 height
+    Returns: Bool - result of check
+    '''
+    # This check is just a series of inequality checks.
+    # This function assumes the center is our anchor
+    #   So we need to adjust the values a bit.
+    # 
+    
+    corner1_x = x1 - (width1/2)
+    corner1_y = y1 - (height1/2)
+    corner2_x = x2 - (width2/2)
+    corner2_y = y2 - (height2/2)
+    if(corner1_x < corner2_x + width2 and corner1_x + width1 > corner2_x and 
+       corner1_y < corner2_y + height2 and corner1_y + height1 > corner2_y):
+        return True # colission!
+    
+    # no colission!
+    return False
+
+
+
+def circle_colission(x1 : float, y1 : float, radius1 : float, x2 : float, y2 : float, radius2 : float) -> bool:
+    '''
+    Circle-Circle colission check
+    Parameters:
+        x1 : float - x pos of first circle
+        y2 : float - y pos of first circle
+        radius1 : float - radius of first circle
+        x2 : float - x pos of second circle
+        y2 : float - y pos of second circle
+        radious2 : float - radious of second circle
+    Returns: Bool - collision check result
+    '''
+    # This is just pythagorean theorem! 
+    # (A*A) + (B*B) = (C*C)
+
+    dx = x2 - x1 # length of one leg
+    dy = y2 - y1 # length of another
+
+    # We only need to know if the third is shorter than the sum of 
+    # the radii, so compare the squares and skip the square root
+    radii = radius1 + radius2
+    if (dx * dx) + (dy * dy) < (radii * radii):
+        return True # colission! 
+    
+    # no colission!
+    return False
+
+
+
+class DeltaTime():
+    def __init__(self) :
+
+        # set current time
+        self.__current = time.perf_counter()
+
+        # prime the past as the current
+        self.__past = self.__current
+
+    def get(self) -> float:
+        '''
+        Get the current delta time
+        Parameters: None
+        Returns: Delta time in fractional seconds
+        '''
+
+        # get current time
+        self.__current = time.perf_counter()
+
+        # calculate delta
+        delta = self.__current - self.__past
+
+        # set new past
+        self.__past = self.__current
+
+        # return delta
+        return delta
+
+
+
+class FrameScheduler():
+    '''
+    Paces a main loop to a target frame rate.
+    Sleeps away most of the time left in the frame, then spins for the
+    last bit, since sleep() alone tends to wake up late.
+    '''
+    SPIN_TIME = 0.001 # how close to the deadline we stop sleeping and spin
+
+    def __init__(self, fps_limit : float = 60) -> None:
+        '''
+        Class init
+        Parameters:
+            fps_limit : float - target frame rate (0 = unlimited)
+        Returns: None
+        '''
+        self.__fps_limit = fps_limit
+
+        # when the current frame should end
+        self.__deadline = time.perf_counter()
+
+        return None
+
+    def get_limit(self) -> float:
+        '''
+        Get the target frame rate
+        Parameters: None
+        Returns: float - frame rate (0 = unlimited)
+        '''
+        return self.__fps_limit
+
+    def set_limit(self, fps_limit : float) -> None:
+        '''
+        Set the target frame rate
+        Parameters:
+            fps_limit : float - frame rate (0 = unlimited)
+        Returns: None
+        '''
+        self.__fps_limit = fps_limit
+        self.__deadline = time.perf_counter()
+        return None
+
+    def wait(self) -> None:
+        '''
+        Waits out whatever is left of the current frame.
+        To be called once at the end of every frame. Time spent doing the
+        frame's work counts towards the frame.
+        Parameters: None
+        Returns: None
+        '''
+        if(not self.__fps_limit):
+            return None
+
+        self.__deadline += 1 / self.__fps_limit
+        now = time.perf_counter()
+
+        # we're running behind, so start fresh instead of rushing
+        # through frames to catch up
+        if(now >= self.__deadline):
+            self.__deadline = now
+            return None
+
+        remaining = self.__deadline - now
+        if(remaining > self.SPIN_TIME):
+            time.sleep(remaining - self.SPIN_TIME)
+
+        while(time.perf_counter() < self.__deadline):
+            pass
+
+        return None
+
+
+class SweepAndPrune():
+    '''
+    Broad phase colission detection.
+    Keeps the left and right edges of every body in one list sorted
+    along the x axis. Bodies whose edges overlap on x are candidate
+    pairs, to be checked properly by box_colission() or 
+    circle_colission().
+    Bodies don't move far between frames, so the list is nearly sorted
+    already and an insertion sort only has a few swaps to do. Each swap
+    is exactly where a pair starts or stops overlapping, so the
+    candidate pairs are kept up to date as we go.
+    '''
+    def __init__(self, debug : bool = False) -> None:
+        '''
+        Class init
+        Parameters:
+            debug : bool - check() after every update(), slow
+        Returns: None
+        '''
+        self.debug = debug
+
+        # every edge as [x, body id, is left edge], sorted by x
+        # (a right edge goes before a left edge at the same x, 
+        # so boxes that only touch aren't candidates)
+        self.__edges = []
+
+        # body id -> its [left edge, right edge]
+        self.__bodies = dict()
+
+        # body id -> ids of bodies it overlaps on x
+        self.__overlaps = dict()
+
+        return None
+
+    @staticmethod
+    def __edge_key(edge : list) -> tuple[float, bool]:
+        '''
+        Sort key for an edge, right edges go first when x is equal.
+        Parameters:
+            edge : list - [x, body id, is left edge]
+        Returns: tuple[float, bool] - sort key
+        '''
+        return edge[0], edge[2]
+
+    def __len__(self) -> int:
+        '''
+        Number of bodies
+        Parameters: None
+        Returns: int - number of bodies
+        '''
+        return len(self.__bodies)
+
+    def add(self, body : int, left : float, right : float) -> None:
+        '''
+        Adds a body. Safe to call between move() and update().
+        Parameters:
+            body : int - id of the body
+            left : float - body's left edge
+            right : float - body's right edge (must be past left)
+        Returns: None
+        '''
+        # the new edges are put in place by bisecting, so the list has
+        # to be sorted first if anything moved
+        self.update()
+
+        left_edge = [left, body, True]
+        right_edge = [right, body, False]
+        self.__bodies[body] = (left_edge, right_edge)
+        self.__overlaps[body] = set()
+
+        # find what it already overlaps the slow way, then put its 
+        # edges in place
+        for other, (other_left, other_right) in self.__bodies.items():
+            if(other != body and other_left[0] < right and other_right[0] > left):
+                self.__overlaps[body].add(other)
+                self.__overlaps[other].add(body)
+
+        self.__edges.insert(bisect.bisect_left(self.__edges, (left, True), key=self.__edge_key), 
+                            left_edge)
+        self.__edges.insert(bisect.bisect_left(self.__edges, (right, False), key=self.__edge_key), 
+                            right_edge)
+
+        return None
+
+    def remove(self, body : int) -> None:
+        '''
+        Removes a body. Safe to call between move() and update().
+        Parameters:
+            body : int - id of the body
+        Returns: None
+        '''
+        # catch up with moves first, so the pairs left behind match the
+        # order of the edges left behind
+        self.update()
+
+        for edge in self.__bodies.pop(body):
+            for i, other in enumerate(self.__edges):
+                if(other is edge):
+                    del self.__edges[i]
+                    break
+
+        for other in self.__overlaps.pop(body):
+            self.__overlaps[other].discard(body)
+
+        return None
+
+    def move(self, body : int, left : float, right : float) -> None:
+        '''
+        Sets where a body is now. The edge list is sorted again in
+        update().
+        Parameters:
+            body : int - id of the body
+            left : float - body's left edge
+            right : float - body's right edge (must be past left)
+        Returns: None
+        '''
+        left_edge, right_edge = self.__bodies[body]
+        left_edge[0] = left
+        right_edge[0] = right
+        return None
+
+    def update(self) -> int:
+        '''
+        Sorts the edge list again after bodies have moved, updating the
+        candidate pairs.
+        Parameters: None
+        Returns: int - how many swaps it took
+        '''
+        edges = self.__edges
+        overlaps = self.__overlaps
+        swaps = 0
+
+        for i in range(1, len(edges)):
+            edge = edges[i]
+            x, body, is_left = edge
+
+            # right edges go first when x is equal
+            j = i - 1
+            while(j >= 0 and (edges[j][0] > x or 
+                              (edges[j][0] == x and edges[j][2] and not is_left))):
+                other = edges[j]
+
+                # a left edge passing a right edge, they start to overlap
+                if(is_left and not other[2]):
+                    overlaps[body].add(other[1])
+                    overlaps[other[1]].add(body)
+
+                # a right edge passing a left edge, they stop
+                elif(not is_left and other[2]):
+                    overlaps[body].discard(other[1])
+                    overlaps[other[1]].discard(body)
+
+                edges[j + 1] = other
+                j -= 1
+                swaps += 1
+
+            edges[j + 1] = edge
+
+        if(self.debug):
+            self.check()
+
+        return swaps
+
+    def check(self) -> None:
+        '''
+        Rebuilds the candidate pairs from scratch and makes sure they
+        match the ones kept up to date by update(). Only right straight
+        after update(), when the edge list is sorted.
+        Parameters: None
+        Returns: None
+        Raises: AssertionError - the edge list or the pairs are wrong
+        '''
+        keys = [self.__edge_key(edge) for edge in self.__edges]
+        if(keys != sorted(keys)):
+            raise AssertionError('edge list is out of order')
+
+        if(len(self.__edges) != 2 * len(self.__bodies)):
+            raise AssertionError('edge list and bodies disagree')
+
+        bodies = list(self.__bodies.items())
+        expected = set()
+        for i, (body, (left, right)) in enumerate(bodies):
+            for other, (other_left, other_right) in bodies[i + 1:]:
+                if(left[0] < other_right[0] and right[0] > other_left[0]):
+                    expected.add((min(body, other), max(body, other)))
+
+        pairs = set(self.get_pairs())
+        if(pairs != expected):
+            raise AssertionError(f"pairs are wrong, {len(pairs - expected)} extra "
+                                 f"and {len(expected - pairs)} missing")
+        return None
+
+    def get_pairs(self) -> list[tuple[int, int]]:
+        '''
+        Get every pair of bodies overlapping on x.
+        Parameters: None
+        Returns: list[tuple[int, int]] - candidate pairs, lower id first
+        '''
+        pairs = []
+        for body, others in self.__overlaps.items():
+            for other in others:
+                if(body < other):
+                    pairs.append((body, other))
+        return pairs
+
+
+class Body():
+    '''
+    A box or circle bouncing around the screen.
+    '''
+    def __init__(self, x : float, y : float, x_vel : float, y_vel : float, 
+                 size : float, is_circle : bool) -> None:
+        '''
+        Class init
+        Parameters:
+            x : float - x position (center)
+            y : float - y position (center)
+            x_vel : float - x velocity in pixels per second
+            y_vel : float - y velocity in pixels per second
+            size : float - width of box or diameter of circle
+            is_circle : bool - circle or box
+        Returns: None
+        '''
+        self.x = x
+        self.y = y
+        self.x_vel = x_vel
+        self.y_vel = y_vel
+        self.size = size
+        self.is_circle = is_circle
+
+        # canvas item and the color it was last drawn with
+        self.handle = None
+        self.color = None
+
+        return None
+
+
+def body_colission(body1 : Body, body2 : Body) -> bool:
+    '''
+    Narrow phase colission check between two bodies.
+    Parameters:
+        body1 : Body - first body
+        body2 : Body - second body
+    Returns: Bool - result of check
+    '''
+    if(body1.is_circle and body2.is_circle):
+        return circle_colission(body1.x, body1.y, body1.size / 2, 
+                                body2.x, body2.y, body2.size / 2)
+
+    # a box against a circle just uses the circle's bounding box,
+    # close enough for a demo
+    return box_colission(body1.x, body1.y, body1.size, body1.size, 
+                         body2.x, body2.y, body2.size, body2.size)
+
+
+class Canvas_Bodies(tk.Canvas):
+    __WIDTH = 1280       # width of canvas
+    __HEIGHT = 720       # height of canvas
+    __START_BODIES = 500 # bodies at start
+    __MIN_SIZE = 6       # smallest body
+    __MAX_SIZE = 24      # largest body
+    __MAX_SPEED = 150    # fastest body in pixels per second
+
+    def __init__(self) -> None:
+        '''
+        Class init
+        Parameters: None
+        Returns: None
+        '''
+        # init base canvas
+        super().__init__(width=self.__WIDTH, height=self.__HEIGHT)
+
+        # body id -> Body
+        self.bodies = dict()
+        self.next_id = 0
+
+        # broad phase, and whether we skip it and check every pair
+        self.sweep_and_prune = SweepAndPrune()
+        self.brute_force = False
+
+        # text item for stats
+        self.stats_handle = self.create_text(10, 10, anchor='nw', text='', 
+                                             font=('Courier', 14))
+
+        self.add_bodies(self.__START_BODIES)
+
+        return None
+
+    def add_bodies(self, count : int) -> None:
+        '''
+        Adds bodies at random places, moving in random directions.
+        Parameters:
+            count : int - number of bodies to add
+        Returns: None
+        '''
+        for i in range(count):
+            size = random.uniform(self.__MIN_SIZE, self.__MAX_SIZE)
+            body = Body(random.uniform(size, self.__WIDTH - size), 
+                        random.uniform(size, self.__HEIGHT - size), 
+                        random.uniform(-self.__MAX_SPEED, self.__MAX_SPEED), 
+                        random.uniform(-self.__MAX_SPEED, self.__MAX_SPEED), 
+                        size, random.random() < 0.5)
+
+            if(body.is_circle):
+                body.handle = self.create_oval(0, 0, 0, 0)
+            else:
+                body.handle = self.create_rectangle(0, 0, 0, 0)
+
+            self.bodies[self.next_id] = body
+            self.sweep_and_prune.add(self.next_id, body.x - (size/2), body.x + (size/2))
+            self.next_id += 1
+
+        return None
+
+    def remove_bodies(self, count : int) -> None:
+        '''
+        Removes the oldest bodies.
+        Parameters:
+            count : int - number of bodies to remove
+        Returns: None
+        '''
+        for body_id in list(self.bodies)[:count]:
+            self.delete(self.bodies.pop(body_id).handle)
+            self.sweep_and_prune.remove(body_id)
+        return None
+
+    def toggle_brute_force(self) -> None:
+        '''
+        Switch between sweep and prune and checking every pair.
+        Parameters: None
+        Returns: None
+        '''
+        self.brute_force = not self.brute_force
+        return None
+
+    def update(self, delta : float) -> None :
+        '''
+        Canvas widget update function.
+        To be called in a loop.
+        Parameters:
+            delta : float - delta time in fractional seconds
+        Returns: None
+        '''
+        # move everything, bouncing off the edges of the screen
+        for body_id, body in self.bodies.items():
+            half = body.size / 2
+            body.x += body.x_vel * delta
+            body.y += body.y_vel * delta
+            if(body.x < half or body.x > self.__WIDTH - half):
+                body.x_vel = -body.x_vel
+                body.x = min(max(body.x, half), self.__WIDTH - half)
+            if(body.y < half or body.y > self.__HEIGHT - half):
+                body.y_vel = -body.y_vel
+                body.y = min(max(body.y, half), self.__HEIGHT - half)
+
+            self.sweep_and_prune.move(body_id, body.x - half, body.x + half)
+
+        start = time.perf_counter()
+
+        # broad phase
+        swaps = self.sweep_and_prune.update()
+        if(self.brute_force):
+            ids = list(self.bodies)
+            candidates = [(ids[i], ids[j]) for i in range(len(ids)) for j in range(i + 1, len(ids))]
+        else:
+            candidates = self.sweep_and_prune.get_pairs()
+
+        # narrow phase
+        hit = set()
+        for body_id1, body_id2 in candidates:
+            if(body_colission(self.bodies[body_id1], self.bodies[body_id2])):
+                hit.add(body_id1)
+                hit.add(body_id2)
+
+        elapsed = time.perf_counter() - start
+
+        # draw, only touching colors that changed
+        for body_id, body in self.bodies.items():
+            half = body.size / 2
+            self.coords(body.handle, body.x - half, body.y - half, body.x + half, body.y + half)
+
+            color = 'yellow' if body_id in hit else 'blue'
+            if(color != body.color):
+                self.itemconfigure(body.handle, fill=color)
+                body.color = color
+
+        mode = 'brute force' if self.brute_force else 'sweep and prune'
+        self.itemconfigure(self.stats_handle, 
+                           text=f"{mode} (b to switch, up/down for more/less)\n"
+                                f"bodies: {len(self.bodies)}  candidates: {len(candidates)}  "
+                                f"hits: {len(hit)}  swaps: {swaps}\n"
+                                f"colission: {elapsed * 1000:.2f}ms")
+        self.tag_raise(self.stats_handle)
+
+        # update base class
+        super().update()
+        super().update_idletasks()
+
+        return None
+
+
+class Program:
+    def __init__(self) -> None:
+        '''
+        Class init
+        Parameters: None
+        Returns: None
+        '''
+        # create window and set some basic properties
+        self.root = tk.Tk()
+        self.root.geometry('1280x720')
+        self.root.title('Sweep and Prune Demo')
+        self.root.resizable(False, False)
+
+        # program will run until this is False
+        self.running = True
+
+        # keeps us from running flat out
+        self.frame_scheduler = FrameScheduler(60)
+
+        # program's delta time object
+        self.delta_time = DeltaTime()
+
+        # create and pack our canvas object
+        self.canvas_bodies = Canvas_Bodies()
+        self.canvas_bodies.pack()
+
+        # bind window close button to close_program() method
+        self.root.protocol("WM_DELETE_WINDOW", lambda: self.close_program())
+
+        # bind keys for adding/removing bodies and switching broad phase
+        self.root.bind('<Up>', lambda e: self.canvas_bodies.add_bodies(100))
+        self.root.bind('<Down>', lambda e: self.canvas_bodies.remove_bodies(100))
+        self.root.bind('<b>', lambda e: self.canvas_bodies.toggle_brute_force())
+
+        return None
+
+    def close_program(self):
+        '''
+        sets self.running to False
+        Parmeters: None
+        Returns: None
+        '''
+        self.running = False
+        return None
+
+    def update(self):
+        '''
+        Program update function, to be called in a loop.
+        Parameters: None
+        Returns: None
+        '''
+        # get delta time
+        delta = self.delta_time.get()
+
+        # update canvas object
+        self.canvas_bodies.update(delta)
+
+        # update root window
+        self.root.update_idletasks()
+        self.root.update()
+
+        return None
+
+    def main_loop(self) -> None:
+        '''
+        Main process loop.
+        Prameters: None
+        Returns: None
+        '''
+        # while running flag is True
+        while (self.running):
+            
+            # Call program update 
+            self.update()
+
+            # wait for the next frame
+            self.frame_scheduler.wait()
+
+        # destroy root window when program is done
+        self.root.destroy()
+
+
+def check_main(frames : int, seed : int = 1) -> None:
+    '''
+    Drives a SweepAndPrune with random adds, moves and removes, in any
+    order, checking its pairs against brute force every frame.
+    Parameters:
+        frames : int - frames to run
+        seed : int - random seed
+    Returns: None
+    '''
+    rand = random.Random(seed)
+    sweep_and_prune = SweepAndPrune()
+    bodies = dict()
+    next_id = 0
+
+    for frame in range(frames):
+        # adds and removes before, between and after moving
+        for stage in range(3):
+            for i in range(rand.randint(0, 3) if len(bodies) < 200 else 0):
+                x, size = rand.uniform(0, 400), rand.uniform(1, 40)
+                bodies[next_id] = (x, size)
+                sweep_and_prune.add(next_id, x - (size / 2), x + (size / 2))
+                next_id += 1
+
+            for body in rand.sample(list(bodies), min(len(bodies), rand.randint(0, 2))):
+                del bodies[body]
+                sweep_and_prune.remove(body)
+
+            if(stage == 0):
+                for body, (x, size) in bodies.items():
+                    x += rand.uniform(-20, 20)
+                    bodies[body] = (x, size)
+                    sweep_and_prune.move(body, x - (size / 2), x + (size / 2))
+
+        sweep_and_prune.update()
+        sweep_and_prune.check()
+
+    print(f"{frames} frames, {next_id} bodies added, pairs matched brute force every frame")
+    return None
+
+
+# Conditional call to main program loop
+if(__name__ == '__main__'):
+    # python3 sweep-and-prune.py --check [frames]
+    if('--check' in sys.argv):
+        args = sys.argv[sys.argv.index('--check') + 1:]
+        check_main(int(args[0]) if args else 1000)
+        sys.exit()
+
+    program = Program()
+    program.main_loop()
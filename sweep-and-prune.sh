@@ -0,0 +1,3 @@
+#! /bin/bash
+
+python3 ./sweep-and-prune.py
\ No newline at end of file